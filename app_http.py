@@ -5,9 +5,7 @@ Forces HTTP-only mode to work around Simple Browser's HTTPS certificate issues.
 """
 import sys
 import os
-import threading
-import time
-from backend.factory import create_app, complete_app_initialization
+from backend.factory import create_app, start_staged_initialization
 from graceful_shutdown import get_shutdown_manager
 
 # Configuration - Force HTTP only
@@ -26,24 +24,15 @@ if __name__ == "__main__":
 
     # Create app with lightweight architecture
     print("[STARTUP] Creating lightweight Flask app (no vector database)...")
-    app = create_app()
+    app = create_app(staged=True)
 
     if shutdown_mgr:
         shutdown_mgr.register_app(app, None)
 
-    # Start server in background thread to serve loading page immediately
-    def complete_initialization():
-        """Complete app initialization in background"""
-        print("[STARTUP] Starting background initialization...")
-        time.sleep(1)  # Brief delay to ensure server is responding
-        
-        complete_app_initialization(app)
-        
-        print("[STARTUP] Lightweight initialization complete!")
-    
-    # Start background initialization
-    init_thread = threading.Thread(target=complete_initialization, daemon=True)
-    init_thread.start()
+    # Run the startup stages (secrets, memory replay, indexes) in the background
+    # while the server binds and serves the loading page and /healthz
+    print("[STARTUP] Starting background initialization...")
+    start_staged_initialization(app)
     
     # Start HTTP-only server for VS Code debugging
     print(f"[LOCAL] Running HTTP only at http://localhost:{PORT}")
@@ -1,9 +1,26 @@
 # Main Flask app factory and entry point
-from flask import Flask
+from flask import Flask, jsonify, render_template, request
 import os
+import threading
+import time
 
-def create_app():
-    """Create and configure the Flask application"""
+# (module, blueprint variable) registered lazily when LAZY_BLUEPRINTS is on
+LAZY_BLUEPRINT_MODULES = (
+    ('backend.routes.admin', 'admin_bp'),
+    ('backend.routes.vault', 'vault_bp'),
+    ('backend.routes.learn', 'learn_bp'),
+)
+
+def create_app(staged=False):
+    """
+    Create and configure the Flask application.
+    With staged=True the app is returned before the startup stages run; they
+    start in the background on the first request (any WSGI server), or earlier
+    when the server calls start_staged_initialization(app) itself (gunicorn's
+    post_worker_init). Until the stages finish, /healthz and /startup answer normally, pages get the loading
+    screen and API calls a 503.
+    """
+    created_at = time.perf_counter()
     # Get the project root directory
     backend_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(backend_dir)
@@ -17,60 +34,175 @@ def create_app():
         'ssl_ready': True,  # Already handled by launcher
         'app_created': True,
         'blueprints_registered': False,
+        'secrets_ready': False,
         'memory_initialized': False,
         'vector_db_ready': False,
         'socketio_ready': False,
         'fully_ready': False
-    }    # Register core blueprints immediately for essential routes
+    }
+    # Per-stage timings, in run order (exposed at /startup)
+    app.config['STARTUP_TIMINGS'] = {}
+    app.config['STARTUP_LOCK'] = threading.Lock()
+
+    # orjson/msgspec-backed jsonify and request.get_json (stdlib fallback)
+    from backend.utils.json_codec import init_json_provider
+    init_json_provider(app)
+    app.config['STARTUP_STARTED'] = False
+
+    # Register core blueprints immediately for essential routes
     from backend.routes.chat import chat_bp
     from backend.routes.client import client_bp
-    from backend.routes.admin import admin_bp
-    from backend.routes.vault import vault_bp
     from backend.routes.memory import memory_bp
     app.register_blueprint(chat_bp)
     app.register_blueprint(client_bp)
-    app.register_blueprint(admin_bp)
-    app.register_blueprint(vault_bp)
     app.register_blueprint(memory_bp)
+
+    # Fingerprinted static assets (asset_url() in templates, /assets/ route)
+    from backend.utils.assets import init_assets
+    init_assets(app)
+
+    # Compress large JSON API responses the client accepts encoded
+    from backend.utils.http_cache import init_json_compression
+    init_json_compression(app)
+
+    # Concurrency limits for expensive route classes (503 when saturated)
+    from backend.utils.load_shedding import init_load_shedding
+    init_load_shedding(app)
+
+    # Rarely used blueprints (admin pages, secret lookup, vault, learn) pull in
+    # markdown, Secret Manager and the email service; in lazy mode they are
+    # imported on their first request instead of at startup
+    if os.getenv('LAZY_BLUEPRINTS', 'true').lower() in ('1', 'true', 'yes'):
+        from backend.utils.lazy_views import register_lazy_blueprint
+        for module_name, blueprint_var in LAZY_BLUEPRINT_MODULES:
+            register_lazy_blueprint(app, module_name, blueprint_var)
+    else:
+        from backend.routes.admin import admin_bp
+        from backend.routes.vault import vault_bp
+        from backend.routes.learn import learn_bp
+        app.register_blueprint(admin_bp)
+        app.register_blueprint(vault_bp)
+        app.register_blueprint(learn_bp)
+    _register_startup_routes(app)
     app.config['STARTUP_STATE']['blueprints_registered'] = True
+    _record_stage(app, 'app', created_at, time.perf_counter())
 
-    # Call this BEFORE returning the app!
-    complete_app_initialization(app)
+    if staged:
+        app.before_request(_startup_gate)
+    else:
+        complete_app_initialization(app)
 
     return app
 
-def complete_app_initialization(app):
-    """Complete the app initialization with remaining blueprints and services"""
-    try:
-          # Initialize memory systems
-        app.config['STARTUP_STATE']['memory_initialized'] = True
-          # Vector database no longer needed - lightweight implementation
+def _register_startup_routes(app):
+    """Routes that must answer while the startup stages are still running"""
+
+    @app.route("/healthz")
+    def healthz():
+        # Liveness: the process is up and serving, ready or not
+        return jsonify({"status": "ok", "ready": app.config['STARTUP_STATE']['fully_ready']})
+
+    @app.route("/startup-status")
+    def startup_status():
+        # Polled by templates/loading.html
+        return jsonify(app.config['STARTUP_STATE'])
+
+    @app.route("/startup")
+    def startup():
+        timings = app.config['STARTUP_TIMINGS']
+        return jsonify({
+            "state": app.config['STARTUP_STATE'],
+            "stages": [{"name": name, **timing} for name, timing in timings.items()],
+            "total_ms": round(sum(timing['duration_ms'] for timing in timings.values()), 1)
+        })
+
+    # Data endpoint for backward compatibility (registered up front: Flask
+    # rejects new routes once the app has handled a request)
+    @app.route("/data")
+    def data():
+        from backend.utils.id_utils import generate_secure_key
+        return jsonify({"key": generate_secure_key()})
+
+STARTUP_EXEMPT_ENDPOINTS = frozenset({'healthz', 'startup_status', 'startup', 'static',
+                                      'assets.serve_asset'})
+
+def _startup_gate():
+    """Until the startup stages finish: loading page for pages, 503 for API calls"""
+    from flask import current_app
+    if current_app.config['STARTUP_STATE']['fully_ready']:
+        return None
+    # Servers without a post-fork hook start the stages here, once per process
+    start_staged_initialization(current_app._get_current_object())
+    if request.endpoint in STARTUP_EXEMPT_ENDPOINTS:
+        return None
+    if request.method == 'GET' and request.accept_mimetypes.accept_html \
+            and request.accept_mimetypes.best == 'text/html':
+        return render_template('loading.html')
+    response = jsonify({"error": "Server is starting up", "startup": current_app.config['STARTUP_STATE']})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+def _record_stage(app, name, started, finished, error=None):
+    app.config['STARTUP_TIMINGS'][name] = {
+        "duration_ms": round((finished - started) * 1000, 1),
+        "status": "error" if error else "ok",
+        **({"error": str(error)} if error else {})
+    }
+
+def _prefetch_secrets():
+    # Importing config builds the secrets manager and checks every secret
+    import backend.utils.config  # noqa: F401
+
+def _replay_memory():
+    # Replay persisted schedule facts, if configured
+    from backend.utils.memory_utils import replay_fact_store
+    replay_fact_store()
+
+def _build_indexes():
+    # Lightweight text-based search (no vector database): warm the person-name index
+    from backend.utils.memory_utils import warm_search_indexes
+    warm_search_indexes()
+
+# (stage name, function, STARTUP_STATE flag set when it finishes, background only)
+# Background-only stages are warm-ups: a synchronous create_app() skips them
+# and the work happens on first use instead
+STARTUP_STAGES = (
+    ('secrets', _prefetch_secrets, 'secrets_ready', True),
+    ('memory', _replay_memory, 'memory_initialized', False),
+    ('indexes', _build_indexes, 'vector_db_ready', False),
+)
+
+def complete_app_initialization(app, background=False):
+    """Run the startup stages in order, recording per-stage timings"""
+    state = app.config['STARTUP_STATE']
+    for name, stage, flag, background_only in STARTUP_STAGES:
+        if background_only and not background:
+            continue
+        started = time.perf_counter()
         try:
-            print("[STARTUP] Using lightweight text-based search (no vector database)")
-            app.config['STARTUP_STATE']['vector_db_ready'] = True
+            stage()
+            _record_stage(app, name, started, time.perf_counter())
         except Exception as e:
-            print(f"[STARTUP] Startup warning: {e}")
-            app.config['STARTUP_STATE']['vector_db_ready'] = True  # Continue anyway
-        
-        # Add data endpoint for backward compatibility
-        # Remove if already registered elsewhere to avoid endpoint conflict
-        if not any(r.rule == '/data' for r in app.url_map.iter_rules()):
-            from backend.utils.id_utils import generate_secure_key
-            from flask import jsonify
-            @app.route("/data")
-            def data():
-                key = generate_secure_key()
-                return jsonify({"key": key})
-        
-        # Mark as fully ready
-        app.config['STARTUP_STATE']['fully_ready'] = True
-        
-        print("[STARTUP] Progressive initialization complete - all systems ready")
-        
-    except Exception as e:
-        print(f"[STARTUP] Error during progressive initialization: {e}")
-        # Don't fail completely, mark as ready anyway for graceful degradation
-        app.config['STARTUP_STATE']['fully_ready'] = True
+            # Don't fail completely - degrade gracefully and keep starting up
+            print(f"[STARTUP] Stage '{name}' failed: {e}")
+            _record_stage(app, name, started, time.perf_counter(), error=e)
+        state[flag] = True
+
+    # Mark as fully ready
+    state['fully_ready'] = True
+    print("[STARTUP] Progressive initialization complete - all systems ready")
+
+def start_staged_initialization(app):
+    """Run the startup stages in a background thread, once per process"""
+    with app.config['STARTUP_LOCK']:
+        if app.config['STARTUP_STARTED']:
+            return None
+        app.config['STARTUP_STARTED'] = True
+    thread = threading.Thread(target=complete_app_initialization, args=(app, True),
+                              name='startup-stages', daemon=True)
+    thread.start()
+    return thread
 
 # For running directly
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+# Request body schemas for the POST endpoints, compiled by backend/utils/validation.py
+
+import time
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, List, Optional, Union
+
+from backend.utils.validation import EMAIL, HEX64, ValidationError, rule
+
+MAX_SEARCH_LIMIT = 100
+
+def _now_ms() -> float:
+    return time.time() * 1000
+
+def _epoch_ms(value: Union[str, float]) -> float:
+    """Milliseconds since the epoch from a number or an ISO 8601 string"""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp() * 1000
+        except ValueError:
+            raise ValidationError("Invalid timestamp")
+    return value
+
+@dataclass
+class ClientRegistration:
+    """POST /client-register"""
+    MISSING_MESSAGE: ClassVar[str] = "Missing field: {field}"
+    env_id: str
+    client_id: str = field(metadata=rule(pattern=HEX64, message="Invalid client_id format"))
+    public_ip: Optional[str] = field(metadata=rule(max_length=64))
+    user_agent: str = field(metadata=rule(max_length=1024))
+    # templates/client.html sends new Date().toISOString(); stored as epoch ms like heartbeats
+    timestamp: Union[str, float] = field(metadata=rule(max_length=64, coerce=_epoch_ms))
+    email: str = field(metadata=rule(pattern=EMAIL, max_length=320, message="Invalid email format"))
+
+@dataclass
+class ClientPing:
+    """POST /client-heartbeat, /client-mfa-active and /client-mfa-lost"""
+    MISSING_MESSAGE: ClassVar[str] = "Missing required fields"
+    env_id: str = field(metadata=rule(min_length=1, message=MISSING_MESSAGE))
+    client_id: str = field(metadata=rule(min_length=1, message=MISSING_MESSAGE))
+    timestamp: float = field(default_factory=_now_ms)
+
+@dataclass
+class UIElementPayload:
+    """ui_element of a vault collect request (all parts optional)"""
+    selector: str = ''
+    tag_name: str = ''
+    text_content: str = ''
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    position: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class VaultCollect:
+    """POST /vault/collect"""
+    user_id: str = field(metadata=rule(min_length=1))
+    tab_id: Union[str, int] = field(metadata=rule(coerce=str))
+    url: str
+    ui_element: UIElementPayload
+    storage_data: Optional[Dict[str, Any]] = None
+    timestamp: float = field(default_factory=_now_ms)
+
+@dataclass
+class VaultSearch:
+    """POST /vault/search"""
+    MISSING_MESSAGE: ClassVar[str] = "Missing user_id or query_text"
+    user_id: str = field(metadata=rule(min_length=1, message=MISSING_MESSAGE))
+    query_text: str = field(metadata=rule(min_length=1, message=MISSING_MESSAGE))
+    domain: Optional[str] = None
+    limit: int = field(default=10, metadata=rule(min_value=1, max_value=MAX_SEARCH_LIMIT))
+
+@dataclass
+class EnvBoxUpdate:
+    """POST /env-box"""
+    env_id: str = field(metadata=rule(min_length=1, message="Missing required field: env_id"))
+    value: List[Any] = field(default_factory=list)
+
+@dataclass
+class IpBoxUpdate:
+    """POST /ip-box"""
+    env_id: str = field(metadata=rule(min_length=1, message="Missing required field: env_id"))
+    public_ip: str = field(metadata=rule(min_length=1, message="Missing required field: public_ip"))
+    value: List[Any] = field(default_factory=list)
@@ -0,0 +1,189 @@
+# Roadmap view model for the /roadmap page and JSON API
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+DATE_FORMAT = "%Y-%m-%d"
+
+BAR_CLASSES = {
+    'UI/UX': 'bar-ui-ux',
+    'Backend/IT': 'bar-backend-it',
+    'Policy': 'bar-policy',
+}
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value, DATE_FORMAT) if value else None
+
+def _status_class(status: Optional[str]) -> str:
+    return status.lower().replace(' ', '-') if status else 'planned'
+
+@dataclass
+class FeatureView:
+    """A roadmap feature with parsed dates and its precomputed Gantt bar"""
+    id: Optional[str]
+    title: str
+    description: Optional[str]
+    type: Optional[str]
+    status: Optional[str]
+    start_date: Optional[str]
+    end_date: Optional[str]
+    impact_areas: List[str]
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    bar_left: Optional[float] = None     # percent of the timeline; None = no bar
+    bar_width: Optional[float] = None
+
+    @property
+    def status_class(self) -> str:
+        return _status_class(self.status)
+
+    @property
+    def bar_class(self) -> str:
+        return BAR_CLASSES.get(self.type, 'bar-default')
+
+    @property
+    def has_dates(self) -> bool:
+        return bool(self.start_date and self.end_date)
+
+    def place(self, min_date: datetime, total_days: int):
+        """Position the Gantt bar on the shared timeline"""
+        if not (self.start and self.end and self.start <= self.end and total_days > 0):
+            return
+        offset_days = (self.start - min_date).days
+        duration_days = (self.end - self.start).days + 1
+        bar_left = (offset_days / total_days) * 100
+        bar_width = (duration_days / total_days) * 100
+        if bar_left < 0:
+            bar_left = 0
+        if bar_width < 0.5:
+            bar_width = 0.5
+        if bar_left + bar_width > 100:
+            bar_width = 100 - bar_left
+        self.bar_left, self.bar_width = bar_left, bar_width
+
+@dataclass
+class PhaseView:
+    """A roadmap phase with its features and per-status aggregates"""
+    id: Optional[str]
+    name: str
+    status: Optional[str]
+    target_completion: Optional[str]
+    features: List[FeatureView]
+    status_counts: Dict[str, int] = field(default_factory=dict)
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    @property
+    def status_class(self) -> str:
+        return _status_class(self.status)
+
+    @property
+    def completion_percent(self) -> float:
+        if not self.features:
+            return 0.0
+        return round(self.status_counts.get('Completed', 0) / len(self.features) * 100, 1)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "feature_count": len(self.features),
+            "status_counts": self.status_counts,
+            "completion_percent": self.completion_percent,
+            "start_date": self.start.strftime(DATE_FORMAT) if self.start else None,
+            "end_date": self.end.strftime(DATE_FORMAT) if self.end else None
+        }
+
+@dataclass
+class RoadmapView:
+    """Roadmap compiled once per data change: dates parsed, bounds and bars precomputed"""
+    project_name: str
+    phases: List[PhaseView]
+    min_date: datetime
+    max_date: datetime
+    total_days: int
+    month_markers: List[str]
+    has_dates: bool
+    last_updated: str
+    data: dict
+
+    def to_dict(self) -> dict:
+        """JSON API shape: the raw roadmap data plus compile time and aggregates"""
+        return {
+            **self.data,
+            "last_updated": self.last_updated,
+            "summary": [phase.summary() for phase in self.phases]
+        }
+
+def _month_markers(min_date: datetime, total_days: int) -> List[str]:
+    # Labels where the month changes within the first 12 days of the timeline
+    markers = []
+    for i in range(min(total_days, 12)):
+        label = (min_date + timedelta(days=i)).strftime('%b %Y')
+        if not markers or markers[-1] != label:
+            markers.append(label)
+    return markers
+
+def compile_roadmap(data: dict, compiled_at: Optional[datetime] = None) -> RoadmapView:
+    """Parse every date once and precompute the timeline, bars and aggregates"""
+    compiled_at = compiled_at or datetime.utcnow()
+    phases = []
+    all_dates = []
+    for phase in data.get("phases", []):
+        features = []
+        status_counts = {}
+        for feature in phase.get("features", []):
+            view = FeatureView(
+                id=feature.get("id"),
+                title=feature.get("title", ""),
+                description=feature.get("description"),
+                type=feature.get("type"),
+                status=feature.get("status"),
+                start_date=feature.get("start_date"),
+                end_date=feature.get("end_date"),
+                impact_areas=feature.get("impact_areas", []),
+                start=_parse_date(feature.get("start_date")),
+                end=_parse_date(feature.get("end_date"))
+            )
+            all_dates.extend(date for date in (view.start, view.end) if date)
+            status_counts[view.status] = status_counts.get(view.status, 0) + 1
+            features.append(view)
+        phase_dates = [date for view in features for date in (view.start, view.end) if date]
+        phases.append(PhaseView(
+            id=phase.get("id"),
+            name=phase.get("name", ""),
+            status=phase.get("status"),
+            target_completion=phase.get("target_completion"),
+            features=features,
+            status_counts=status_counts,
+            start=min(phase_dates) if phase_dates else None,
+            end=max(phase_dates) if phase_dates else None
+        ))
+
+    if all_dates:
+        min_date, max_date = min(all_dates), max(all_dates)
+        if max_date <= min_date:
+            max_date = min_date + timedelta(days=30)
+    else:
+        min_date = datetime(compiled_at.year, 1, 1)
+        max_date = datetime(compiled_at.year, 12, 31)
+
+    total_days = (max_date - min_date).days + 1
+    if total_days <= 0:
+        total_days = 365
+    for phase in phases:
+        for feature in phase.features:
+            feature.place(min_date, total_days)
+
+    return RoadmapView(
+        project_name=data.get("project_name", ""),
+        phases=phases,
+        min_date=min_date,
+        max_date=max_date,
+        total_days=total_days,
+        month_markers=_month_markers(min_date, total_days),
+        has_dates=bool(all_dates),
+        last_updated=compiled_at.strftime("%Y-%m-%d %H:%M:%S UTC"),
+        data=data
+    )
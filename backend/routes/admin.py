@@ -3,12 +3,19 @@
 from flask import Blueprint, render_template, jsonify, request, Response
 import markdown
 from backend.utils.id_utils import get_env_id
-from backend.utils.email_utils import create_email_service
+from backend.utils.email_utils import SimulatedEmailProvider
+from backend.utils import email_utils
 from backend.utils.config import config
-import json
+from backend.utils import store_versions
+from backend.utils.http_cache import rendered_pages, template_paths, versioned_json
+from backend.utils.json_stream import json_listing
+from backend.utils.load_shedding import concurrency_stats
+from backend.utils.rate_limit import limiter, rate_limited
+from backend.models.roadmap import compile_roadmap
+from backend.utils import json_codec
 import os
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
 from backend.utils.secrets_manager import TransparentSecretsManager
 import traceback
 
@@ -109,9 +116,29 @@ def secrets_health():
     except Exception as e:
         return jsonify({'error': f'Secrets health check error: {str(e)}'}), 500
 
+@admin_bp.route('/admin/email-probe')
+def email_probe():
+    """Non-destructive email provider check for health monitoring (never sends mail)"""
+    try:
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        probe = email_utils.email_service.probe(force=refresh)
+        
+        return jsonify({
+            'success': probe['healthy'],
+            'enabled': config.is_email_enabled(),
+            'provider': config.email_provider,
+            'probe': probe,
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Email probe error: {str(e)}'
+        }), 500
+
 @admin_bp.route('/admin/test-email', methods=['POST'])
 def test_email():
-    """Test email functionality with new email system"""
+    """Send a real test email - manual use only; health checks use /admin/email-probe"""
     try:
         if not config.is_email_enabled():
             return jsonify({
@@ -120,8 +147,8 @@ def test_email():
                 'recommendation': 'Configure an email provider in your environment variables'
             }), 400
         
-        # Create email service using new system
-        email_service = create_email_service()
+        # Use the shared email service so simulated sends land in its outbox
+        email_service = email_utils.email_service
         if not email_service:
             return jsonify({
                 'success': False,
@@ -166,7 +193,62 @@ def test_email():
             'error': f'Email test error: {str(e)}'
         }), 500
 
+@admin_bp.route('/admin/outbox')
+def admin_outbox():
+    """Page through the simulated email outbox (newest first)"""
+    provider = email_utils.email_service.provider
+    if not isinstance(provider, SimulatedEmailProvider):
+        return jsonify({
+            'error': 'Outbox is only available with the simulated email provider',
+            'provider': provider.provider_name
+        }), 404
+    
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(200, max(1, request.args.get('per_page', 50, type=int)))
+    recipient = request.args.get('to')
+    
+    if recipient:
+        # Recipient lookups use the outbox index, then page newest first
+        matching = provider.get_sent_emails_to(recipient)[::-1]
+        emails = matching[(page - 1) * per_page:page * per_page]
+        total = len(matching)
+    else:
+        emails = provider.outbox.page((page - 1) * per_page, per_page)
+        total = len(provider.outbox)
+    
+    return jsonify({
+        'emails': emails,
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'outbox': provider.outbox.stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@admin_bp.route('/admin/rate-limits')
+def admin_rate_limits():
+    """Rate limits with allowed/throttled counters (this worker)"""
+    return jsonify(limiter.stats())
+
+@admin_bp.route('/admin/concurrency')
+def admin_concurrency():
+    """Concurrency limits per route class with admitted/shed counters (this worker)"""
+    return jsonify(concurrency_stats())
+
+@admin_bp.route('/admin/outbox/<message_id>')
+def admin_outbox_message(message_id):
+    """Get a single simulated email by message_id"""
+    provider = email_utils.email_service.provider
+    if not isinstance(provider, SimulatedEmailProvider):
+        return jsonify({'error': 'Outbox is only available with the simulated email provider'}), 404
+    
+    email_data = provider.get_sent_email(message_id)
+    if email_data is None:
+        return jsonify({'error': 'Message not found in outbox'}), 404
+    return jsonify(email_data)
+
 @admin_bp.route('/lost-memory', methods=['POST'])
+@rate_limited('lost_memory', aggregate=('lost_memory_env', 'env_id'))
 def report_lost_memory():
     """Report lost memory with optional email notification"""
     try:
@@ -198,7 +280,7 @@ def report_lost_memory():
         email_sent = False
         if config.is_email_enabled() and config.admin_email:
             try:
-                email_service = create_email_service()
+                email_service = email_utils.email_service
                 if email_service:
                     subject = f"ICI Chat - Lost Memory Report: {report['id']}"
                     body = f"""
@@ -294,7 +376,7 @@ def events():
             }
             
             # Format as Server-Sent Event
-            yield f"data: {json.dumps(event_data)}\n\n"
+            yield f"data: {json_codec.dumps(event_data)}\n\n"
             
             # Wait before sending next event
             time.sleep(5)
@@ -310,41 +392,55 @@ def events():
         }
     )
 
+# Compiled roadmap view model and rendered bodies, rebuilt only when the
+# roadmap version changes - bump store_versions.ROADMAP after editing roadmap_data_store
+_roadmap_compiled = (None, None)   # (roadmap version, RoadmapView)
+
+def get_roadmap_view():
+    """The compiled roadmap view model for the current roadmap data"""
+    global _roadmap_compiled
+    version = store_versions.get(store_versions.ROADMAP)
+    compiled_version, view = _roadmap_compiled
+    if view is None or compiled_version != version:
+        view = compile_roadmap(roadmap_data_store)
+        _roadmap_compiled = (version, view)
+    return view
+
 @admin_bp.route("/roadmap")
 def roadmap_view():
     """Roadmap view with HTML rendering and JSON API support"""
-    current_roadmap_data = roadmap_data_store.copy()
-    current_roadmap_data["last_updated"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+    version = store_versions.get(store_versions.ROADMAP)
 
     if request.accept_mimetypes.accept_json and not request.accept_mimetypes.accept_html:
-        return jsonify(current_roadmap_data)
-    
-    # For HTML view, calculate min/max dates for Gantt scaling
-    all_dates = []
-    for phase in current_roadmap_data.get("phases", []):
-        for feature in phase.get("features", []):
-            if feature.get("start_date"):
-                all_dates.append(datetime.strptime(feature["start_date"], "%Y-%m-%d"))
-            if feature.get("end_date"):
-                all_dates.append(datetime.strptime(feature["end_date"], "%Y-%m-%d"))
-    
-    min_date = min(all_dates) if all_dates else datetime(2025, 1, 1)
-    max_date = max(all_dates) if all_dates else datetime(2025, 12, 31)
-    
-    if max_date <= min_date and all_dates:
-        max_date = min_date + timedelta(days=30)
-    elif not all_dates:
-        min_date = datetime(datetime.now().year, 1, 1)
-        max_date = datetime(datetime.now().year, 12, 31)
-    
-    return render_template(
-        "roadmap.html",
-        roadmap=current_roadmap_data,
-        min_date=min_date,
-        max_date=max_date,
-        timedelta=timedelta,
-        datetime=datetime
+        body = rendered_pages.get(
+            'roadmap.json', version,
+            lambda: json_codec.dumps(get_roadmap_view().to_dict()),
+            mimetype='application/json'
+        )
+        return body.response()
+
+    fingerprint = (version, rendered_pages.fingerprint(*template_paths('roadmap.html')))
+    body = rendered_pages.get(
+        'roadmap.html', fingerprint,
+        lambda: render_template("roadmap.html", roadmap=get_roadmap_view())
     )
+    return body.response()
+
+README_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'README.md'))
+
+@admin_bp.route("/readme")
+def readme():
+    """Serve README.md as rendered HTML, re-rendered only when it changes"""
+    if not os.path.exists(README_PATH):
+        return Response('README.md not found.', mimetype='text/plain')
+
+    def render():
+        with open(README_PATH, encoding='utf-8') as f:
+            html = markdown.markdown(f.read(), extensions=['fenced_code', 'extra'])
+        return render_template('markdown_render.html', content=html, title="README")
+
+    fingerprint = rendered_pages.fingerprint(README_PATH, *template_paths('markdown_render.html'))
+    return rendered_pages.get('readme', fingerprint, render).response()
 
 @admin_bp.route("/changelog")
 def changelog():
@@ -369,6 +465,35 @@ def recovery():
     
     return render_template("recovery.html", env_id=env_id, clients=filtered_clients)
 
+@admin_bp.route("/debug/env-box")
+@versioned_json(store_versions.ENV_BOX)
+def debug_env_box():
+    """Debug endpoint to view all env-box data"""
+    from backend.routes.memory import env_box_items
+    env_boxes = env_box_items()
+    return json_listing(env_boxes, len(env_boxes), "env_boxes",
+                        count_field="total_environments", mapping=True)
+
+@admin_bp.route("/debug/ip-box")
+@versioned_json(store_versions.IP_BOX)
+def debug_ip_box():
+    """Debug endpoint to view all IP-box data"""
+    from backend.routes.memory import ip_box_items
+    ip_boxes = ip_box_items()
+    return json_listing(ip_boxes, len(ip_boxes), "ip_boxes",
+                        count_field="total_ip_environments", mapping=True)
+
+@admin_bp.route("/debug/clients")
+@versioned_json(store_versions.CLIENTS)
+def debug_clients():
+    """Debug endpoint to view all client data"""
+    from backend.routes.client import client_memory, client_json_table
+    return jsonify({
+        "client_memory": client_memory,
+        "client_table": client_json_table,
+        "total_clients": len(client_json_table)
+    })
+
 @admin_bp.route("/get-lost-memory-reports")
 def get_lost_memory_reports():
     """Get lost memory reports for an environment"""
@@ -433,6 +558,7 @@ def delete_client_row():
     
     # Remove from table
     original_length = len(client_json_table)
+    removed_envs = {c.get("env_id") for c in client_json_table if c.get("client_id") == client_id}
     client_json_table[:] = [c for c in client_json_table if c.get("client_id") != client_id]
     
     # Remove from memory
@@ -440,6 +566,9 @@ def delete_client_row():
     client_key = f"{env_id}:{client_id}"
     if client_key in client_memory:
         del client_memory[client_key]
+    # Rows may be removed from any environment; bump each one that lost a row
+    for removed_env in removed_envs | {env_id}:
+        store_versions.bump(store_versions.CLIENTS, removed_env)
     
     removed_count = original_length - len(client_json_table)
     
@@ -464,6 +593,7 @@ def delete_all_client_rows():
     keys_to_remove = [key for key in client_memory.keys() if key.startswith(f"{env_id}:")]
     for key in keys_to_remove:
         del client_memory[key]
+    store_versions.bump(store_versions.CLIENTS, env_id)
     
     removed_count = original_length - len(client_json_table)
     
@@ -479,7 +609,7 @@ def client_table_events():
     def generate():
         while True:
             from backend.routes.client import client_json_table
-            yield f"data: {json.dumps(client_json_table)}\n\n"
+            yield f"data: {json_codec.dumps(client_json_table)}\n\n"
             import time
             time.sleep(2)  # Update every 2 seconds
     
@@ -1,23 +1,93 @@
 # Chat-related routes for ICI Chat backend
 
-from flask import Blueprint, render_template, jsonify, request, Response, send_file
-from backend.utils.id_utils import get_env_id, get_private_id
-import json
+from flask import Blueprint, render_template, jsonify, request, Response, send_file, stream_with_context
+from backend.utils.id_utils import get_env_id, get_private_id, get_build_version
+from backend.utils import json_codec
+from backend.utils.rate_limit import rate_limited
 import time
 import base64
-import re
+import functools
+import threading
+from collections import OrderedDict
 
 # Import memory utility functions - THESE ARE THE SINGLE SOURCE OF TRUTH
 from backend.utils.memory_utils import (
-    is_statement_worth_remembering,
-    is_question_seeking_memory,
     store_information_in_memory,
     search_memory_for_context,
 )
+from backend.utils.intent_router import (
+    IntentRouter,
+    classify_message,
+    REMEMBER_SCHEDULE,
+    ASK_SCHEDULE,
+    ASK_TIME,
+    WHO_IS,
+    SCHEDULE_RANGE,
+    SCHEDULE_NEXT,
+    UNKNOWN,
+)
 
 chat_bp = Blueprint('chat_bp', __name__)
 
+HELP_TEXT = ("You can ask me to remember facts (e.g., 'Tommy should go at 2pm'), "
+             "or ask about things I've learned (e.g., 'When should Tommy go?'). "
+             "You can also include web URLs, screenshots, or files to help me assist you.")
+
+# Shared intent dispatch for /ai-chat and /ai-chat-enhanced
+chat_router = IntentRouter()
+
+@chat_router.route(REMEMBER_SCHEDULE)
+def handle_remember(intent, db, user_id):
+    store_information_in_memory(db, user_id, intent.message, intent=intent)
+    return {
+        "response": f"OK, {intent.name} should go at {intent.time}, today.",
+        "memory_stored": True,
+        "memory_context_found": False
+    }
+
+@chat_router.route(ASK_SCHEDULE, ASK_TIME, WHO_IS, SCHEDULE_RANGE, SCHEDULE_NEXT)
+def handle_memory_question(intent, db, user_id):
+    context_results = search_memory_for_context(db, user_id, intent.message, intent=intent) # Get list of dicts
+    
+    # Extract just the text from context_results for the prompt
+    context_texts = [item['text'] for item in context_results if 'text' in item]
+    context_for_prompt = " ".join(context_texts)
+
+    if not context_for_prompt:
+        return {
+            "response": "I couldn't find anything relevant in memory. " + HELP_TEXT,
+            "memory_stored": False,
+            "memory_context_found": False
+        }
+
+    response_text = CONTEXT_PREFIX + context_for_prompt
+    # --- Ask for clarification if subject is a nickname or unclear ---
+    if intent.kind == ASK_SCHEDULE:
+        subject = intent.name
+        response_text += (
+            f"\nWould you like me to remind {subject}? If so, how should I remind them? "
+            f"(e.g., email, SMS, Google Chat, Slack, Teams)\n"
+            f"Also, could you clarify your relationship to {subject}? "
+            f"(e.g., colleague, friend, acquaintance, family, private)\n"
+            f"You can also include web URLs, screenshots, or files to help me assist you and stay true to the solution's mission and vision."
+        )
+    return {
+        "response": response_text,
+        "memory_stored": False,
+        "memory_context_found": True
+    }
+
+@chat_router.route(UNKNOWN)
+def handle_unknown(intent, db, user_id):
+    # Try to provide a more helpful fallback for general questions
+    return {
+        "response": "I'm not sure how to respond to that. " + HELP_TEXT,
+        "memory_stored": False,
+        "memory_context_found": False
+    }
+
 @chat_bp.route('/ai-chat', methods=['POST'])
+@rate_limited('chat', ('user_id',))
 def ai_chat():
     data = request.json or {}
     user_message = data.get('message')
@@ -26,69 +96,12 @@ def ai_chat():
     if not user_message:
         return jsonify({"error": "No message provided"}), 400
 
-    # No longer need vector database - using lightweight memory functions
-    db = None  # Lightweight implementation doesn't use vector DB
-    response_text = ""
-    memory_stored = False
-    memory_context_found = False
-    parsed_schedule_info = None
-
-    schedule_match = re.search(r"(\w+)\s+should\s+go\s+at\s+(.+)", user_message, re.IGNORECASE)
-    if schedule_match:
-        parsed_schedule_info = {"name": schedule_match.group(1), "time": schedule_match.group(2)}
-
-    if is_statement_worth_remembering(user_message):
-        # Pass the db instance to the memory function
-        store_information_in_memory(db, user_id, user_message) 
-        memory_stored = True
-        if parsed_schedule_info:
-            response_text = f"OK, {parsed_schedule_info['name']} should go at {parsed_schedule_info['time']}, today."
-        else:
-            response_text = f"OK, I've remembered that: \"{user_message}\""
-    elif is_question_seeking_memory(user_message):
-        # Pass db if needed by this func
-        context_results = search_memory_for_context(db, user_id, user_message) # Get list of dicts
-        
-        # Extract just the text from context_results for the prompt
-        context_texts = [item['text'] for item in context_results if 'text' in item]
-        context_for_prompt = " ".join(context_texts)
-
-        if context_for_prompt:
-            memory_context_found = True
-            response_text = f"Based on our previous conversation: {context_for_prompt}"
-            # --- New: Ask for clarification if subject is a nickname or unclear ---
-            match = re.match(r"when should (\w+) go", user_message, re.IGNORECASE)
-            if match:
-                subject = match.group(1)
-                response_text += (
-                    f"\nWould you like me to remind {subject}? If so, how should I remind them? "
-                    f"(e.g., email, SMS, Google Chat, Slack, Teams)\n"
-                    f"Also, could you clarify your relationship to {subject}? "
-                    f"(e.g., colleague, friend, acquaintance, family, private)\n"
-                    f"You can also include web URLs, screenshots, or files to help me assist you and stay true to the solution's mission and vision."
-                )
-        else:
-            response_text = ("I couldn't find anything relevant in memory. "
-                             "You can ask me to remember facts (e.g., 'Tommy should go at 2pm'), "
-                             "or ask about things I've learned (e.g., 'When should Tommy go?'). "
-                             "You can also include web URLs, screenshots, or files to help me assist you.")
-    else:
-        # Try to provide a more helpful fallback for general questions
-        response_text = (
-            "I'm not sure how to respond to that. "
-            "You can ask me to remember facts (e.g., 'Tommy should go at 2pm'), "
-            "or ask about things I've learned (e.g., 'When should Tommy go?'). "
-            "You can also include web URLs, screenshots, or files to help me assist you."
-        )
-
-    return jsonify({
-        "response": response_text,
-        "memory_stored": memory_stored,
-        "memory_context_found": memory_context_found
-    })
+    # Lightweight implementation doesn't use a vector DB
+    return jsonify(chat_router.dispatch(user_message, db=None, user_id=user_id))
 
 # Enhanced AI chat endpoint with file/screenshot support and memory search
 @chat_bp.route('/ai-chat-enhanced', methods=['POST'])
+@rate_limited('chat', ('user_id',))
 def ai_chat_enhanced():
     data = request.json or {}
     user_message = data.get('message', '')
@@ -97,78 +110,164 @@ def ai_chat_enhanced():
     if not user_message:
         return jsonify({"error": "No message provided"}), 400
 
-    # No longer need vector database - using lightweight memory functions
-    db = None  # Lightweight implementation doesn't use vector DB
-    response_text = ""
-    memory_stored = False
-    memory_context_found = False
-    parsed_schedule_info = None
-
-    schedule_match = re.search(r"(\w+)\s+should\s+go\s+at\s+(.+)", user_message, re.IGNORECASE)
-    if schedule_match:
-        parsed_schedule_info = {"name": schedule_match.group(1), "time": schedule_match.group(2)}
-
-    if user_message:
-        if is_statement_worth_remembering(user_message):
-            store_information_in_memory(db, user_id, user_message) # Pass db if needed
-            memory_stored = True
-            if parsed_schedule_info:
-                response_text = f"OK, {parsed_schedule_info['name']} should go at {parsed_schedule_info['time']}, today."
-            else:
-                response_text = f"OK, I've remembered that: \"{user_message}\""
-        elif is_question_seeking_memory(user_message):
-            context_results = search_memory_for_context(db, user_id, user_message) # Pass db if needed
-            context_texts = [item['text'] for item in context_results if 'text' in item]
-            context_for_prompt = " ".join(context_texts)
-            if context_for_prompt:
-                memory_context_found = True
-                response_text = f"Based on our previous conversation: {context_for_prompt}"
-                match = re.match(r"when should (\w+) go", user_message, re.IGNORECASE)
-                if match:
-                    subject = match.group(1)
-                    response_text += (
-                        f"\nWould you like me to remind {subject}? If so, how should I remind them? "
-                        f"(e.g., email, SMS, Google Chat, Slack, Teams)\n"
-                        f"Also, could you clarify your relationship to {subject}? "
-                        f"(e.g., colleague, friend, acquaintance, family, private)\n"
-                        f"You can also include web URLs, screenshots, or files to help me assist you and stay true to the solution's mission and vision."
-                    )
-            else:
-                response_text = ("I couldn't find anything relevant in memory. "
-                                 "You can ask me to remember facts (e.g., 'Tommy should go at 2pm'), "
-                                 "or ask about things I've learned (e.g., 'When should Tommy go?'). "
-                                 "You can also include web URLs, screenshots, or files to help me assist you.")
-        else:
-            response_text = ("I'm not sure how to respond to that. "
-                             "You can ask me to remember facts (e.g., 'Tommy should go at 2pm'), "
-                             "or ask about things I've learned (e.g., 'When should Tommy go?'). "
-                             "You can also include web URLs, screenshots, or files to help me assist you.")
-    
+    reply = chat_router.dispatch(user_message, db=None, user_id=user_id)
+    reply.update({"user_id": user_id, "files_processed": 0})
+    return jsonify(reply)
+
+CONTEXT_PREFIX = "Based on our previous conversation: "
+
+def _sse(event, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json_codec.dumps(payload)}\n\n"
+
+def _iter_text_chunks(text):
+    """Split a finished answer into word-sized token chunks (whitespace preserved)"""
+    start = 0
+    while start < len(text):
+        end = text.find(' ', start + 1)
+        end = len(text) if end == -1 else end
+        yield text[start:end]
+        start = end
+
+def _stream_chat_reply(user_message, user_id):
+    """Generate SSE events for a chat reply, flushing tokens as soon as they are known"""
+    intent = classify_message(user_message)
+    yield _sse('intent', {"kind": intent.kind, "name": intent.name})
+
+    streamed = ''
+    if intent.kind == WHO_IS:
+        # "Who is" answers always start with the context prefix, so flush it
+        # before the store scan (or the cached answer) runs
+        streamed = CONTEXT_PREFIX
+        yield _sse('token', {"text": streamed})
+
+    # The same handlers, and context cache, as /ai-chat-enhanced
+    reply = chat_router.handle(intent, db=None, user_id=user_id)
+    text = reply["response"]
+    for chunk in _iter_text_chunks(text[len(streamed):] if text.startswith(streamed) else text):
+        yield _sse('token', {"text": chunk})
+
+    reply.update({"user_id": user_id, "files_processed": 0})
+    yield _sse('done', reply)
+
+# Streaming variant of /ai-chat-enhanced (Server-Sent Events over chunked transfer)
+@chat_bp.route('/ai-chat-enhanced/stream', methods=['GET', 'POST'])
+@rate_limited('chat', ('user_id',))
+def ai_chat_enhanced_stream():
+    # GET supports EventSource clients; POST accepts the same body as /ai-chat-enhanced
+    data = request.get_json(silent=True) or request.args
+    user_message = data.get('message', '')
+    user_id = data.get('user_id', 'anonymous')
+
+    if not user_message:
+        return jsonify({"error": "No message provided"}), 400
+
+    return Response(
+        stream_with_context(_stream_chat_reply(user_message, user_id)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+# Idempotency results for /ai-chat/batch, keyed by (user_id, idempotency_key)
+MAX_BATCH_SIZE = 500
+MAX_BATCH_BYTES = 1024 * 1024
+MAX_IDEMPOTENCY_ENTRIES = 10000
+_idempotency_results = OrderedDict()
+_idempotency_lock = threading.Lock()
+_IN_FLIGHT = object()
+
+def _process_batch_item(index, item, user_id):
+    """Process one queued message; returns its per-item result"""
+    if isinstance(item, str):
+        item = {"message": item}
+    if not isinstance(item, dict):
+        return {"index": index, "status": "error", "error": "Invalid batch item"}
+
+    key = item.get('idempotency_key')
+    result = {"index": index, "idempotency_key": key}
+    message = item.get('message')
+    if not message or not isinstance(message, str):
+        result.update({"status": "error", "error": "No message provided"})
+        return result
+
+    cache_key = None if key is None else (user_id, str(key))
+    if cache_key is not None:
+        with _idempotency_lock:
+            previous = _idempotency_results.get(cache_key)
+            if previous is _IN_FLIGHT:
+                # Another request is processing this key right now; the client retries later
+                result.update({"status": "in_progress"})
+                return result
+            if previous is not None:
+                _idempotency_results.move_to_end(cache_key)
+                result.update(status="duplicate", **previous)
+                return result
+            _idempotency_results[cache_key] = _IN_FLIGHT
+
+    # A failing message fails only its own item, keyed or not
+    try:
+        reply = chat_router.dispatch(message, db=None, user_id=user_id)
+    except Exception as e:
+        if cache_key is not None:
+            with _idempotency_lock:
+                _idempotency_results.pop(cache_key, None)
+        result.update({"status": "error", "error": str(e)})
+        return result
+
+    if cache_key is not None:
+        with _idempotency_lock:
+            _idempotency_results[cache_key] = reply
+            while len(_idempotency_results) > MAX_IDEMPOTENCY_ENTRIES:
+                _idempotency_results.popitem(last=False)
+    result.update(status="ok", **reply)
+    return result
+
+def _batch_cost():
+    # A batch drains one chat token per queued message (capped at the bucket size)
+    data = request.get_json(silent=True)
+    messages = data.get('messages') if isinstance(data, dict) else None
+    return max(len(messages), 1) if isinstance(messages, list) else 1
+
+def _cap_batch_body(view):
+    """Reject an oversized batch before anything (the rate limiter included) reads it"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.content_length is not None and request.content_length > MAX_BATCH_BYTES:
+            return jsonify({"error": f"Batch too large (max {MAX_BATCH_BYTES} bytes)"}), 413
+        # Chunked uploads have no Content-Length: stop reading past the cap
+        request.max_content_length = MAX_BATCH_BYTES
+        return view(*args, **kwargs)
+    return wrapper
+
+@chat_bp.route('/ai-chat/batch', methods=['POST'])
+@_cap_batch_body
+@rate_limited('chat', ('user_id',), cost=_batch_cost)
+def ai_chat_batch():
+    """Process an ordered list of queued messages in one request (offline queue drain)"""
+    data = request.get_json(silent=True) or {}
+    user_id = data.get('user_id', 'anonymous')
+    messages = data.get('messages')
+
+    if not isinstance(messages, list) or not messages:
+        return jsonify({"error": "No messages provided"}), 400
+    if len(messages) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Batch too large (max {MAX_BATCH_SIZE} messages)"}), 413
+
+    results = [_process_batch_item(index, item, user_id) for index, item in enumerate(messages)]
+    summary = {status: sum(1 for r in results if r["status"] == status) for status in ("ok", "duplicate", "in_progress", "error")}
+
     return jsonify({
-        "response": response_text,
         "user_id": user_id,
-        "memory_stored": memory_stored,
-        "memory_context_found": memory_context_found,
-        "files_processed": 0 
+        "results": results,
+        "processed": summary["ok"],
+        "duplicates": summary["duplicate"],
+        "in_progress": summary["in_progress"],
+        "errors": summary["error"]
     })
 
-# Utility function to get build version (imported from main app)
-def get_build_version():
-    import os
-    import hashlib
-    try:
-        main_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'app.py'))
-        if os.path.exists(main_path):
-            stat = os.stat(main_path)
-            with open(main_path, 'rb') as f:
-                content = f.read()
-            version_hash = hashlib.sha1(content + str(stat.st_mtime).encode()).hexdigest()[:10]
-            return version_hash
-        else:
-            return get_env_id()[:10]
-    except Exception:
-        return get_env_id()[:10]
-
 @chat_bp.route("/home")
 def index():
     return render_template("index.html")
@@ -189,7 +288,7 @@ def env_id_endpoint():
     
     # Check if this is an AJAX request
     if request.headers.get('Accept') == 'application/json' or request.headers.get('Content-Type') == 'application/json':
-        return jsonify({"env_id": env_id})
+        return jsonify({"env_id": env_id, "build_version": get_build_version()})
     
     # Otherwise return the HTML page
     return render_template("env-id.html", env_id=env_id)
@@ -1,10 +1,15 @@
 # Client management routes for ICI Chat backend
 
 from flask import Blueprint, jsonify, request, render_template
-from backend.utils.id_utils import get_env_id, generate_secure_key
+from backend.utils.id_utils import get_env_id, generate_secure_key, request_identity
+from backend.utils import store_versions
+from backend.utils.http_cache import versioned_json
+from backend.utils.json_stream import json_listing
+from backend.utils.validation import validate_body
+from backend.utils.rate_limit import rate_limited
+from backend.models.payloads import ClientPing, ClientRegistration
 import time
 import os
-import hashlib
 
 client_bp = Blueprint('client', __name__)
 
@@ -16,57 +21,32 @@ client_json_table = []
 @client_bp.route("/client")
 def client_page():
     """Client information page"""
-    env_id = get_env_id()
-    
-    # Get client info from request headers and generate a client ID
-    user_agent = request.headers.get('User-Agent', 'Unknown')
-    public_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
-    if public_ip:
-        public_ip = public_ip.split(',')[0].strip()
-    else:
-        public_ip = 'unknown'
-    
-    # Generate a simple client ID for demo purposes
-    client_info = f"{env_id}|{public_ip}|{user_agent}"
-    client_id = hashlib.sha256(client_info.encode()).hexdigest()[:16]
+    # Client info from request headers; a simple client ID for demo purposes
+    identity = request_identity()
+    client_id = identity.private_id[:16]
     
     timestamp = int(time.time() * 1000)
     
     return render_template('client.html',
-                         env_id=env_id,
+                         env_id=identity.env_id,
                          client_id=client_id,
-                         public_ip=public_ip,
-                         user_agent=user_agent,
+                         public_ip=identity.public_ip,
+                         user_agent=identity.user_agent,
                          timestamp=timestamp,
                          private_id=client_id)  # Using client_id as private_id for simplicity
 
 @client_bp.route("/client-register", methods=["POST"])
-def client_register():
+@validate_body(ClientRegistration, force=True)
+def client_register(body: ClientRegistration):
     """Register a client with the backend, including email"""
     try:
-        data = request.get_json(force=True)
-        print('Received payload:', data)  # Debug print
-        # Validate required fields
-        required = ['env_id', 'client_id', 'public_ip', 'user_agent', 'timestamp', 'email']
-        for field in required:
-            if field not in data:
-                print(f"Missing field: {field}")  # Debug print
-                return jsonify({'error': f'Missing field: {field}'}), 400
-        # Validate client_id (must be 64-char hex)
-        client_id = data['client_id']
-        if not isinstance(client_id, str) or len(client_id) != 64 or not all(c in '0123456789abcdef' for c in client_id):
-            print('Invalid client_id format')  # Debug print
-            return jsonify({'error': 'Invalid client_id format'}), 400
-        # Validate email format
-        email = data['email']
-        import re
-        if not re.match(r'^\S+@\S+\.\S+$', email):
-            print('Invalid email format')  # Debug print
-            return jsonify({'error': 'Invalid email format'}), 400
-        env_id = data.get("env_id")
-        public_ip = data.get("public_ip")
-        user_agent = data.get("user_agent", "Unknown")
-        timestamp = data.get("timestamp", time.time() * 1000)
+        # Fields and formats (64-char hex client_id, email) already validated
+        env_id = body.env_id
+        client_id = body.client_id
+        public_ip = body.public_ip
+        user_agent = body.user_agent
+        timestamp = body.timestamp
+        email = body.email
         # Create client record
         client_record = {
             "env_id": env_id,
@@ -83,6 +63,7 @@ def client_register():
         # Update client table (remove duplicates and add new)
         client_json_table[:] = [c for c in client_json_table if c.get("client_id") != client_id or c.get("env_id") != env_id]
         client_json_table.append(client_record)
+        store_versions.bump(store_versions.CLIENTS, env_id)
         return jsonify({
             "success": True,
             "client_id": client_id,
@@ -100,18 +81,11 @@ def client_register_root():
     return client_register()
 
 @client_bp.route("/client-heartbeat", methods=["POST"])
-def client_heartbeat():
+@rate_limited('heartbeat', ('client_id',))
+@validate_body(ClientPing)
+def client_heartbeat(body: ClientPing):
     """Update client last seen timestamp"""
-    data = request.get_json()
-    if not data:
-        return jsonify({"error": "No data provided"}), 400
-    
-    env_id = data.get("env_id")
-    client_id = data.get("client_id")
-    timestamp = data.get("timestamp", time.time() * 1000)
-    
-    if not all([env_id, client_id]):
-        return jsonify({"error": "Missing required fields"}), 400
+    env_id, client_id, timestamp = body.env_id, body.client_id, body.timestamp
     
     client_key = f"{env_id}:{client_id}"
     if client_key in client_memory:
@@ -122,23 +96,28 @@ def client_heartbeat():
             if client.get("client_id") == client_id and client.get("env_id") == env_id:
                 client["last_seen"] = timestamp
                 break
+        store_versions.bump(store_versions.CLIENTS, env_id)
         
         return jsonify({"success": True, "last_seen": timestamp})
     else:
         return jsonify({"error": "Client not found"}), 404
 
 @client_bp.route("/clients")
+@versioned_json(store_versions.CLIENTS)
 def list_clients():
-    """List all registered clients"""
+    """List registered clients (paginated with ?offset=&limit=, streamed when large)"""
     env_id = request.args.get("env_id")
+    # Writers replace the table contents in place; iterate a snapshot of the rows
+    clients = tuple(client_json_table)
     
     if env_id:
         # Filter by environment ID
-        filtered_clients = [c for c in client_json_table if c.get("env_id") == env_id]
-        return jsonify({"clients": filtered_clients, "env_id": env_id})
+        total = sum(1 for c in clients if c.get("env_id") == env_id)
+        filtered_clients = (c for c in clients if c.get("env_id") == env_id)
+        return json_listing(filtered_clients, total, "clients", count_field=None, extra={"env_id": env_id})
     else:
         # Return all clients
-        return jsonify({"clients": client_json_table})
+        return json_listing(clients, len(clients), "clients", count_field=None)
 
 @client_bp.route("/client/<client_id>/data")
 def get_client_data(client_id):
@@ -181,6 +160,7 @@ def remove_client(client_id):
     removed = removed or len(client_json_table) < original_length
     
     if removed:
+        store_versions.bump(store_versions.CLIENTS, env_id)
         return jsonify({"success": True, "message": f"Client {client_id} removed"})
     else:
         return jsonify({"error": "Client not found"}), 404
@@ -236,6 +216,7 @@ def client_auth(client_id):
             break
     else:
         client_json_table.append(auth_record)
+    store_versions.bump(store_versions.CLIENTS, env_id)
     return render_template('client_auth.html',
                          client_id=client_id,
                          wallet_address=wallet_address,
@@ -243,16 +224,10 @@ def client_auth(client_id):
                          authenticated=True)
 
 @client_bp.route("/client-mfa-active", methods=["POST"])
-def client_mfa_active():
+@validate_body(ClientPing)
+def client_mfa_active(body: ClientPing):
     """Receive notification that a client has MFA (2+ active threads/tabs)."""
-    data = request.get_json()
-    if not data:
-        return jsonify({"error": "No data provided"}), 400
-    env_id = data.get("env_id")
-    client_id = data.get("client_id")
-    timestamp = data.get("timestamp", time.time() * 1000)
-    if not all([env_id, client_id]):
-        return jsonify({"error": "Missing required fields"}), 400
+    env_id, client_id, timestamp = body.env_id, body.client_id, body.timestamp
     client_key = f"{env_id}:{client_id}"
     # Update MFA status in memory
     if client_key in client_memory:
@@ -264,20 +239,15 @@ def client_mfa_active():
             client["mfa_active"] = True
             client["mfa_last_update"] = timestamp
             break
+    store_versions.bump(store_versions.CLIENTS, env_id)
     print(f"[MFA ACTIVE] Client {client_id} in env {env_id} at {timestamp}")
     return jsonify({"success": True, "mfa_active": True, "client_id": client_id, "env_id": env_id, "timestamp": timestamp})
 
 @client_bp.route("/client-mfa-lost", methods=["POST"])
-def client_mfa_lost():
+@validate_body(ClientPing)
+def client_mfa_lost(body: ClientPing):
     """Receive notification that a client has lost MFA (fewer than 2 active threads/tabs)."""
-    data = request.get_json()
-    if not data:
-        return jsonify({"error": "No data provided"}), 400
-    env_id = data.get("env_id")
-    client_id = data.get("client_id")
-    timestamp = data.get("timestamp", time.time() * 1000)
-    if not all([env_id, client_id]):
-        return jsonify({"error": "Missing required fields"}), 400
+    env_id, client_id, timestamp = body.env_id, body.client_id, body.timestamp
     client_key = f"{env_id}:{client_id}"
     # Update MFA status in memory
     if client_key in client_memory:
@@ -289,6 +259,7 @@ def client_mfa_lost():
             client["mfa_active"] = False
             client["mfa_last_update"] = timestamp
             break
+    store_versions.bump(store_versions.CLIENTS, env_id)
     print(f"[MFA LOST] Client {client_id} in env {env_id} at {timestamp}")
     return jsonify({"success": True, "mfa_active": False, "client_id": client_id, "env_id": env_id, "timestamp": timestamp})
 
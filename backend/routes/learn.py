@@ -1,5 +1,7 @@
-from flask import Blueprint, Response, render_template
+from flask import Blueprint, render_template
+import hashlib
 import markdown
+from backend.utils.http_cache import rendered_pages, template_paths
 
 learn_bp = Blueprint('learn', __name__)
 
@@ -37,6 +39,21 @@ LEARN_MARKDOWN = '''
 _Last updated: May 25, 2025_
 '''
 
+# LEARN_MARKDOWN only changes with the code, so its content hash is the cache key
+LEARN_MARKDOWN_HASH = hashlib.sha256(LEARN_MARKDOWN.encode('utf-8')).hexdigest()
+
 @learn_bp.route('/learn')
 def learn():
-    return render_template('learn.html', title="Learn: Using ICI Safely & Collaboratively")
+    def render():
+        return render_template('learn.html', title="Learn: Using ICI Safely & Collaboratively")
+    fingerprint = rendered_pages.fingerprint(*template_paths('learn.html'))
+    return rendered_pages.get('learn', fingerprint, render).response()
+
+@learn_bp.route('/learn/deployment')
+def learn_deployment():
+    """Lessons learned and deployment notes (LEARN_MARKDOWN), rendered once"""
+    def render():
+        html = markdown.markdown(LEARN_MARKDOWN, extensions=['fenced_code', 'extra'])
+        return render_template('markdown_render.html', content=html, title="Learn: Deployment & Dev Tips")
+    fingerprint = (LEARN_MARKDOWN_HASH, rendered_pages.fingerprint(*template_paths('markdown_render.html')))
+    return rendered_pages.get('learn-deployment', fingerprint, render).response()
@@ -3,6 +3,11 @@
 
 from flask import Blueprint, jsonify, request
 from backend.utils.id_utils import get_env_id
+from backend.utils import store_versions
+from backend.utils.http_cache import versioned_json
+from backend.utils.validation import validate_body
+from backend.utils.rate_limit import rate_limited
+from backend.models.payloads import EnvBoxUpdate, IpBoxUpdate
 import time
 
 memory_bp = Blueprint('memory', __name__)
@@ -12,6 +17,7 @@ env_box_store = {}  # key: env_id, value: {"env_id": "xxx", "value": [{"text": "
 ip_box_store = {}   # key: (env_id, public_ip), value: {"env_id": "xxx", "public_ip": "yyy", "value": [...]}
 
 @memory_bp.route("/env-box", methods=["GET"])
+@versioned_json(store_versions.ENV_BOX)
 def get_env_box():
     """Get shared memory for environment ID"""
     env_id = request.args.get('env_id')
@@ -23,17 +29,11 @@ def get_env_box():
     return jsonify(stored_data)
 
 @memory_bp.route("/env-box", methods=["POST"])
-def post_env_box():
+@rate_limited('memory', aggregate=('memory_env', 'env_id'))
+@validate_body(EnvBoxUpdate)
+def post_env_box(body: EnvBoxUpdate):
     """Store shared memory for environment ID"""
-    data = request.get_json()
-    if not data:
-        return jsonify({"error": "No data provided"}), 400
-    
-    env_id = data.get('env_id')
-    value = data.get('value', [])
-    
-    if not env_id:
-        return jsonify({"error": "Missing required field: env_id"}), 400
+    env_id, value = body.env_id, body.value
     
     # Store the data
     env_box_store[env_id] = {
@@ -41,6 +41,7 @@ def post_env_box():
         "value": value,
         "last_updated": time.time() * 1000
     }
+    store_versions.bump(store_versions.ENV_BOX, env_id)
     
     return jsonify({"success": True, "env_id": env_id, "stored_items": len(value)})
 
@@ -61,20 +62,11 @@ def get_ip_box():
     return jsonify(stored_data)
 
 @memory_bp.route("/ip-box", methods=["POST"])
-def post_ip_box():
+@rate_limited('memory', aggregate=('memory_env', 'env_id'))
+@validate_body(IpBoxUpdate)
+def post_ip_box(body: IpBoxUpdate):
     """Store IP-shared memory for environment ID and public IP"""
-    data = request.get_json()
-    if not data:
-        return jsonify({"error": "No data provided"}), 400
-    
-    env_id = data.get('env_id')
-    public_ip = data.get('public_ip')
-    value = data.get('value', [])
-    
-    if not env_id:
-        return jsonify({"error": "Missing required field: env_id"}), 400
-    if not public_ip:
-        return jsonify({"error": "Missing required field: public_ip"}), 400
+    env_id, public_ip, value = body.env_id, body.public_ip, body.value
     
     # Store the data
     key = (env_id, public_ip)
@@ -84,24 +76,44 @@ def post_ip_box():
         "value": value,
         "last_updated": time.time() * 1000
     }
+    store_versions.bump(store_versions.IP_BOX, env_id)
     
     return jsonify({"success": True, "env_id": env_id, "public_ip": public_ip, "stored_items": len(value)})
 
+@memory_bp.route("/memory/facts/<user_id>", methods=["GET"])
+def export_user_facts(user_id):
+    """Export one user's schedule facts"""
+    from backend.utils.memory_utils import export_user_memory
+    facts = export_user_memory(user_id)
+    return jsonify({"user_id": user_id, "facts": facts, "count": len(facts)})
+
+@memory_bp.route("/memory/facts/<user_id>", methods=["DELETE"])
+def clear_user_facts(user_id):
+    """Clear one user's schedule facts, leaving other tenants untouched"""
+    from backend.utils.memory_utils import clear_user_memory
+    removed = clear_user_memory(user_id)
+    return jsonify({"success": True, "user_id": user_id, "removed": removed})
+
 # Utility functions for admin/debug access
 def get_all_env_boxes():
     """Get all env-box data for admin access"""
     return env_box_store
 
+def env_box_items():
+    """Snapshot of the env-box (env_id, data) pairs, for streaming while the store is written"""
+    return list(env_box_store.items())
+
+def ip_box_items():
+    """Snapshot of the ip-box pairs, keyed "<env_id>_<public_ip>" for JSON serialization"""
+    return [(f"{env_id}_{public_ip}", data) for (env_id, public_ip), data in list(ip_box_store.items())]
+
 def get_all_ip_boxes():
     """Get all ip-box data for admin access"""
-    # Convert tuple keys to string keys for JSON serialization
-    serializable_store = {}
-    for (env_id, public_ip), data in ip_box_store.items():
-        key = f"{env_id}_{public_ip}"
-        serializable_store[key] = data
-    return serializable_store
+    return dict(ip_box_items())
 
 def clear_all_memory_stores():
     """Clear all memory stores"""
     env_box_store.clear()
     ip_box_store.clear()
+    store_versions.bump(store_versions.ENV_BOX)
+    store_versions.bump(store_versions.IP_BOX)
@@ -3,6 +3,12 @@
 from flask import Blueprint, jsonify, request
 from backend.models.vault import VaultEntry, UIElement, UserVault
 from backend.utils.id_utils import get_env_id
+from backend.utils import store_versions
+from backend.utils.http_cache import versioned_json
+from backend.utils.json_stream import json_listing
+from backend.utils.validation import validate_body
+from backend.utils.rate_limit import rate_limited
+from backend.models.payloads import VaultCollect, VaultSearch
 import time
 import json
 from typing import Dict, List
@@ -14,43 +20,35 @@ vault_bp = Blueprint('vault', __name__)
 user_vaults: Dict[str, UserVault] = {}
 
 @vault_bp.route("/vault/collect", methods=["POST"])
-def collect_vault_data():
+@rate_limited('vault', ('user_id',))
+@validate_body(VaultCollect)
+def collect_vault_data(body: VaultCollect):
     """Collect data from browser extension"""
-    data = request.get_json()
-    if not data:
-        return jsonify({"error": "No data provided"}), 400
-    
-    # Validate required fields
-    required_fields = ['user_id', 'tab_id', 'url', 'ui_element']
-    for field in required_fields:
-        if field not in data:
-            return jsonify({"error": f"Missing required field: {field}"}), 400
-    
     try:
         # Parse URL to get domain
-        parsed_url = urlparse(data['url'])
+        parsed_url = urlparse(body.url)
         domain = parsed_url.netloc
         
         # Create UI element
-        ui_element_data = data['ui_element']
+        ui_element_data = body.ui_element
         ui_element = UIElement(
-            selector=ui_element_data.get('selector', ''),
-            tag_name=ui_element_data.get('tag_name', ''),
-            text_content=ui_element_data.get('text_content', ''),
-            attributes=ui_element_data.get('attributes', {}),
-            position=ui_element_data.get('position', {})
+            selector=ui_element_data.selector,
+            tag_name=ui_element_data.tag_name,
+            text_content=ui_element_data.text_content,
+            attributes=ui_element_data.attributes,
+            position=ui_element_data.position
         )
         
         # Create vault entry
         vault_entry = VaultEntry(
-            user_id=data['user_id'],
-            tab_id=str(data['tab_id']),
-            url=data['url'],
+            user_id=body.user_id,
+            tab_id=body.tab_id,
+            url=body.url,
             domain=domain,
             ui_element=ui_element,
-            storage_data=data.get('storage_data'),
+            storage_data=body.storage_data,
             vector_embedding=None,  # No longer using vector embeddings
-            timestamp=data.get('timestamp', time.time() * 1000)
+            timestamp=body.timestamp
         )
         
         # Ensure entry_id is always a string
@@ -58,7 +56,7 @@ def collect_vault_data():
             vault_entry.entry_id = f"vault_{hash((vault_entry.user_id, vault_entry.url, vault_entry.ui_element.selector, vault_entry.timestamp))}_{int(vault_entry.timestamp)}"
         
         # Get or create user vault
-        user_id = data['user_id']
+        user_id = body.user_id
         if user_id not in user_vaults:
             user_vaults[user_id] = UserVault(
                 user_id=user_id,
@@ -69,6 +67,7 @@ def collect_vault_data():
         
         # Add entry to vault
         user_vaults[user_id].add_entry(vault_entry)
+        store_versions.bump(store_versions.VAULT, user_id)
         
         return jsonify({
             "success": True,
@@ -80,19 +79,13 @@ def collect_vault_data():
         return jsonify({"error": f"Failed to process data: {str(e)}"}), 500
 
 @vault_bp.route("/vault/search", methods=["POST"])
-def search_vault():
+@validate_body(VaultSearch)
+def search_vault(body: VaultSearch):
     """Search vault entries by text similarity - Lightweight text-based search"""
-    data = request.get_json()
-    if not data:
-        return jsonify({"error": "No data provided"}), 400
-    
-    user_id = data.get('user_id')
-    query_text = data.get('query_text')
-    domain_filter = data.get('domain')
-    limit = data.get('limit', 10)
-    
-    if not user_id or not query_text:
-        return jsonify({"error": "Missing user_id or query_text"}), 400
+    user_id = body.user_id
+    query_text = body.query_text
+    domain_filter = body.domain
+    limit = body.limit
     
     # Simple text-based search (case-insensitive)
     query_lower = query_text.lower()
@@ -134,22 +127,18 @@ def search_vault():
     })
 
 @vault_bp.route("/vault/entries/<user_id>", methods=["GET"])
+@versioned_json(store_versions.VAULT, key=lambda user_id: user_id)
 def get_user_entries(user_id):
-    """Get all entries for a user"""
-    if user_id not in user_vaults:
-        return jsonify({"entries": [], "count": 0})
-    
-    vault = user_vaults[user_id]
+    """Get a user's entries (paginated with ?offset=&limit=, streamed when large)"""
+    vault = user_vaults.get(user_id)
+    entries = vault.entries if vault else []
     domain_filter = request.args.get('domain')
     
-    entries = vault.entries
     if domain_filter:
-        entries = vault.get_entries_by_domain(domain_filter)
-    
-    return jsonify({
-        "entries": [entry.to_dict() for entry in entries],
-        "count": len(entries)
-    })
+        total = sum(1 for entry in entries if entry.domain == domain_filter)
+        matching = (entry for entry in entries if entry.domain == domain_filter)
+        return json_listing(matching, total, "entries", serialize=VaultEntry.to_dict)
+    return json_listing(entries, len(entries), "entries", serialize=VaultEntry.to_dict)
 
 @vault_bp.route("/vault/domains/<user_id>", methods=["GET"])
 def get_user_domains(user_id):
@@ -187,6 +176,7 @@ def clear_user_vault(user_id):
     """Clear all entries for a user"""
     if user_id in user_vaults:
         del user_vaults[user_id]
+        store_versions.bump(store_versions.VAULT, user_id)
     
     return jsonify({"success": True, "message": "Vault cleared"})
 
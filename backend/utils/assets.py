@@ -0,0 +1,106 @@
+# backend/utils/assets.py
+"""
+Fingerprinted static assets.
+The build step copies every file under static/ to static/dist/ with a content
+hash in its name (js/app.js -> js/app.3f2a9c1b0d.js), writes gzip/brotli
+variants next to it and a manifest.json mapping source paths to hashed ones.
+Templates link assets through asset_url(), and /assets/ serves the hashed
+files as immutable so browsers never re-request them.
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from typing import Dict, Optional
+
+from flask import Blueprint, abort, current_app, send_from_directory
+
+from backend.utils.http_cache import compress, negotiate_encoding
+
+DIST_DIR_NAME = 'dist'
+MANIFEST_NAME = 'manifest.json'
+ASSETS_URL_PREFIX = '/assets'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+assets_bp = Blueprint('assets', __name__)
+
+
+def _hashed_name(path: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest}{ext}"
+
+
+def build_assets(static_dir: str) -> Dict[str, str]:
+    """Rebuild static/dist and its manifest; returns the manifest"""
+    dist_dir = os.path.join(static_dir, DIST_DIR_NAME)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != dist_dir)
+        for filename in sorted(files):
+            source = os.path.join(root, filename)
+            path = os.path.relpath(source, static_dir).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                content = f.read()
+            hashed = _hashed_name(path, content)
+            target = os.path.join(dist_dir, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(content)
+            for encoding, data in compress(content).items():
+                with open(target + ENCODING_SUFFIXES[encoding], 'wb') as f:
+                    f.write(data)
+            manifest[path] = hashed
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_dir: str) -> Dict[str, str]:
+    """The build manifest, or an empty one when assets haven't been built"""
+    try:
+        with open(os.path.join(static_dir, DIST_DIR_NAME, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def asset_url(path: str) -> str:
+    """URL for a static asset: fingerprinted when built, plain /static/ otherwise"""
+    hashed: Optional[str] = current_app.config.get('ASSET_MANIFEST', {}).get(path)
+    if hashed:
+        return f"{ASSETS_URL_PREFIX}/{hashed}"
+    return f"{current_app.static_url_path}/{path}"
+
+
+def init_assets(app) -> None:
+    """Load the manifest once and expose asset_url to templates"""
+    app.config['ASSET_MANIFEST'] = load_manifest(app.static_folder)
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.register_blueprint(assets_bp)
+
+
+@assets_bp.route(f"{ASSETS_URL_PREFIX}/<path:filename>")
+def serve_asset(filename):
+    """Serve a fingerprinted asset (precompressed when possible), cached forever"""
+    dist_dir = os.path.join(current_app.static_folder, DIST_DIR_NAME)
+    if filename == MANIFEST_NAME or filename.endswith(tuple(ENCODING_SUFFIXES.values())):
+        abort(404)
+    available = {
+        encoding for encoding, suffix in ENCODING_SUFFIXES.items()
+        if os.path.exists(os.path.join(dist_dir, filename + suffix))
+    }
+    encoding = negotiate_encoding(available)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    served = filename + ENCODING_SUFFIXES[encoding] if encoding else filename
+    response = send_from_directory(dist_dir, served, mimetype=mimetype, max_age=31536000)
+    response.headers['Cache-Control'] = IMMUTABLE
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,429 @@
+# backend/utils/fact_store.py
+"""
+Structured fact store for "X should go at Y" schedule facts.
+Times are parsed into minutes since midnight and kept in a per-user sorted
+index, so range questions ("who goes before 3pm") and "what's next" are
+answered with a binary search instead of scanning every fact. Users are
+hash-partitioned across shards that each have their own lock, so concurrent
+writes from different users don't contend. Facts can be persisted to
+append-only JSONL logs, one per shard (facts.jsonl -> facts.0.jsonl, ...),
+compacted as they grow and replayed at startup.
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import logging
+import threading
+import zlib
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Cross-process locking of shared log files (POSIX only)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# A shard's log is compacted once it holds this many records, and twice as
+# many as the shard has live facts
+LOG_COMPACT_MIN_RECORDS = 1000
+
+_TIME_PATTERN = re.compile(
+    r"^\s*(?:at\s+)?(?:(?P<noon>noon|midday)|(?P<midnight>midnight)|"
+    r"(?P<hour>\d{1,2})(?:[:.](?P<minute>\d{2}))?\s*(?:(?P<ampm>[ap])\.?\s*m\.?\b|o'?clock\b)?)",
+    re.IGNORECASE
+)
+
+
+def parse_time_of_day(text: str) -> Optional[int]:
+    """
+    Parse the leading time in free text ("2pm", "2:30 pm", "14:00", "noon")
+    into minutes since midnight; returns None when no time is recognised
+    """
+    match = _TIME_PATTERN.match(text or '')
+    if not match:
+        return None
+    if match.group('noon'):
+        return 12 * 60
+    if match.group('midnight'):
+        return 0
+
+    hour = int(match.group('hour'))
+    minute = int(match.group('minute') or 0)
+    ampm = (match.group('ampm') or '').lower()
+    if minute > 59:
+        return None
+    if ampm:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if ampm == 'p' else 0)
+    elif hour > 23:
+        return None
+    return hour * 60 + minute
+
+
+def format_minutes(minutes: int) -> str:
+    """Format minutes since midnight as e.g. '2:30 PM'"""
+    hour, minute = divmod(minutes, 60)
+    return f"{hour % 12 or 12}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+@dataclass
+class ScheduleFact:
+    """A single "X should go at Y" fact"""
+    user_id: str
+    name: str                 # normalized (lowercase) person name
+    time_text: str            # time exactly as the user said it
+    minutes: Optional[int]    # minutes since midnight, None if unparseable
+    created_at: float
+
+    def scheduled_at(self, day: Optional[datetime] = None) -> Optional[datetime]:
+        """Normalized timestamp for this fact on a given day (default today)"""
+        if self.minutes is None:
+            return None
+        day = (day or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        return day + timedelta(minutes=self.minutes)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _FactShard:
+    """
+    One partition of the fact store: facts grouped by user, a sorted
+    (minutes, name) schedule index per user, its own lock and size counters
+    """
+
+    def __init__(self):
+        self.facts: Dict[str, Dict[str, ScheduleFact]] = {}
+        self.schedule: Dict[str, List[Tuple[int, str]]] = {}
+        self.lock = threading.Lock()
+        self.size = 0
+        self.log: Optional['_ShardLog'] = None
+
+    def put(self, fact: ScheduleFact) -> None:
+        user_facts = self.facts.setdefault(fact.user_id, {})
+        previous = user_facts.get(fact.name)
+        if previous is not None:
+            self._unindex(previous)
+        else:
+            self.size += 1
+        user_facts[fact.name] = fact
+        if fact.minutes is not None:
+            insort(self.schedule.setdefault(fact.user_id, []), (fact.minutes, fact.name))
+
+    def _unindex(self, fact: ScheduleFact) -> None:
+        index = self.schedule.get(fact.user_id)
+        if not index or fact.minutes is None:
+            return
+        position = bisect_left(index, (fact.minutes, fact.name))
+        if position < len(index) and index[position] == (fact.minutes, fact.name):
+            del index[position]
+
+    def clear_user(self, user_id: str) -> int:
+        """Drop one tenant's facts in O(tenant size); returns how many were removed"""
+        removed = len(self.facts.pop(user_id, {}))
+        self.schedule.pop(user_id, None)
+        self.size -= removed
+        return removed
+
+    def clear(self) -> None:
+        self.facts.clear()
+        self.schedule.clear()
+        self.size = 0
+
+    def facts_in(self, user_id: str, entries: List[Tuple[int, str]]) -> List[ScheduleFact]:
+        user_facts = self.facts[user_id]
+        return [user_facts[name] for _, name in entries]
+
+
+class FactStore:
+    """
+    Schedule facts hash-partitioned by user_id into independently locked shards
+    Writes from different users rarely contend; point lookups are O(1), range
+    and next queries O(log n + k), and per-tenant clear/export O(tenant size)
+    """
+
+    def __init__(self, log_path: Optional[str] = None, shards: int = 16):
+        self.log_path = log_path
+        self._shards = [_FactShard() for _ in range(max(1, shards))]
+        if log_path:
+            for index, shard in enumerate(self._shards):
+                shard.log = _ShardLog(self._shard_log_path(index))
+
+    def _shard(self, user_id: str) -> _FactShard:
+        # crc32 is stable across processes, unlike hash() on str
+        return self._shards[zlib.crc32(user_id.encode('utf-8')) % len(self._shards)]
+
+    # --- writes -----------------------------------------------------------
+
+    def set(self, user_id: str, name: str, time_text: str) -> ScheduleFact:
+        """Store (or replace) a fact and index its parsed time"""
+        fact = ScheduleFact(
+            user_id=user_id,
+            name=name.strip().lower(),
+            time_text=time_text.strip(),
+            minutes=parse_time_of_day(time_text),
+            created_at=time.time()
+        )
+        shard = self._shard(user_id)
+        with shard.lock:
+            shard.put(fact)
+            self._log(shard, {"op": "set", **fact.to_dict()})
+        return fact
+
+    def clear(self, user_id: Optional[str] = None) -> int:
+        """Clear facts for one user, or for everyone; returns how many were removed"""
+        if user_id is not None:
+            shard = self._shard(user_id)
+            with shard.lock:
+                removed = shard.clear_user(user_id)
+                self._log(shard, {"op": "clear", "user_id": user_id})
+            return removed
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += shard.size
+                shard.clear()
+                self._log(shard, {"op": "clear", "user_id": None})
+        return removed
+
+    # --- reads ------------------------------------------------------------
+
+    def get(self, user_id: str, name: str) -> Optional[ScheduleFact]:
+        return self._shard(user_id).facts.get(user_id, {}).get(name.strip().lower())
+
+    def before(self, user_id: str, minutes: int) -> List[ScheduleFact]:
+        """Facts scheduled strictly before a time, earliest first"""
+        shard = self._shard(user_id)
+        with shard.lock:
+            index = shard.schedule.get(user_id, [])
+            end = bisect_left(index, (minutes, ''))
+            return shard.facts_in(user_id, index[:end])
+
+    def after(self, user_id: str, minutes: int) -> List[ScheduleFact]:
+        """Facts scheduled strictly after a time, earliest first"""
+        shard = self._shard(user_id)
+        with shard.lock:
+            index = shard.schedule.get(user_id, [])
+            start = bisect_left(index, (minutes + 1, ''))
+            return shard.facts_in(user_id, index[start:])
+
+    def next(self, user_id: str, now_minutes: Optional[int] = None) -> List[ScheduleFact]:
+        """Facts sharing the earliest time at or after now"""
+        if now_minutes is None:
+            now = datetime.now()
+            now_minutes = now.hour * 60 + now.minute
+        shard = self._shard(user_id)
+        with shard.lock:
+            index = shard.schedule.get(user_id, [])
+            start = bisect_left(index, (now_minutes, ''))
+            if start == len(index):
+                return []
+            next_minutes = index[start][0]
+            end = bisect_left(index, (next_minutes + 1, ''), lo=start)
+            return shard.facts_in(user_id, index[start:end])
+
+    def for_user(self, user_id: str) -> List[ScheduleFact]:
+        shard = self._shard(user_id)
+        with shard.lock:
+            return list(shard.facts.get(user_id, {}).values())
+
+    def export(self, user_id: str) -> List[dict]:
+        """One tenant's facts as dictionaries, in O(tenant size)"""
+        return [fact.to_dict() for fact in self.for_user(user_id)]
+
+    def stats(self) -> dict:
+        """Per-shard size accounting"""
+        shard_sizes = [shard.size for shard in self._shards]
+        return {
+            "shards": len(self._shards),
+            "total_facts": sum(shard_sizes),
+            "total_users": sum(len(shard.facts) for shard in self._shards),
+            "shard_sizes": shard_sizes
+        }
+
+    def __len__(self) -> int:
+        return sum(shard.size for shard in self._shards)
+
+    # --- persistence ------------------------------------------------------
+
+    def _shard_log_path(self, index: int) -> str:
+        root, ext = os.path.splitext(self.log_path)
+        return f"{root}.{index}{ext}"
+
+    def _log(self, shard: _FactShard, record: dict) -> None:
+        # Caller holds shard.lock, so each shard's log is in the order its writes reached memory
+        if shard.log is None:
+            return
+        try:
+            shard.log.append(record)
+            if shard.log.records > max(LOG_COMPACT_MIN_RECORDS, 2 * shard.size):
+                self._compact(shard)
+        except OSError as e:
+            logger.warning(f"Failed to persist fact to {shard.log.path}: {e}")
+
+    def _compact(self, shard: _FactShard) -> None:
+        """
+        Rewrite a shard's log as one record per live fact. The log file is
+        folded rather than this process's memory, so records appended by other
+        workers sharing the path survive
+        """
+        with shard.log.locked(exclusive=True):
+            scratch = _FactShard()
+            self._apply_records(_read_log(shard.log.path), lambda user_id: scratch)
+            shard.log.rewrite(_snapshot(scratch))
+
+    def _apply_records(self, records: Iterable[dict], shard_for: Callable[[str], _FactShard]) -> int:
+        """Apply one log file's records; returns how many were applied"""
+        applied = 0
+        users = set()
+        for record in records:
+            try:
+                op = record.pop('op', None)
+                if op == 'set':
+                    fact = ScheduleFact(**record)
+                    shard = shard_for(fact.user_id)
+                    with shard.lock:
+                        shard.put(fact)
+                    users.add(fact.user_id)
+                elif op == 'clear':
+                    # A store-wide clear is logged to every shard's file and
+                    # covers the users that file holds
+                    user_id = record.get('user_id')
+                    for user in ([user_id] if user_id is not None else list(users)):
+                        shard = shard_for(user)
+                        with shard.lock:
+                            shard.clear_user(user)
+                        users.discard(user)
+                else:
+                    continue
+            except (TypeError, KeyError, AttributeError) as e:
+                # Well-formed JSON with the wrong shape: skip it, keep the rest
+                logger.warning(f"Skipping malformed fact record: {e}")
+                continue
+            applied += 1
+        return applied
+
+    def replay(self) -> int:
+        """Rebuild the store from the shard logs; returns the number of records applied"""
+        if not self.log_path:
+            return 0
+        root, ext = os.path.splitext(self.log_path)
+        shard_file = re.compile(re.escape(root) + r'\.(\d+)' + re.escape(ext))
+        indexed = sorted((int(match.group(1)), path)
+                         for path in glob.glob(glob.escape(root) + '.*' + glob.escape(ext))
+                         if (match := shard_file.fullmatch(path)))
+        # A single-file log from before sharding is older than any shard file
+        paths = ([self.log_path] if os.path.exists(self.log_path) else []) + [path for _, path in indexed]
+        applied = 0
+        misplaced = []
+
+        def shard_for(user_id: str, path: str) -> _FactShard:
+            shard = self._shard(user_id)
+            if shard.log.path != path:
+                misplaced.append(path)
+            return shard
+
+        for path in paths:
+            applied += self._apply_records(_read_log(path), lambda user_id: shard_for(user_id, path))
+
+        current = {shard.log.path for shard in self._shards}
+        stale = [path for path in paths if path not in current]
+        if stale or misplaced:
+            # Written with another shard count (or unsharded): rewrite in this layout
+            for shard in self._shards:
+                with shard.lock, shard.log.locked(exclusive=True):
+                    shard.log.rewrite(_snapshot(shard))
+            for path in stale:
+                for leftover in (path, path + '.lock'):
+                    try:
+                        os.remove(leftover)
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logger.warning(f"Failed to remove migrated fact log {leftover}: {e}")
+        logger.info(f"Replayed {applied} fact record(s) from {len(paths)} log file(s)")
+        return applied
+
+
+def _read_log(path: str) -> Iterator[dict]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # Tolerate a torn final line
+    except FileNotFoundError:
+        return
+
+
+def _snapshot(shard: _FactShard) -> List[dict]:
+    return [{"op": "set", **fact.to_dict()} for user_facts in shard.facts.values() for fact in user_facts.values()]
+
+
+class _ShardLog:
+    """
+    One shard's append-only JSONL log, kept open between writes. Processes
+    sharing the path (gunicorn workers) append under a shared flock on a
+    sidecar lock file; compaction takes it exclusively and replaces the file,
+    and appenders then reopen the new one. Callers hold the shard's lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = 0        # appended by this process since the file was last rewritten
+        self._file = None
+        self._lock_file = None
+
+    @contextmanager
+    def locked(self, exclusive: bool = False):
+        if fcntl is None:
+            yield
+            return
+        if self._lock_file is None:
+            self._lock_file = open(self.path + '.lock', 'a')
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _replaced(self) -> bool:
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except OSError:
+            return True
+
+    def append(self, record: dict) -> None:
+        with self.locked():
+            if self._file is None or self._replaced():
+                self.close()
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+        self.records += 1
+
+    def rewrite(self, records: List[dict]) -> None:
+        """Atomically replace the file's contents (caller holds the exclusive lock)"""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+        os.replace(temp_path, self.path)
+        self.close()
+        self.records = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,332 @@
+# backend/utils/http_cache.py
+"""
+Precompressed, ETag-validated response bodies.
+A body is encoded once (identity, gzip and, when the brotli package is
+installed, br) together with a strong ETag; each request then only negotiates
+an encoding or answers 304 Not Modified. Compressed variants are different
+bytes, so each carries its own strong ETag ("<tag>-gzip", "<tag>-br").
+JSON API routes derive their ETag from store version counters instead of the
+body (versioned_json), and any other large JSON response is compressed on the
+way out (init_json_compression).
+"""
+
+import functools
+import gzip
+import hashlib
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Optional
+
+from flask import Response, current_app, request
+from jinja2 import TemplateSyntaxError
+from jinja2 import meta as jinja2_meta
+
+from backend.utils import store_versions
+
+# Only use brotli if available (optional dependency)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    brotli = None
+
+# Smaller bodies aren't worth compressing (framing overhead, CPU)
+MIN_COMPRESS_SIZE = int(os.getenv('HTTP_COMPRESS_MIN_SIZE', '1024'))
+
+# Dynamic JSON is compressed once per data version, so favour speed over ratio
+JSON_GZIP_LEVEL = 6
+JSON_BROTLI_QUALITY = 5
+
+# Store versions restart at 0 with the process (and differ per worker), so
+# versioned ETags carry a per-process prefix that old copies can never match
+_ETAG_GENERATION = secrets.token_hex(4)
+
+
+# Suffix appended inside the quotes of a content-encoded variant's ETag
+ETAG_ENCODING_SUFFIXES = {'gzip': '-gzip', 'br': '-br'}
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag of the body's variant in the given Content-Encoding ("x" -> "x-gzip")"""
+    if not encoding:
+        return etag
+    return etag[:-1] + ETAG_ENCODING_SUFFIXES[encoding] + '"'
+
+
+def _base_etag(tag: str) -> str:
+    tag = tag.strip().removeprefix('W/')
+    for suffix in ETAG_ENCODING_SUFFIXES.values():
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def etag_matches(etag: str) -> bool:
+    """Whether the request's If-None-Match names this ETag or any encoded variant of it"""
+    if_none_match = request.headers.get('If-None-Match', '')
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # Weak comparison: W/"x" matches "x" (proxies may weaken compressed variants);
+    # a cached gzip copy is as current as the identity body it was encoded from
+    candidates = {_base_etag(tag) for tag in if_none_match.split(',')}
+    return etag in candidates
+
+
+def negotiate_encoding(available) -> Optional[str]:
+    """Best encoding the client accepts among those available (br > gzip)"""
+    accepted = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in available and accepted[encoding]:
+            return encoding
+    return None
+
+
+def template_path(name: str) -> str:
+    """Filesystem path of an app template, for fingerprinting"""
+    return os.path.join(current_app.root_path, current_app.template_folder, name)
+
+
+# Template name -> (its stat fingerprint, names it includes/extends/imports)
+_template_references: Dict[str, tuple] = {}
+
+
+def _referenced_templates(name: str) -> tuple:
+    path = template_path(name)
+    fingerprint = RenderedContentCache.fingerprint(path)
+    cached = _template_references.get(name)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+    try:
+        with open(path, encoding='utf-8') as f:
+            parsed = current_app.jinja_env.parse(f.read())
+        # Dynamic names (include some_variable) come back as None
+        references = tuple(ref for ref in jinja2_meta.find_referenced_templates(parsed) if ref)
+    except (OSError, TemplateSyntaxError):
+        references = ()
+    _template_references[name] = (fingerprint, references)
+    return references
+
+
+def template_paths(name: str) -> tuple:
+    """Paths of a template and every template it pulls in (_header.html, ...), for fingerprinting"""
+    names = []
+    pending = [name]
+    while pending:
+        current = pending.pop()
+        if current not in names:
+            names.append(current)
+            pending.extend(_referenced_templates(current))
+    return tuple(template_path(current) for current in names)
+
+
+def compress(body: bytes, gzip_level: int = 9, brotli_quality: int = 11) -> Dict[str, bytes]:
+    """Precomputed compressed variants of a body, skipping ones that don't help"""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return {}
+    variants = {'gzip': gzip.compress(body, compresslevel=gzip_level, mtime=0)}
+    if BROTLI_AVAILABLE:
+        variants['br'] = brotli.compress(body, quality=brotli_quality)
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+
+def not_modified(etag: str, cache_control: str = 'no-cache') -> Response:
+    return Response(status=304, headers={
+        'ETag': etag, 'Cache-Control': cache_control, 'Vary': 'Accept-Encoding'
+    })
+
+
+@dataclass
+class CachedBody:
+    """A response body with its ETag and precompressed variants"""
+    body: bytes
+    mimetype: str
+    etag: str = ''
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)   # extra response headers
+
+    def __post_init__(self):
+        self.etag = self.etag or compute_etag(self.body)
+        if not self.encoded:
+            self.encoded = compress(self.body)
+
+    def response(self, cache_control: str = 'no-cache') -> Response:
+        """304 if the client's copy is current, else the best encoded body"""
+        encoding = negotiate_encoding(self.encoded)
+        etag = encoded_etag(self.etag, encoding)
+        if etag_matches(self.etag):
+            return not_modified(etag, cache_control)
+        headers = {**self.headers, 'ETag': etag, 'Cache-Control': cache_control,
+                   'Vary': 'Accept-Encoding'}
+        if encoding:
+            headers['Content-Encoding'] = encoding
+            return Response(self.encoded[encoding], mimetype=self.mimetype, headers=headers)
+        return Response(self.body, mimetype=self.mimetype, headers=headers)
+
+
+class RenderedContentCache:
+    """
+    Rendered pages keyed by the stat (mtime, size) of their source files.
+    A changed stat triggers a re-render; if the rendered bytes are identical
+    the previous entry (and ETag) is kept, so browsers still get 304s.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, tuple] = {}   # key -> (fingerprint, CachedBody)
+        self._lock = threading.Lock()
+        self.renders = 0
+
+    @staticmethod
+    def fingerprint(*paths: str) -> tuple:
+        stats = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                stats.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stats.append(None)
+        return tuple(stats)
+
+    def get(self, key: Hashable, fingerprint: Hashable, render: Callable[[], str],
+            mimetype: str = 'text/html') -> CachedBody:
+        """Cached body for key, re-rendered only when the fingerprint changes"""
+        cached = self._entries.get(key)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+        body = render().encode('utf-8')
+        self.renders += 1
+        if cached and cached[1].body == body:
+            entry = cached[1]
+        else:
+            entry = CachedBody(body, mimetype)
+        with self._lock:
+            self._entries[key] = (fingerprint, entry)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared cache for rendered markdown/static pages (/readme, /learn)
+rendered_pages = RenderedContentCache()
+
+
+def versioned_etag(versions: tuple) -> str:
+    """Strong ETag for the current URL and requested media type at the given store versions"""
+    identity = f"{_ETAG_GENERATION}|{request.full_path}|{request.accept_mimetypes.best}|{versions}"
+    return '"v-' + hashlib.sha256(identity.encode()).hexdigest()[:32] + '"'
+
+
+class VersionedResponseCache:
+    """Encoded JSON bodies by versioned ETag, least recently used evicted first"""
+
+    def __init__(self, max_entries: int = 256):
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.hits += 1
+            return entry
+
+    def put(self, etag: str, entry: CachedBody):
+        with self._lock:
+            self._entries[etag] = entry
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def versioned_json(*stores: str, key: Optional[Callable[..., Hashable]] = None):
+    """
+    Decorator for read-only JSON routes over the in-memory stores.
+    The ETag comes from the stores' version counters (per key when key(**view_args)
+    is given, e.g. one user's vault), so If-None-Match is answered 304 before the
+    view runs, and a changed-or-new client gets the body encoded once per version
+    (streamed listings get the ETag but aren't cached).
+    Every write path to those stores must bump store_versions.
+    """
+    def decorator(view):
+        cache = VersionedResponseCache()
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            item = key(**kwargs) if key else None
+            # Versions are read before the view runs: a concurrent write can only
+            # make the cached body newer than its ETag, never older
+            etag = versioned_etag(tuple(store_versions.get(store, item) for store in stores))
+            if etag_matches(etag):
+                entry = cache.get(etag)
+                return entry.response() if entry else not_modified(etag)
+            entry = cache.get(etag)
+            if entry is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if response.is_streamed:
+                    # Too large to keep in memory (json_stream): revalidated, not cached
+                    response.headers['ETag'] = encoded_etag(etag, response.headers.get('Content-Encoding'))
+                    response.headers['Cache-Control'] = 'no-cache'
+                    return response
+                if not response.is_json:
+                    return response
+                body = response.get_data()
+                extra_headers = {name: value for name, value in response.headers.items()
+                                 if name not in ('Content-Type', 'Content-Length')}
+                entry = CachedBody(body, response.mimetype, etag=etag,
+                                   encoded=compress(body, JSON_GZIP_LEVEL, JSON_BROTLI_QUALITY),
+                                   headers=extra_headers)
+                cache.put(etag, entry)
+            return entry.response()
+
+        wrapper.response_cache = cache
+        return wrapper
+    return decorator
+
+
+def compress_json_response(response: Response) -> Response:
+    """after_request hook: compress large JSON responses the client accepts encoded"""
+    if (response.status_code != 200 or not response.is_json or response.is_streamed
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(('br', 'gzip') if BROTLI_AVAILABLE else ('gzip',))
+    body = response.get_data()
+    if not encoding or len(body) < MIN_COMPRESS_SIZE:
+        return response
+    if encoding == 'br':
+        data = brotli.compress(body, quality=JSON_BROTLI_QUALITY)
+    else:
+        data = gzip.compress(body, compresslevel=JSON_GZIP_LEVEL, mtime=0)
+    if len(data) < len(body):
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        if 'ETag' in response.headers:
+            response.headers['ETag'] = encoded_etag(response.headers['ETag'], encoding)
+    return response
+
+
+def init_json_compression(app):
+    app.after_request(compress_json_response)
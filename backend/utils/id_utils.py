@@ -1,17 +1,85 @@
 # Utility functions for ID and hash generation
 import hashlib
+import os
 import sys
 import platform
 import secrets
+from dataclasses import dataclass
+from functools import cached_property
 
-def get_env_id():
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+def _compute_env_id():
     info = f"{sys.executable}|{sys.version}|{platform.platform()}|{platform.python_implementation()}"
     return hashlib.sha256(info.encode()).hexdigest()
 
+def _compute_build_version():
+    """
+    Build version, in order of preference: BUILD_VERSION baked into the image
+    (Docker build arg), a BUILD_VERSION file next to app.py, or a hash of app.py
+    for local development
+    """
+    baked = os.getenv('BUILD_VERSION', '').strip()
+    if baked:
+        return baked[:10]
+    try:
+        with open(os.path.join(PROJECT_ROOT, 'BUILD_VERSION'), encoding='utf-8') as f:
+            baked = f.read().strip()
+        if baked:
+            return baked[:10]
+    except OSError:
+        pass
+    try:
+        main_path = os.path.join(PROJECT_ROOT, 'app.py')
+        stat = os.stat(main_path)
+        with open(main_path, 'rb') as f:
+            content = f.read()
+        return hashlib.sha1(content + str(stat.st_mtime).encode()).hexdigest()[:10]
+    except OSError:
+        return ENV_ID[:10]
+
+# Process identity, computed once at import
+ENV_ID = _compute_env_id()
+BUILD_VERSION = _compute_build_version()
+
+def get_env_id():
+    return ENV_ID
+
+def get_build_version():
+    return BUILD_VERSION
+
 def get_private_id(env_id, public_ip, user_agent):
     info = f"{env_id}|{public_ip}|{user_agent}"
     return hashlib.sha256(info.encode()).hexdigest()
 
+@dataclass(frozen=True)
+class RequestIdentity:
+    """Who is calling: process identity plus the caller's IP and user agent"""
+    env_id: str
+    build_version: str
+    public_ip: str
+    user_agent: str
+
+    @cached_property
+    def private_id(self):
+        return get_private_id(self.env_id, self.public_ip, self.user_agent)
+
+def request_identity():
+    """Identity of the current request, built once and cached on flask.g"""
+    from flask import g, request
+    identity = g.get('identity')
+    if identity is None:
+        public_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
+        public_ip = public_ip.split(',')[0].strip() if public_ip else 'unknown'
+        identity = RequestIdentity(
+            env_id=ENV_ID,
+            build_version=BUILD_VERSION,
+            public_ip=public_ip,
+            user_agent=request.headers.get('User-Agent', 'Unknown')
+        )
+        g.identity = identity
+    return identity
+
 def generate_secure_key():
     """Generate a secure random key"""
     return secrets.token_hex(32)  # 256 bits = 32 bytes = 64 hex chars
@@ -0,0 +1,104 @@
+# backend/utils/intent_router.py
+"""
+Intent classification and dispatch for ICI Chat messages.
+All intent patterns are compiled once into a single combined matcher so a
+message is classified in one regex pass, then dispatched to the handler
+registered for its intent.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+# Intent kinds
+REMEMBER_SCHEDULE = 'remember_schedule'   # "Tommy should go at 2pm"
+ASK_SCHEDULE = 'ask_schedule'             # "When should Tommy go?"
+ASK_TIME = 'ask_time'                     # "When should ..." / "... what time ..."
+WHO_IS = 'who_is'                         # "Who is Jeanne?"
+SCHEDULE_RANGE = 'schedule_range'         # "Who goes before 3pm?"
+SCHEDULE_NEXT = 'schedule_next'           # "What's next?" / "Who is next?"
+UNKNOWN = 'unknown'
+
+QUESTION_INTENTS = frozenset({ASK_SCHEDULE, ASK_TIME, WHO_IS, SCHEDULE_RANGE, SCHEDULE_NEXT})
+
+# Alternatives anchored with ^ can only match at the start of the message, so
+# the scan continues past position 0 only for the unanchored "what time".
+# Alternation order encodes precedence: statements win over questions.
+_INTENT_PATTERN = re.compile(
+    r"^(?:"
+    r"(?P<remember_schedule>(?P<remember_name>\w+) should go at (?P<remember_time>.+))"
+    r"|(?P<ask_schedule>when should (?P<ask_name>\w+) go)"
+    r"|(?P<ask_time>when should)"
+    r"|(?P<schedule_range>who (?:goes|should go|is going) (?P<range_op>before|after) (?P<range_time>[^?]+))"
+    r"|(?P<schedule_next>(?:what'?s|what is|who'?s|who is|who goes) next\b)"
+    r"|(?P<who_is>who is (?P<who_name>\w+))"
+    r")"
+    r"|(?P<what_time>what time)",
+    re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class Intent:
+    """Result of classifying a chat message"""
+    kind: str
+    message: str
+    name: Optional[str] = None
+    time: Optional[str] = None
+    qualifier: Optional[str] = None   # "before"/"after" for schedule ranges
+
+    @property
+    def is_statement(self) -> bool:
+        return self.kind == REMEMBER_SCHEDULE
+
+    @property
+    def is_question(self) -> bool:
+        return self.kind in QUESTION_INTENTS
+
+
+def classify_message(message: str) -> Intent:
+    """Classify a message in a single pass over the combined intent pattern"""
+    match = _INTENT_PATTERN.search(message or '')
+    if not match:
+        return Intent(UNKNOWN, message)
+
+    kind = match.lastgroup
+    if kind == REMEMBER_SCHEDULE:
+        return Intent(kind, message, name=match.group('remember_name'), time=match.group('remember_time'))
+    if kind == ASK_SCHEDULE:
+        return Intent(kind, message, name=match.group('ask_name'))
+    if kind == WHO_IS:
+        return Intent(kind, message, name=match.group('who_name'))
+    if kind == SCHEDULE_RANGE:
+        return Intent(kind, message, time=match.group('range_time').strip(),
+                      qualifier=match.group('range_op').lower())
+    if kind == SCHEDULE_NEXT:
+        return Intent(kind, message)
+    # "when should" without a name, or "what time" anywhere in the message
+    return Intent(ASK_TIME, message)
+
+
+class IntentRouter:
+    """Dispatch classified messages to handlers registered per intent kind"""
+
+    def __init__(self):
+        self._handlers: Dict[str, Callable] = {}
+
+    def route(self, *kinds: str):
+        """Decorator registering a handler for one or more intent kinds"""
+        def decorator(handler: Callable) -> Callable:
+            for kind in kinds:
+                self._handlers[kind] = handler
+            return handler
+        return decorator
+
+    def dispatch(self, message: str, **context):
+        """Classify the message once and call the matching handler"""
+        return self.handle(classify_message(message), **context)
+
+    def handle(self, intent: Intent, **context):
+        """Call the handler for an already classified intent"""
+        handler = self._handlers.get(intent.kind) or self._handlers.get(UNKNOWN)
+        if handler is None:
+            raise LookupError(f"No handler registered for intent: {intent.kind}")
+        return handler(intent, **context)
@@ -0,0 +1,137 @@
+# backend/utils/json_codec.py
+"""
+Pluggable JSON codec: orjson when installed, else msgspec, else the stdlib
+json module (JSON_CODEC=auto|orjson|msgspec|stdlib forces one).
+FastJSONProvider installs the codec on the Flask app (jsonify, request.get_json);
+dumps()/loads() serve code outside a request, such as SSE generators.
+Models (MemoryEntry, ClientRecord, VaultEntry, ...) are encoded directly,
+through their to_dict() when they define one, identically under every codec
+(msgspec encodes dataclasses natively, so for msgspec such values are
+converted before encoding).
+"""
+
+import dataclasses
+import json
+import logging
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+# Only use orjson / msgspec if available (optional dependencies)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+
+def to_jsonable(obj):
+    """Fallback encoder for values the codec doesn't handle itself"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    # Flask's defaults: dates as HTTP dates, Decimal/UUID as strings, __html__
+    return DefaultJSONProvider.default(obj)
+
+
+def _select_codec() -> str:
+    requested = os.getenv('JSON_CODEC', 'auto').lower()
+    available = {'orjson': ORJSON_AVAILABLE, 'msgspec': MSGSPEC_AVAILABLE, 'stdlib': True}
+    if available.get(requested):
+        return requested
+    if requested not in ('auto', *available):
+        logger.warning(f"Unknown JSON_CODEC '{requested}', choosing automatically")
+    return next(name for name, ok in available.items() if ok)
+
+
+CODEC = _select_codec()
+
+if ORJSON_AVAILABLE:
+    # Models and datetimes go through to_jsonable so every codec produces the same output
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+if MSGSPEC_AVAILABLE:
+    _msgspec_encoder = msgspec.json.Encoder(enc_hook=to_jsonable)
+    _msgspec_sorted_encoder = msgspec.json.Encoder(enc_hook=to_jsonable, order='sorted')
+    _msgspec_decoder = msgspec.json.Decoder()
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _msgspec_ready(obj):
+    """
+    obj with every non-JSON value passed through to_jsonable. msgspec encodes
+    dataclasses by field and datetimes as ISO strings without consulting
+    enc_hook, which would differ from to_dict() (e.g. MemoryStore's
+    total_entries) and from the other codecs.
+    """
+    if isinstance(obj, _JSON_SCALARS):
+        return obj
+    if isinstance(obj, dict):
+        return {key: _msgspec_ready(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_msgspec_ready(value) for value in obj]
+    return _msgspec_ready(to_jsonable(obj))
+
+
+def dumps(obj, sort_keys: bool = False, indent=None) -> str:
+    """Compact JSON text for obj"""
+    if CODEC == 'orjson':
+        option = _ORJSON_OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=to_jsonable, option=option).decode('utf-8')
+        except orjson.JSONEncodeError:
+            pass   # e.g. integers beyond 64 bits: let the stdlib encode (or reject) them
+    elif CODEC == 'msgspec' and not indent:
+        try:
+            encoder = _msgspec_sorted_encoder if sort_keys else _msgspec_encoder
+            return encoder.encode(_msgspec_ready(obj)).decode('utf-8')
+        except (TypeError, msgspec.EncodeError):
+            pass
+    return json.dumps(obj, default=to_jsonable, sort_keys=sort_keys, indent=indent, ensure_ascii=False,
+                      separators=None if indent else (',', ':'))
+
+
+def loads(data):
+    """Parse JSON text or bytes; raises ValueError on malformed input"""
+    if CODEC == 'orjson':
+        return orjson.loads(data)
+    if CODEC == 'msgspec':
+        try:
+            return _msgspec_decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by the selected codec"""
+    default = staticmethod(to_jsonable)
+
+    def dumps(self, obj, **kwargs) -> str:
+        if CODEC == 'stdlib':
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys), indent=kwargs.get('indent'))
+
+    def loads(self, s, **kwargs):
+        if CODEC == 'stdlib':
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+
+def init_json_provider(app) -> None:
+    app.json = FastJSONProvider(app)
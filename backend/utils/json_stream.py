@@ -0,0 +1,134 @@
+# backend/utils/json_stream.py
+"""
+Paginated, streaming JSON for large listing endpoints.
+Small pages are returned as ordinary JSON documents (and so stay cacheable by
+versioned_json); pages of JSON_STREAM_MIN_ITEMS or more, and any request with
+Accept: application/x-ndjson, are serialized item by item straight from the
+store iterator and sent in ~64 KB chunks, compressed incrementally when the
+client accepts gzip/br. Peak memory is one chunk rather than the whole listing.
+"""
+
+import os
+import zlib
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from flask import Response, current_app, jsonify, request
+
+from backend.utils.http_cache import BROTLI_AVAILABLE, JSON_BROTLI_QUALITY, JSON_GZIP_LEVEL, negotiate_encoding
+
+if BROTLI_AVAILABLE:
+    import brotli
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_MIN_ITEMS = int(os.getenv('JSON_STREAM_MIN_ITEMS', '500'))
+CHUNK_SIZE = 64 * 1024
+
+
+def wants_ndjson() -> bool:
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def page_args() -> Tuple[int, Optional[int]]:
+    """(offset, limit) from the query string; raises ValueError on bad values"""
+    offset = int(request.args.get('offset', 0))
+    limit = request.args.get('limit')
+    limit = int(limit) if limit is not None else None
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("offset and limit must be non-negative")
+    return offset, limit
+
+
+def _chunked(parts: Iterable[str]) -> Iterator[bytes]:
+    """Join small string parts into chunks of about CHUNK_SIZE bytes"""
+    buffer, size = [], 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= CHUNK_SIZE:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def _encoded(chunks: Iterator[bytes], encoding: Optional[str]) -> Iterator[bytes]:
+    """Compress a chunk stream incrementally"""
+    if encoding is None:
+        yield from chunks
+        return
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=JSON_BROTLI_QUALITY)
+        compress, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(JSON_GZIP_LEVEL, zlib.DEFLATED, 31)   # 31: gzip container
+        compress, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def _document_parts(dumps, field, items, mapping, envelope) -> Iterator[str]:
+    # {"<envelope>...", "<field>": [item, ...]} or {..., "<field>": {"key": value, ...}}
+    yield dumps(envelope)[:-1] + (', ' if envelope else '') + dumps(field) + (': {' if mapping else ': [')
+    for index, item in enumerate(items):
+        separator = ', ' if index else ''
+        if mapping:
+            key, value = item
+            yield separator + dumps(str(key)) + ': ' + dumps(value)
+        else:
+            yield separator + dumps(item)
+    yield '}}' if mapping else ']}'
+
+
+def json_listing(items: Iterable, total: int, field: str, count_field: Optional[str] = 'count',
+                 extra: Optional[dict] = None, serialize: Optional[Callable] = None,
+                 mapping: bool = False) -> Response:
+    """
+    Listing response for `total` items taken lazily from `items`, paginated by
+    ?offset=&limit=. With mapping=True the items are (key, value) pairs and the
+    field is a JSON object. serialize converts each item (e.g. to_dict) as it
+    is written. Pagination totals are also sent as X-Total-Count/X-Next-Offset.
+    """
+    try:
+        offset, limit = page_args()
+    except ValueError:
+        return jsonify({"error": "offset and limit must be non-negative integers"}), 400
+    remaining = max(total - offset, 0)
+    count = remaining if limit is None else min(limit, remaining)
+    # Bounded slice: items appended while streaming aren't included
+    page = islice(items, offset, offset + count)
+    if serialize:
+        page = ((key, serialize(value)) for key, value in page) if mapping else map(serialize, page)
+
+    envelope = dict(extra or {})
+    if count_field:
+        envelope[count_field] = count
+    if offset or limit is not None:
+        envelope.update({"offset": offset, "limit": limit, "total": total})
+    next_offset = offset + count if offset + count < total else None
+    headers = {'X-Total-Count': str(total)}
+    if next_offset is not None:
+        headers['X-Next-Offset'] = str(next_offset)
+
+    ndjson = wants_ndjson()
+    if count < STREAM_MIN_ITEMS and not ndjson:
+        response = jsonify({**envelope, field: dict(page) if mapping else list(page)})
+        response.headers.update(headers)
+        return response
+
+    dumps = current_app.json.dumps
+    if ndjson:
+        values = (value for _, value in page) if mapping else page
+        parts = (dumps(value) + '\n' for value in values)
+        mimetype = NDJSON_MIMETYPE
+    else:
+        parts = _document_parts(dumps, field, page, mapping, envelope)
+        mimetype = 'application/json'
+    encoding = negotiate_encoding(('br', 'gzip') if BROTLI_AVAILABLE else ('gzip',))
+    headers['Vary'] = 'Accept, Accept-Encoding'
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return Response(_encoded(_chunked(parts), encoding), mimetype=mimetype, headers=headers)
@@ -0,0 +1,119 @@
+# backend/utils/lazy_views.py
+"""
+Lazy blueprint loading for rarely used route modules.
+A blueprint module's routes are discovered by parsing its source (no import),
+and registered on the app as lightweight views that import the real module,
+and with it its heavy dependencies, on the first request that needs it.
+"""
+
+import ast
+import importlib
+import importlib.util
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# module name -> seconds spent importing it on first hit
+lazy_load_times: Dict[str, float] = {}
+_import_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class RouteSpec:
+    """A @<blueprint>.route(...) declaration found in a module's source"""
+    rule: str
+    function: str
+    endpoint: str
+    methods: Optional[Tuple[str, ...]] = None
+
+
+def _literal(node):
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise ValueError(f"Lazy route arguments must be literals (line {node.lineno})")
+
+
+def discover_blueprint_routes(module_name: str, blueprint_var: str) -> Tuple[str, List[RouteSpec]]:
+    """
+    Parse a module's source for Blueprint(...) and its @route decorators.
+    Returns (blueprint name, route specs in declaration order).
+    """
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or not spec.origin:
+        raise ImportError(f"Cannot locate module {module_name}")
+    with open(spec.origin, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=spec.origin)
+
+    blueprint_name = None
+    routes = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == blueprint_var for target in node.targets):
+            blueprint_name = _literal(node.value.args[0])
+        elif isinstance(node, ast.FunctionDef):
+            for decorator in node.decorator_list:
+                if not (isinstance(decorator, ast.Call)
+                        and isinstance(decorator.func, ast.Attribute)
+                        and decorator.func.attr == 'route'
+                        and isinstance(decorator.func.value, ast.Name)
+                        and decorator.func.value.id == blueprint_var):
+                    continue
+                options = {kw.arg: _literal(kw.value) for kw in decorator.keywords}
+                methods = options.get('methods')
+                routes.append(RouteSpec(
+                    rule=_literal(decorator.args[0]),
+                    function=node.name,
+                    endpoint=options.get('endpoint', node.name),
+                    methods=tuple(methods) if methods else None
+                ))
+    if blueprint_name is None:
+        raise ValueError(f"No Blueprint assigned to {blueprint_var} in {module_name}")
+    return blueprint_name, routes
+
+
+def load_module(module_name: str):
+    """Import a lazily registered module once, recording how long it took"""
+    with _import_lock:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        lazy_load_times.setdefault(module_name, time.perf_counter() - start)
+        return module
+
+
+class LazyView:
+    """View function that imports its module on first call, then delegates"""
+
+    def __init__(self, module_name: str, function: str):
+        self.module_name = module_name
+        self.function = function
+        self.__name__ = function
+        self._view = None
+
+    @property
+    def view(self):
+        if self._view is None:
+            self._view = getattr(load_module(self.module_name), self.function)
+        return self._view
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def register_lazy_blueprint(app, module_name: str, blueprint_var: str) -> List[RouteSpec]:
+    """
+    Register a blueprint module's routes without importing it. Endpoint names
+    match eager registration ("admin.health"), so url_for keeps working.
+    Only plain routes are supported; blueprint hooks and error handlers need
+    the blueprint to be registered eagerly.
+    """
+    blueprint_name, routes = discover_blueprint_routes(module_name, blueprint_var)
+    for route in routes:
+        app.add_url_rule(
+            route.rule,
+            endpoint=f"{blueprint_name}.{route.endpoint}",
+            view_func=LazyView(module_name, route.function),
+            methods=route.methods
+        )
+    return routes
@@ -0,0 +1,160 @@
+# backend/utils/load_shedding.py
+"""
+Concurrency limits per route class, with fast 503 rejection when saturated.
+Expensive endpoints (vault search, chat and its "who is" store scans) are
+grouped into route classes; each class admits "<concurrent>/<queued>"
+requests (overridable with CONCURRENCY_<CLASS>). A request beyond the running
+limit waits in a bounded queue for up to CONCURRENCY_QUEUE_TIMEOUT seconds;
+beyond the queue, or after the wait, it gets 503 with Retry-After at once.
+Unclassified routes (/env-id, heartbeat, health, pages) are never limited, so a
+burst of searches cannot take every worker thread from them.
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+from flask import g, jsonify, request
+
+CONCURRENCY_LIMITS_ENABLED = os.getenv('CONCURRENCY_LIMITS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+QUEUE_TIMEOUT = float(os.getenv('CONCURRENCY_QUEUE_TIMEOUT', '1.0'))
+
+# Route class -> "<concurrent>/<queued>". Keep the total below GUNICORN_THREADS
+# (8 by default) so cheap routes always find a free thread
+DEFAULT_CLASSES = {
+    'search': '2/1',
+    'chat': '2/2',
+}
+
+# Endpoint -> route class; endpoints not listed are never shed
+ROUTE_CLASSES = {
+    'vault.search_vault': 'search',
+    'chat_bp.ai_chat': 'chat',
+    'chat_bp.ai_chat_enhanced': 'chat',
+    'chat_bp.ai_chat_enhanced_stream': 'chat',
+    'chat_bp.ai_chat_batch': 'chat',
+}
+
+
+class ConcurrencyLimit:
+    """At most `limit` holders, at most `queue` waiters, counters for /admin"""
+
+    def __init__(self, name: str, limit: int, queue: int, timeout: float = QUEUE_TIMEOUT):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self.counters = {'admitted': 0, 'queued': 0, 'rejected': 0, 'timed_out': 0, 'peak_active': 0}
+        self._cond = threading.Condition()
+
+    @classmethod
+    def parse(cls, name: str, spec: str, timeout: float = QUEUE_TIMEOUT) -> 'ConcurrencyLimit':
+        limit, queue = spec.split('/')
+        return cls(name, int(limit), int(queue), timeout)
+
+    def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if there is room; False if shed"""
+        with self._cond:
+            if self.active >= self.limit:
+                if self.waiting >= self.queue:
+                    self.counters['rejected'] += 1
+                    return False
+                self.waiting += 1
+                self.counters['queued'] += 1
+                try:
+                    admitted = self._cond.wait_for(lambda: self.active < self.limit, self.timeout)
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self.counters['timed_out'] += 1
+                    return False
+            self.active += 1
+            self.counters['admitted'] += 1
+            self.counters['peak_active'] = max(self.counters['peak_active'], self.active)
+            return True
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {'limit': self.limit, 'queue': self.queue, 'active': self.active,
+                    'waiting': self.waiting, **self.counters}
+
+
+def load_classes() -> Dict[str, ConcurrencyLimit]:
+    return {name: ConcurrencyLimit.parse(name, os.getenv(f'CONCURRENCY_{name.upper()}', spec))
+            for name, spec in DEFAULT_CLASSES.items()}
+
+
+route_classes = load_classes()
+
+
+def concurrency_stats() -> dict:
+    return {
+        'enabled': CONCURRENCY_LIMITS_ENABLED,
+        'queue_timeout': QUEUE_TIMEOUT,
+        'classes': {name: limit.stats() for name, limit in route_classes.items()},
+        'routes': ROUTE_CLASSES,
+    }
+
+
+def _route_limit() -> Optional[ConcurrencyLimit]:
+    name = ROUTE_CLASSES.get(request.endpoint)
+    return route_classes.get(name) if name else None
+
+
+def _admit():
+    limit = _route_limit()
+    if limit is None:
+        return None
+    if not limit.acquire():
+        response = jsonify({"error": "Server busy, try again shortly", "route_class": limit.name})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+    g.concurrency_slot = limit
+    return None
+
+
+def _release_after(body, release):
+    try:
+        yield from body
+    finally:
+        release()
+
+
+def _hand_off(response):
+    # Streamed bodies (chat SSE) keep their slot until the last chunk is sent
+    # or the server closes the response, whichever comes first
+    if response.is_streamed and 'concurrency_slot' in g:
+        limit = g.pop('concurrency_slot')
+        released = []
+
+        def release():
+            if not released:
+                released.append(True)
+                limit.release()
+        response.response = _release_after(response.response, release)
+        response.call_on_close(release)
+    return response
+
+
+def _release(exc=None):
+    # Runs when the request context is popped, after the view has returned
+    limit = g.pop('concurrency_slot', None)
+    if limit is not None:
+        limit.release()
+
+
+def init_load_shedding(app):
+    """Shed or queue requests to classified endpoints (see ROUTE_CLASSES)"""
+    if not CONCURRENCY_LIMITS_ENABLED:
+        return
+    app.before_request(_admit)
+    app.after_request(_hand_off)
+    app.teardown_request(_release)
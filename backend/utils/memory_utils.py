@@ -4,145 +4,347 @@ Memory utility functions for ICI Chat backend.
 Stub implementations. Replace with real logic as needed.
 """
 
-# Simple in-memory fact store for demo purposes
-_fact_store = {}
+import os
+import copy
+import heapq
+import threading
+from collections import OrderedDict
 
-def is_statement_worth_remembering(message):
+from backend.utils import store_versions
+from backend.utils.fact_store import FactStore, parse_time_of_day, format_minutes
+from backend.utils.name_matcher import NameIndex
+from backend.utils.intent_router import (
+    classify_message,
+    ASK_SCHEDULE,
+    WHO_IS,
+    SCHEDULE_RANGE,
+    SCHEDULE_NEXT,
+)
+
+# Schedule facts ("X should go at Y") with a per-user time index, sharded by user_id.
+# Set FACT_STORE_PATH to persist facts to per-shard JSONL logs replayed at startup.
+fact_store = FactStore(os.getenv('FACT_STORE_PATH'), shards=int(os.getenv('FACT_STORE_SHARDS', '16')))
+
+# LRU cache for search_memory_for_context results. Keys embed the versions of
+# the stores an answer depends on, so any write makes older entries unreachable.
+CONTEXT_CACHE_SIZE = 1024
+_context_cache = OrderedDict()
+_context_cache_lock = threading.Lock()
+context_cache_stats = {'hits': 0, 'misses': 0}
+
+def replay_fact_store():
+    """Reload persisted schedule facts (startup); returns the number of records applied"""
+    applied = fact_store.replay()
+    if applied:
+        store_versions.bump(store_versions.FACTS)
+        with _context_cache_lock:
+            _context_cache.clear()
+    return applied
+
+def is_statement_worth_remembering(message, intent=None):
     # If the message matches the pattern "X should go at Y", remember it
-    import re
-    match = re.match(r"(\w+) should go at (.+)", message, re.IGNORECASE)
-    return bool(match)
-
-def is_question_seeking_memory(message):
-    # If the message starts with "When should" or contains "what time"
-    if message.lower().startswith("when should") or "what time" in message.lower():
-        return True
+    intent = intent or classify_message(message)
+    return intent.is_statement
+
+def is_question_seeking_memory(message, intent=None):
+    # "When should ...", "... what time ...", or "Who is [person]?"
+    intent = intent or classify_message(message)
+    return intent.is_question
+
+def store_information_in_memory(db, user_id, message, intent=None):
+    # Parse and store facts in the in-memory store
+    intent = intent or classify_message(message)
+    if intent.is_statement:
+        fact_store.set(user_id, intent.name, intent.time)
+        store_versions.bump(store_versions.FACTS, user_id)
+
+def _context_cache_key(user_id, intent):
+    """(user_id, normalized question, version of the stores the answer reads)"""
+    if intent.kind == ASK_SCHEDULE:
+        # A miss on the fact store falls through to the (empty) result, so only facts matter
+        version = store_versions.get(store_versions.FACTS, user_id)
+    elif intent.kind == SCHEDULE_RANGE:
+        version = store_versions.get(store_versions.FACTS, user_id)
+        return (user_id, f"{intent.kind}:{intent.qualifier}:{intent.time.lower()}", version)
+    elif intent.kind == WHO_IS:
+        version = _person_mention_version(intent.name.strip().lower())
+    else:
+        return None  # Time-dependent or nothing to look up - not worth caching
+    return (user_id, f"{intent.kind}:{intent.name.strip().lower()}", version)
+
+def search_memory_for_context(db, user_id, message, intent=None):
+    intent = intent or classify_message(message)
+    cache_key = _context_cache_key(user_id, intent)
+    if cache_key is None:
+        return _search_memory_uncached(user_id, intent)
     
-    # If the message matches "Who is [person]?" pattern
-    import re
-    who_pattern = re.match(r"who is (\w+)", message, re.IGNORECASE)
-    if who_pattern:
-        return True
+    with _context_cache_lock:
+        cached = _context_cache.get(cache_key)
+        if cached is not None:
+            _context_cache.move_to_end(cache_key)
+            context_cache_stats['hits'] += 1
+            return copy.deepcopy(cached)
+        context_cache_stats['misses'] += 1
     
-    return False
+    results = _search_memory_uncached(user_id, intent)
+    with _context_cache_lock:
+        # Callers own what they get back: the cache keeps a copy nobody else can mutate
+        _context_cache[cache_key] = copy.deepcopy(results)
+        while len(_context_cache) > CONTEXT_CACHE_SIZE:
+            _context_cache.popitem(last=False)
+    return results
 
-def store_information_in_memory(db, user_id, message):
-    # Parse and store facts in the in-memory store
-    import re
-    match = re.match(r"(\w+) should go at (.+)", message, re.IGNORECASE)
-    if match:
-        name = match.group(1).strip().lower()
-        time = match.group(2).strip()
-        _fact_store[(user_id, name)] = time
-
-def search_memory_for_context(db, user_id, message):
+def _search_memory_uncached(user_id, intent):
     # If the question is about a known name, return the stored time
-    import re
-    match = re.match(r"when should (\w+) go", message, re.IGNORECASE)
-    if match:
-        name = match.group(1).strip().lower()
-        time = _fact_store.get((user_id, name))
-        if time:
-            return [{"text": f"{name.title()} should go at {time}, today."}]
+    if intent.kind == ASK_SCHEDULE:
+        fact = fact_store.get(user_id, intent.name)
+        if fact:
+            return [{"text": f"{fact.name.title()} should go at {fact.time_text}, today."}]
+    
+    # "Who goes before/after 3pm?" - range query on the user's schedule index
+    if intent.kind == SCHEDULE_RANGE:
+        minutes = parse_time_of_day(intent.time)
+        if minutes is None:
+            return []
+        if intent.qualifier == 'before':
+            facts = fact_store.before(user_id, minutes)
+        else:
+            facts = fact_store.after(user_id, minutes)
+        if facts:
+            people = ", ".join(f"{fact.name.title()} ({fact.time_text})" for fact in facts)
+            return [{"text": f"Scheduled {intent.qualifier} {format_minutes(minutes)}: {people}."}]
+    
+    # "What's next?" - earliest fact at or after the current time
+    if intent.kind == SCHEDULE_NEXT:
+        facts = fact_store.next(user_id)
+        if facts:
+            people = " and ".join(fact.name.title() for fact in facts)
+            return [{"text": f"Next up: {people} should go at {facts[0].time_text}, today."}]
     
     # If the question is "Who is [person]?", search across all memory stores
-    who_match = re.match(r"who is (\w+)", message, re.IGNORECASE)
-    if who_match:
-        person_name = who_match.group(1).strip().lower()
+    if intent.kind == WHO_IS:
+        person_name = intent.name.strip().lower()
         return search_person_across_memory_stores(person_name)
     
     return []
 
 def search_person_across_memory_stores(person_name):
     """Search for mentions of a person across all memory stores"""
-    results = []
-    found_clients = []
-    
-    # Search env-box (shared memory) across all environments
-    env_boxes = get_all_env_boxes()
-    for env_id, env_data in env_boxes.items():
-        messages = env_data.get('value', [])
-        for msg in messages:
-            text_content = str(msg.get('text', '') or msg.get('q', '') or msg.get('message', ''))
-            if person_name in text_content.lower():
-                found_clients.append({
-                    'store_type': 'shared',
-                    'env_id': env_id,
-                    'content': text_content,
-                    'user': msg.get('user', 'Unknown'),
-                    'timestamp': msg.get('timestamp', msg.get('ts', 0))
-                })
-    
-    # Search ip-box (IP-shared memory) across all IP environments
-    ip_boxes = get_all_ip_boxes()
-    for store_key, ip_data in ip_boxes.items():
-        messages = ip_data.get('value', [])
-        for msg in messages:
-            text_content = str(msg.get('text', '') or msg.get('q', '') or msg.get('message', ''))
-            if person_name in text_content.lower():
-                found_clients.append({
-                    'store_type': 'ip-shared',
-                    'env_id': ip_data.get('env_id', 'unknown'),
-                    'public_ip': ip_data.get('public_ip', 'unknown'),
-                    'content': text_content,
-                    'user': msg.get('user', 'Unknown'),
-                    'timestamp': msg.get('timestamp', msg.get('ts', 0))
-                })
-      # Search client records (if we have access to them)
+    return [{"text": format_person_summary(person_name, iter_person_mentions(person_name))}]
+
+def _message_content(msg):
+    return str(msg.get('text', '') or msg.get('q', '') or msg.get('message', ''))
+
+def _env_box_mention(env_id, msg):
+    return {
+        'store_type': 'shared',
+        'env_id': env_id,
+        'content': _message_content(msg),
+        'user': msg.get('user', 'Unknown'),
+        'timestamp': msg.get('timestamp', msg.get('ts', 0))
+    }
+
+def _ip_box_mention(ip_data, msg):
+    return {
+        'store_type': 'ip-shared',
+        'env_id': ip_data.get('env_id', 'unknown'),
+        'public_ip': ip_data.get('public_ip', 'unknown'),
+        'content': _message_content(msg),
+        'user': msg.get('user', 'Unknown'),
+        'timestamp': msg.get('timestamp', msg.get('ts', 0))
+    }
+
+def _client_mention(_, client_data):
+    # The indexed text of a client record is every field value
+    return {
+        'store_type': 'client',
+        'client_id': client_data.get('client_id', 'unknown'),
+        'content': " ".join(str(value) for value in client_data.values()),
+        'user': 'system',
+        'timestamp': client_data.get('last_seen', 0)
+    }
+
+# Partitions of each store, as {partition: (version key, owner, items)}: the
+# version key is the one its writers bump (store_versions.bump(store, env_id)),
+# and mention(owner, item) turns an item into a mention record
+
+def _env_box_partitions():
+    return {env_id: (env_id, env_id, env_data.get('value', []))
+            for env_id, env_data in get_all_env_boxes().items()}
+
+def _ip_box_partitions():
+    return {box_key: (ip_data.get('env_id'), ip_data, ip_data.get('value', []))
+            for box_key, ip_data in get_all_ip_boxes().items()}
+
+def _client_partitions():
     try:
-        from backend.routes.client import client_memory, client_json_table
-        for client_data in client_json_table:
-            # Search in client data for mentions of the person
-            client_str = str(client_data).lower()
-            if person_name in client_str:
-                found_clients.append({
-                    'store_type': 'client',
-                    'client_id': client_data.get('client_id', 'unknown'),
-                    'content': f"Client record mentions {person_name}",
-                    'user': 'system',
-                    'timestamp': client_data.get('last_seen', 0)
-                })
+        from backend.routes.client import client_json_table
     except ImportError:
-        pass  # Client routes not available
-    
-    # Format results
-    if found_clients:
-        summary_lines = [f"I found information about {person_name.title()} in the following locations:"]
-        
-        # Group by store type
-        by_type = {}
-        for client in found_clients:
-            store_type = client['store_type']
-            if store_type not in by_type:
-                by_type[store_type] = []
-            by_type[store_type].append(client)
-        
-        # Add summary for each store type
-        for store_type, clients in by_type.items():
-            if store_type == 'shared':
-                env_ids = list(set(c['env_id'] for c in clients))
-                summary_lines.append(f"• Shared memory: {len(clients)} mentions across {len(env_ids)} environment(s)")
-            elif store_type == 'ip-shared':
-                ips = list(set(c['public_ip'] for c in clients))
-                summary_lines.append(f"• IP-shared memory: {len(clients)} mentions from {len(ips)} IP address(es)")
-            elif store_type == 'client':
-                client_ids = list(set(c['client_id'] for c in clients))
-                summary_lines.append(f"• Client records: {len(clients)} mentions in {len(client_ids)} client record(s)")
-        
-        # Add some sample content
-        if len(found_clients) > 0:
-            summary_lines.append("\nRecent mentions:")
-            # Sort by timestamp and show most recent
-            sorted_clients = sorted(found_clients, key=lambda x: x.get('timestamp', 0), reverse=True)
-            for i, client in enumerate(sorted_clients[:3]):  # Show top 3
-                content_preview = client['content'][:100] + "..." if len(client['content']) > 100 else client['content']
-                summary_lines.append(f"• {content_preview}")
-        
-        results.append({"text": "\n".join(summary_lines)})
+        return {}  # Client routes not available
+    partitions = {}
+    for client_data in tuple(client_json_table):
+        env_id = client_data.get('env_id')
+        partitions.setdefault(env_id, (env_id, None, []))[2].append(client_data)
+    return partitions
+
+# Person-name index over all memory stores, in search order. Documents are
+# (segment, partition, n); a write re-indexes only the partitions whose
+# per-key version it bumped (one env-box, one environment's clients), and a
+# whole-store write (bump without a key) re-indexes that store. Partitions
+# keep references to the stores' own item lists, and mention records are
+# built only for matches, so the index holds no copy of the stored messages.
+_MENTION_SOURCES = (
+    (store_versions.ENV_BOX, _env_box_partitions, _env_box_mention),
+    (store_versions.IP_BOX, _ip_box_partitions, _ip_box_mention),
+    (store_versions.CLIENTS, _client_partitions, _client_mention),
+)
+_mention_index = NameIndex()
+# store -> (store version, whole-store writes, {partition: (key version, owner, items)})
+_mention_segments = {}
+_mention_index_lock = threading.Lock()
+
+def _unindex_partition(segment, partition, count):
+    for n in range(count):
+        _mention_index.remove((segment, partition, n))
+
+def _refresh_mention_index():
+    for segment, (store, partitions, mention) in enumerate(_MENTION_SOURCES):
+        versions = store_versions.key_versions(store)
+        indexed_version, indexed_resets, indexed = _mention_segments.get(store, (None, None, {}))
+        if indexed_version == versions.get(None, 0):
+            continue
+        reindex_all = indexed_resets != versions.get(store_versions.ANY_KEY, 0)
+        refreshed = {}
+        for partition, (version_key, owner, items) in partitions().items():
+            key_version = versions.get(version_key, 0)
+            previous = indexed.pop(partition, None)
+            if previous is not None:
+                if previous[0] == key_version and not reindex_all:
+                    refreshed[partition] = previous
+                    continue
+                _unindex_partition(segment, partition, len(previous[2]))
+            for n, item in enumerate(items):
+                _mention_index.add((segment, partition, n), mention(owner, item)['content'])
+            refreshed[partition] = (key_version, owner, items)
+        # Partitions that no longer exist
+        for partition, (_, _, items) in indexed.items():
+            _unindex_partition(segment, partition, len(items))
+        _mention_segments[store] = (versions.get(None, 0), versions.get(store_versions.ANY_KEY, 0), refreshed)
+
+def _person_mention_version(person_name):
+    """
+    Versions of just the index partitions that mention a person, as a cache key
+    for "who is" answers: heartbeats and MFA pings bump their environment's
+    client partition, which only invalidates the people that partition mentions
+    """
+    with _mention_index_lock:
+        _refresh_mention_index()
+        matched = {(segment, partition) for segment, partition, _ in _mention_index.lookup(person_name)}
+        versions = set()
+        for segment, partition in matched:
+            _, resets, partitions = _mention_segments[_MENTION_SOURCES[segment][0]]
+            versions.add((segment, partition, resets, partitions[partition][0]))
+        return frozenset(versions)
+
+def warm_search_indexes():
+    """Build the person-name index ahead of the first "who is" question (startup)"""
+    with _mention_index_lock:
+        _refresh_mention_index()
+    return len(_mention_index)
+
+def _iter_segment_mentions(mention, owner, items, positions, person_name):
+    """Yield one partition's matching mention records in store order"""
+    for n in sorted(positions):
+        record = mention(owner, items[n])
+        if record['store_type'] == 'client':
+            record = dict(record, content=f"Client record mentions {person_name}")
+        yield record
+
+def iter_person_mentions(person_name):
+    """Yield mentions of a person (typos and nicknames tolerated) store by store"""
+    with _mention_index_lock:
+        _refresh_mention_index()
+        positions = {}
+        for segment, partition, n in _mention_index.lookup(person_name):
+            positions.setdefault((segment, partition), []).append(n)
+        matches = [
+            (mention, owner, items, positions[segment, partition])
+            for segment, (store, _, mention) in enumerate(_MENTION_SOURCES)
+            for partition, (_, owner, items) in _mention_segments[store][2].items()
+            if (segment, partition) in positions
+        ]
+    for mention, owner, items, matched in matches:
+        yield from _iter_segment_mentions(mention, owner, items, matched, person_name)
+
+class PersonMentionAggregator:
+    """
+    Streaming summary of person mentions: per-store counters and a bounded
+    min-heap of the k most recent mentions, so memory stays O(k) however many
+    mentions are fed in
+    """
+
+    # store_type -> (field counted as distinct locations, summary line)
+    STORE_LABELS = {
+        'shared': ('env_id', "• Shared memory: {count} mentions across {distinct} environment(s)"),
+        'ip-shared': ('public_ip', "• IP-shared memory: {count} mentions from {distinct} IP address(es)"),
+        'client': ('client_id', "• Client records: {count} mentions in {distinct} client record(s)"),
+    }
+
+    def __init__(self, k=3):
+        self.k = k
+        self.total = 0
+        self._counts = {}       # store_type -> mention count (first-seen order)
+        self._locations = {}    # store_type -> distinct location ids
+        self._recent = []       # min-heap of (timestamp, -sequence, mention)
+
+    def add(self, mention):
+        store_type = mention['store_type']
+        self._counts[store_type] = self._counts.get(store_type, 0) + 1
+        label = self.STORE_LABELS.get(store_type)
+        if label:
+            self._locations.setdefault(store_type, set()).add(mention.get(label[0]))
+        # Ties on timestamp keep the earliest-seen mention, like a stable sort
+        entry = (mention.get('timestamp', 0), -self.total, mention)
+        self.total += 1
+        if len(self._recent) < self.k:
+            heapq.heappush(self._recent, entry)
+        elif entry[:2] > self._recent[0][:2]:
+            heapq.heapreplace(self._recent, entry)
+
+    def extend(self, mentions):
+        for mention in mentions:
+            self.add(mention)
+        return self
+
+    def most_recent(self):
+        """The k most recent mentions, newest first"""
+        return [mention for *_, mention in sorted(self._recent, key=lambda entry: entry[:2], reverse=True)]
+
+    def summary_lines(self):
+        for store_type, count in self._counts.items():
+            label = self.STORE_LABELS.get(store_type)
+            if label:
+                yield label[1].format(count=count, distinct=len(self._locations[store_type]))
+
+def format_person_summary(person_name, found_clients):
+    """Format person mentions (any iterable, or a filled aggregator) as a chat answer"""
+    if isinstance(found_clients, PersonMentionAggregator):
+        aggregator = found_clients
     else:
-        results.append({"text": f"I don't have any information about {person_name.title()} in the current memory stores."})
+        aggregator = PersonMentionAggregator().extend(found_clients)
+    if not aggregator.total:
+        return f"I don't have any information about {person_name.title()} in the current memory stores."
     
-    return results
+    summary_lines = [f"I found information about {person_name.title()} in the following locations:"]
+    summary_lines.extend(aggregator.summary_lines())
+    
+    # Add some sample content
+    summary_lines.append("\nRecent mentions:")
+    for client in aggregator.most_recent():
+        content_preview = client['content'][:100] + "..." if len(client['content']) > 100 else client['content']
+        summary_lines.append(f"• {content_preview}")
+    
+    return "\n".join(summary_lines)
 
 def get_all_env_boxes():
     """Fetch all env-boxes from memory routes"""
@@ -154,8 +356,22 @@ def get_all_ip_boxes():
     from backend.routes.memory import get_all_ip_boxes as get_ip_store
     return get_ip_store()
 
+def export_user_memory(user_id):
+    """One user's schedule facts, without touching other tenants"""
+    return fact_store.export(user_id)
+
+def clear_user_memory(user_id):
+    """Clear one user's schedule facts; returns how many were removed"""
+    removed = fact_store.clear(user_id)
+    # Bumping the per-user version makes that user's cached answers unreachable
+    store_versions.bump(store_versions.FACTS, user_id)
+    return removed
+
 def clear_all_memory():
     """Clear all memory from memory routes"""
     from backend.routes.memory import clear_all_memory_stores
-    _fact_store.clear()
+    fact_store.clear()
+    store_versions.bump(store_versions.FACTS)
+    with _context_cache_lock:
+        _context_cache.clear()
     clear_all_memory_stores()
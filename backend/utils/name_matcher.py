@@ -0,0 +1,209 @@
+# backend/utils/name_matcher.py
+"""
+Typo- and nickname-tolerant person name matching for "who is" questions.
+Documents are tokenized once into normalized word forms; a trigram index over
+the vocabulary finds candidate spellings, which are verified by prefix or a
+bounded edit distance, and a nickname table maps "jon" to "jonathan"/"john".
+"""
+
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, FrozenSet, Hashable, Iterable, Optional, Set
+
+# Canonical name -> common nicknames. A nickname matches its canonical names
+# (and vice versa), but not sibling nicknames: "jon" finds "john", not "jack".
+NICKNAMES: Dict[str, tuple] = {
+    'alexander': ('alex', 'xander', 'sasha'),
+    'alexandra': ('alex', 'lexi', 'sasha'),
+    'andrew': ('andy', 'drew'),
+    'anna': ('ann', 'annie'),
+    'anthony': ('tony',),
+    'benjamin': ('ben', 'benny'),
+    'charles': ('charlie', 'chuck'),
+    'christopher': ('chris',),
+    'daniel': ('dan', 'danny'),
+    'david': ('dave', 'davey'),
+    'deborah': ('deb', 'debbie'),
+    'edward': ('ed', 'eddie', 'ted', 'teddy'),
+    'elizabeth': ('liz', 'lizzie', 'beth', 'betty', 'eliza'),
+    'james': ('jim', 'jimmy', 'jamie'),
+    'jeanne': ('jean', 'jeannie'),
+    'jennifer': ('jen', 'jenny'),
+    'john': ('jon', 'johnny', 'jack'),
+    'jonathan': ('jon', 'jonny', 'johnny', 'nathan'),
+    'joseph': ('joe', 'joey'),
+    'katherine': ('kate', 'katie', 'kathy', 'kat'),
+    'margaret': ('maggie', 'meg', 'peggy'),
+    'matthew': ('matt',),
+    'michael': ('mike', 'mikey', 'mick'),
+    'nicholas': ('nick', 'nicky'),
+    'patricia': ('pat', 'patty', 'tricia'),
+    'peter': ('pete',),
+    'rebecca': ('becky', 'becca'),
+    'richard': ('rich', 'richie', 'rick', 'dick'),
+    'robert': ('rob', 'robbie', 'bob', 'bobby'),
+    'samantha': ('sam', 'sammy'),
+    'samuel': ('sam', 'sammy'),
+    'stephen': ('steve', 'stevie'),
+    'steven': ('steve', 'stevie'),
+    'susan': ('sue', 'susie'),
+    'thomas': ('tom', 'tommy'),
+    'timothy': ('tim', 'timmy'),
+    'victoria': ('vicky', 'tori'),
+    'william': ('will', 'bill', 'billy', 'liam'),
+    'zachary': ('zach', 'zack'),
+}
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+# Shortest query that may match longer names by prefix ("jon" -> "jonathan")
+MIN_PREFIX_LENGTH = 3
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, strip accents and drop everything but letters ("Zoë" -> "zoe")"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in decomposed if c.isalpha() and not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> Set[str]:
+    """Distinct normalized word forms in free text"""
+    return {form for form in (normalize_name(word) for word in _WORD_PATTERN.findall(text or '')) if form}
+
+
+def build_alias_table(nicknames: Dict[str, Iterable[str]]) -> Dict[str, FrozenSet[str]]:
+    """Map each canonical name and nickname to the set of forms it matches"""
+    related = defaultdict(set)
+    for canonical, aliases in nicknames.items():
+        canonical = normalize_name(canonical)
+        related[canonical].add(canonical)
+        for alias in aliases:
+            alias = normalize_name(alias)
+            related[canonical].add(alias)
+            related[alias].update((alias, canonical))
+    return {form: frozenset(forms) for form, forms in related.items()}
+
+
+def _trigrams(form: str) -> Set[str]:
+    padded = f"$${form}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_edits(form: str) -> int:
+    """Typos tolerated for a query form: none for short names, more for long ones"""
+    if len(form) <= 3:
+        return 0
+    return 1 if len(form) <= 6 else 2
+
+
+def _within_edit_distance(a: str, b: str, limit: int) -> bool:
+    """Levenshtein distance <= limit, abandoning rows that already exceed it"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class NameIndex:
+    """
+    Inverted index from normalized word forms to document ids, with a trigram
+    index over the vocabulary for fuzzy lookups. Adding or removing a document
+    touches only that document's tokens.
+    """
+
+    def __init__(self, nicknames: Optional[Dict[str, Iterable[str]]] = None):
+        self.aliases = build_alias_table(NICKNAMES if nicknames is None else nicknames)
+        self._postings: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._trigram_index: Dict[str, Set[str]] = defaultdict(set)
+        self._doc_tokens: Dict[Hashable, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        """Index (or re-index) a document's text"""
+        tokens = frozenset(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            self._doc_tokens[doc_id] = tokens
+            for token in tokens:
+                if not self._postings[token]:
+                    for trigram in _trigrams(token):
+                        self._trigram_index[trigram].add(token)
+                self._postings[token].add(doc_id)
+
+    def remove(self, doc_id: Hashable) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: Hashable) -> None:
+        for token in self._doc_tokens.pop(doc_id, ()):
+            docs = self._postings[token]
+            docs.discard(doc_id)
+            if not docs:
+                del self._postings[token]
+                for trigram in _trigrams(token):
+                    self._trigram_index[trigram].discard(token)
+                    if not self._trigram_index[trigram]:
+                        del self._trigram_index[trigram]
+
+    def expand(self, form: str) -> FrozenSet[str]:
+        """A normalized form plus its nickname/canonical aliases"""
+        return self.aliases.get(form, frozenset((form,)))
+
+    def similar_forms(self, form: str) -> Set[str]:
+        """Indexed forms within the typo budget of a form, or extending it as a prefix"""
+        query_trigrams = _trigrams(form)
+        limit = _max_edits(form)
+        # Each edit destroys at most three trigrams; a prefix match keeps the
+        # len(form) leading ones, so candidates must share at least that many
+        required = max(1, min(len(form), len(query_trigrams) - 3 * limit))
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for token in self._trigram_index.get(trigram, ()):
+                shared[token] += 1
+        prefix_ok = len(form) >= MIN_PREFIX_LENGTH
+        return {
+            token for token, count in shared.items()
+            if count >= required and (
+                token == form
+                or (prefix_ok and token.startswith(form))
+                or (limit and _within_edit_distance(form, token, limit))
+            )
+        }
+
+    def matching_forms(self, name: str) -> Set[str]:
+        """Indexed forms that a single query word matches, aliases included"""
+        form = normalize_name(name)
+        if not form:
+            return set()
+        with self._lock:
+            matches = set()
+            for alias in self.expand(form):
+                matches |= self.similar_forms(alias)
+            return matches
+
+    def lookup(self, name: str) -> Set[Hashable]:
+        """Ids of documents matching every word of a (possibly multi-word) name"""
+        words = _WORD_PATTERN.findall(name or '')
+        if not words:
+            return set()
+        result = None
+        for word in words:
+            forms = self.matching_forms(word)
+            with self._lock:
+                docs = set().union(*(self._postings.get(form, ()) for form in forms))
+            result = docs if result is None else result & docs
+            if not result:
+                return set()
+        return result
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
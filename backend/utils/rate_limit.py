@@ -0,0 +1,278 @@
+# backend/utils/rate_limit.py
+"""
+Token-bucket rate limiting for write and chat endpoints.
+Each limit ("<requests>/<seconds>", overridable with RATE_LIMIT_<NAME>) is a
+bucket of <requests> tokens refilled continuously over <seconds>, kept per
+caller: the client_id/user_id in the request (else the IP), plus a bucket per
+IP shared by every limited route so rotating ids doesn't escape the limit.
+Shared namespaces such as env_id (one "ici-demo" for every chat user) only
+get a larger aggregate bucket, so one noisy client can't spend everyone's. The
+IP is the address seen by the last trusted proxy (RATE_LIMIT_TRUSTED_PROXIES),
+so a spoofed X-Forwarded-For doesn't buy a fresh bucket either.
+Buckets live in memory (O(1) per request, per worker) or, with
+RATE_LIMIT_BACKEND=sqlite, in a SQLite file shared by all workers on a host.
+Rejected requests get 429 with Retry-After.
+"""
+
+import functools
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from flask import jsonify, request
+
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory').lower()
+RATE_LIMIT_SQLITE_PATH = os.getenv('RATE_LIMIT_SQLITE_PATH',
+                                   os.path.join(tempfile.gettempdir(), 'ici_rate_limits.sqlite3'))
+# Reverse proxies in front of the app that append to X-Forwarded-For (1 on
+# Cloud Run); 0 keys IPs on the socket address and ignores the header
+TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '0'))
+
+# Per-caller limits by route class, "<requests>/<seconds>"
+DEFAULT_LIMITS = {
+    'vault': '120/60',
+    'memory': '60/60',
+    'heartbeat': '30/60',
+    'chat': '30/60',
+    'lost_memory': '5/300',
+    'ip': '600/60',          # per IP, across all limited routes
+    # Aggregates per env_id, across every client in the environment
+    'memory_env': '600/60',
+    'lost_memory_env': '30/300',
+}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    name: str
+    capacity: float       # burst size, in requests
+    refill_rate: float    # tokens per second
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> 'RateLimit':
+        requests_, seconds = spec.split('/')
+        return cls(name, float(requests_), float(requests_) / float(seconds))
+
+
+def load_limits() -> Dict[str, RateLimit]:
+    return {name: RateLimit.parse(name, os.getenv(f'RATE_LIMIT_{name.upper()}', spec))
+            for name, spec in DEFAULT_LIMITS.items()}
+
+
+def _shortfall(entries, tokens) -> float:
+    """Seconds until every bucket holds its cost (0 if they all do now)"""
+    return max(((cost - available) / limit.refill_rate
+                for (_, limit, cost), available in zip(entries, tokens) if available < cost),
+               default=0.0)
+
+
+class MemoryBuckets:
+    """In-process buckets, least recently used evicted beyond max_keys"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self._buckets: OrderedDict = OrderedDict()   # key -> [tokens, updated]
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+
+    def take(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        """Take cost tokens; returns 0 if allowed, else seconds until it would be"""
+        return self.take_all([(key, limit, cost)])
+
+    def take_all(self, entries: Sequence[Tuple[str, RateLimit, float]]) -> float:
+        """Take from every (key, limit, cost) bucket or, if any is short, from none"""
+        now = time.monotonic()
+        with self._lock:
+            buckets = []
+            for key, limit, cost in entries:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = [limit.capacity, now]
+                    if len(self._buckets) > self.max_keys:
+                        self._buckets.popitem(last=False)
+                else:
+                    self._buckets.move_to_end(key)
+                    bucket[0] = min(limit.capacity, bucket[0] + (now - bucket[1]) * limit.refill_rate)
+                    bucket[1] = now
+                buckets.append(bucket)
+            wait = _shortfall(entries, [bucket[0] for bucket in buckets])
+            if not wait:
+                for bucket, (_, _, cost) in zip(buckets, entries):
+                    bucket[0] -= cost
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBuckets:
+    """Buckets in a SQLite file, shared by every worker process on the host"""
+
+    PRUNE_EVERY = 1000   # takes between deletions of long-idle buckets
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._takes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets '
+                         '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        return self.take_all([(key, limit, cost)])
+
+    def take_all(self, entries: Sequence[Tuple[str, RateLimit, float]]) -> float:
+        now = time.time()   # wall clock: shared between processes
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            tokens = []
+            for key, limit, _ in entries:
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                tokens.append(limit.capacity if row is None else min(
+                    limit.capacity, row[0] + max(now - row[1], 0) * limit.refill_rate))
+            wait = _shortfall(entries, tokens)
+            for (key, _, cost), available in zip(entries, tokens):
+                conn.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                             (key, available if wait else available - cost, now))
+            self._takes += 1
+            if self._takes % self.PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM buckets WHERE updated < ?', (now - 3600,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def clear(self):
+        self._connection().execute('DELETE FROM buckets')
+
+
+class RateLimiter:
+    """Named limits over one bucket store, with allowed/throttled counters"""
+
+    def __init__(self, buckets, limits: Dict[str, RateLimit]):
+        self.buckets = buckets
+        self.limits = limits
+        self._counters = {name: {'allowed': 0, 'throttled': 0} for name in limits}
+        self._lock = threading.Lock()
+
+    def check(self, name: str, key: str, cost: float = 1.0) -> float:
+        """0 if the request may proceed, else seconds to wait (counted as throttled)"""
+        return self.check_all([(name, key)], cost)
+
+    def check_all(self, checks: Sequence[Tuple[str, str]], cost: float = 1.0) -> float:
+        """
+        Like check() for several (limit name, key) pairs at once: tokens are
+        taken from all of them only if every one admits the request, so a
+        request rejected by one limit doesn't use up the others.
+        """
+        entries = [(f"{name}|{key}", self.limits[name], min(cost, self.limits[name].capacity))
+                   for name, key in checks]
+        wait = self.buckets.take_all(entries)
+        with self._lock:
+            for name, _ in checks:
+                self._counters[name]['throttled' if wait else 'allowed'] += 1
+        return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {name: dict(counts) for name, counts in self._counters.items()}
+        return {
+            'enabled': RATE_LIMIT_ENABLED,
+            'backend': type(self.buckets).__name__,
+            'limits': {name: {'requests': limit.capacity,
+                              'per_seconds': limit.capacity / limit.refill_rate,
+                              **counters[name]}
+                       for name, limit in self.limits.items()}
+        }
+
+    def reset(self):
+        self.buckets.clear()
+        with self._lock:
+            for counts in self._counters.values():
+                counts.update(allowed=0, throttled=0)
+
+
+def _create_limiter() -> RateLimiter:
+    buckets = SQLiteBuckets(RATE_LIMIT_SQLITE_PATH) if RATE_LIMIT_BACKEND == 'sqlite' else MemoryBuckets()
+    return RateLimiter(buckets, load_limits())
+
+
+limiter = _create_limiter()
+
+
+def client_ip() -> str:
+    """
+    Caller address as seen by the outermost trusted proxy. Entries left of it
+    in X-Forwarded-For come from the client and can be anything, so they are
+    never used (unlike request_identity().public_ip, which is informational).
+    """
+    if TRUSTED_PROXIES:
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',')]
+        if len(forwarded) >= TRUSTED_PROXIES and forwarded[-TRUSTED_PROXIES]:
+            return forwarded[-TRUSTED_PROXIES]
+    return request.remote_addr or 'unknown'
+
+
+def _request_field(field: str) -> Optional[str]:
+    """A string field from the JSON body, else the query string"""
+    data = request.get_json(silent=True)
+    value = data.get(field) if isinstance(data, dict) else None
+    if value is None:
+        value = request.args.get(field)
+    return value[:128] if value and isinstance(value, str) else None
+
+
+def _caller_key(key_fields: Sequence[str]) -> str:
+    for field in key_fields:
+        value = _request_field(field)
+        if value:
+            return f"{field}:{value}"
+    return f"ip:{client_ip()}"
+
+
+def rate_limited(name: str, key_fields: Sequence[str] = ('client_id', 'user_id'),
+                 cost: Optional[Callable[[], float]] = None,
+                 aggregate: Optional[Tuple[str, str]] = None):
+    """
+    Route decorator: admit the request against the caller's bucket for `name`
+    (keyed by the first of key_fields in the JSON body or query string, else
+    the IP) and the per-IP bucket, or answer 429 with Retry-After.
+    aggregate=(limit name, field) also admits it against one bucket per value
+    of a shared field, e.g. ('memory_env', 'env_id').
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if RATE_LIMIT_ENABLED:
+                request_cost = cost() if cost else 1.0
+                checks = [(name, _caller_key(key_fields)), ('ip', client_ip())]
+                if aggregate:
+                    value = _request_field(aggregate[1])
+                    if value:
+                        checks.append((aggregate[0], f"{aggregate[1]}:{value}"))
+                wait = limiter.check_all(checks, request_cost)
+                if wait:
+                    retry_after = max(1, math.ceil(wait))
+                    response = jsonify({"error": "Rate limit exceeded", "retry_after": retry_after})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
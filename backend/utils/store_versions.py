@@ -0,0 +1,56 @@
+# backend/utils/store_versions.py
+"""
+Monotonic version counters for the in-memory stores.
+Every write path bumps its store's counter (and optionally a per-key counter,
+e.g. per user_id or env_id); readers use the versions as cache keys so cached
+results are invalidated automatically when the underlying data changes.
+"""
+
+import threading
+from typing import Hashable, Optional
+
+# Store names
+FACTS = 'facts'          # per-user schedule facts (key: user_id)
+ENV_BOX = 'env_box'      # shared memory (key: env_id)
+IP_BOX = 'ip_box'        # IP-shared memory (key: env_id)
+CLIENTS = 'clients'      # client table / client memory (key: env_id)
+VAULT = 'vault'          # browser vault entries (key: user_id)
+ROADMAP = 'roadmap'      # admin roadmap data
+
+# Per-key counter bumped by bump(store) without a key: a write that may have
+# touched any key (e.g. clearing the whole store)
+ANY_KEY = object()
+
+_versions = {}           # store -> {None: store version, key: key version}
+_lock = threading.Lock()
+
+
+def bump(store: str, key: Optional[Hashable] = None) -> int:
+    """Record a write to a store (and to one key within it); returns the new store version"""
+    with _lock:
+        counters = _versions.setdefault(store, {})
+        version = counters.get(None, 0) + 1
+        counters[None] = version
+        key = ANY_KEY if key is None else key
+        counters[key] = counters.get(key, 0) + 1
+        return version
+
+
+def get(store: str, key: Optional[Hashable] = None) -> int:
+    """Current version of a store, or of one key within it"""
+    return _versions.get(store, {}).get(key, 0)
+
+
+def key_versions(store: str) -> dict:
+    """
+    Consistent copy of a store's counters: None -> store version, key -> key
+    version, ANY_KEY -> whole-store writes. Read it before reading the store,
+    so the data seen is at least as new as the versions recorded for it.
+    """
+    with _lock:
+        return dict(_versions.get(store, {}))
+
+
+def snapshot(*stores: str) -> tuple:
+    """Combined version of several stores, usable as a cache key"""
+    return tuple(_versions.get(store, {}).get(None, 0) for store in stores)
@@ -0,0 +1,156 @@
+# backend/utils/validation.py
+"""
+Declarative request validation.
+A schema is a dataclass (see backend/models/payloads.py): type hints give the
+accepted JSON types, fields without a default are required, and
+field(metadata=rule(...)) adds a pattern, length or numeric bounds, coercion or
+error message. compile_schema() turns a schema into a validator once, at import;
+@validate_body(Schema) runs it on the request body and passes the view a typed
+instance as `body`, or answers 400 before the view (or any store) is touched.
+"""
+
+import dataclasses
+import functools
+import re
+import typing
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from flask import jsonify, request
+
+# Shared patterns (matched against the whole value)
+HEX64 = r'[0-9a-f]{64}'
+EMAIL = r'\S+@\S+\.\S+'
+
+EMPTY_MESSAGE = "No data provided"
+NOT_OBJECT_MESSAGE = "Request body must be a JSON object"
+DEFAULT_MISSING_MESSAGE = "Missing required field: {field}"
+
+_SIZED = (str, list, dict)
+_NUMBER = (int, float)
+
+
+class ValidationError(ValueError):
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+@dataclass(frozen=True)
+class Rule:
+    pattern: Optional[str] = None
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    coerce: Optional[Callable] = None
+    message: Optional[str] = None
+
+
+def rule(**kwargs) -> dict:
+    """Field metadata: field(metadata=rule(pattern=HEX64, message='Invalid id'))"""
+    return {'rule': Rule(**kwargs)}
+
+
+def _accepted_types(hint):
+    """(isinstance types or None for Any, whether None is allowed)"""
+    if hint is Any:
+        return None, True
+    args = typing.get_args(hint) if typing.get_origin(hint) is typing.Union else (hint,)
+    types = tuple(typing.get_origin(arg) or arg for arg in args if arg is not type(None))
+    if float in types:
+        types += (int,)     # JSON has one number type: 1 is a valid float
+    return types, type(None) in args
+
+
+def _compile_field(name: str, hint, field_rule: Rule) -> Callable[[Any], Any]:
+    if dataclasses.is_dataclass(hint):
+        build = _compile_fields(hint)
+        message = field_rule.message or f"Invalid {name}"
+
+        def check_nested(value):
+            if not isinstance(value, dict):
+                raise ValidationError(message)
+            return build(value)
+        return check_nested
+
+    types, nullable = _accepted_types(hint)
+    allows_bool = types is None or bool in types
+    matches = re.compile(field_rule.pattern).fullmatch if field_rule.pattern else None
+    message = field_rule.message
+    min_length, max_length, coerce = field_rule.min_length, field_rule.max_length, field_rule.coerce
+    min_value, max_value = field_rule.min_value, field_rule.max_value
+
+    def check(value):
+        if value is None and nullable:
+            return None
+        if types is not None and (not isinstance(value, types)
+                                  or (isinstance(value, bool) and not allows_bool)):
+            raise ValidationError(message or f"Invalid {name}")
+        if matches is not None and not matches(value):
+            raise ValidationError(message or f"Invalid {name} format")
+        # Length limits apply to the str/list members of a Union, bounds to the numbers
+        if min_length is not None and isinstance(value, _SIZED) and len(value) < min_length:
+            raise ValidationError(message or f"{name} is too short")
+        if max_length is not None and isinstance(value, _SIZED) and len(value) > max_length:
+            raise ValidationError(message or f"{name} is too long")
+        if min_value is not None and isinstance(value, _NUMBER) and value < min_value:
+            raise ValidationError(message or f"{name} is out of range")
+        if max_value is not None and isinstance(value, _NUMBER) and value > max_value:
+            raise ValidationError(message or f"{name} is out of range")
+        return coerce(value) if coerce else value
+    return check
+
+
+def _compile_fields(schema) -> Callable[[dict], Any]:
+    hints = typing.get_type_hints(schema)
+    missing_message = getattr(schema, 'MISSING_MESSAGE', DEFAULT_MISSING_MESSAGE)
+    checks = []
+    required = []
+    for f in dataclasses.fields(schema):
+        checks.append((f.name, _compile_field(f.name, hints[f.name], f.metadata.get('rule', Rule()))))
+        if f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING:
+            required.append(f.name)
+    required_names = frozenset(required)
+
+    def build(data: dict):
+        if not required_names <= data.keys():
+            field_name = next(name for name in required if name not in data)
+            raise ValidationError(missing_message.format(field=field_name))
+        return schema(**{name: check(data[name]) for name, check in checks if name in data})
+    return build
+
+
+_validators: Dict[type, Callable[[Any], Any]] = {}
+
+
+def compile_schema(schema) -> Callable[[Any], Any]:
+    """Validator for a schema: decoded JSON body -> schema instance, or ValidationError"""
+    validator = _validators.get(schema)
+    if validator is None:
+        build = _compile_fields(schema)
+
+        def validator(data):
+            if not data:
+                raise ValidationError(EMPTY_MESSAGE)
+            if not isinstance(data, dict):
+                raise ValidationError(NOT_OBJECT_MESSAGE)
+            return build(data)
+        _validators[schema] = validator
+    return validator
+
+
+def validate_body(schema, force: bool = False):
+    """Route decorator: validate the JSON body against schema, pass it as `body`"""
+    validator = compile_schema(schema)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                body = validator(request.get_json(force=force, silent=True))
+            except ValidationError as e:
+                return jsonify({"error": e.message}), 400
+            return view(*args, body=body, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for notification template rendering throughput.
+Compares rebuilding the template dict and calling str.format on every send
+(the previous approach) with the registry's precompiled and memoized rendering.
+All variants render subject, text body and HTML body.
+
+Usage: python benchmarks/bench_email_templates.py [iterations]
+"""
+
+import sys
+import os
+import time
+import html
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.utils.email_utils import notification_templates
+
+
+def render_with_format(context):
+    """Previous approach: rebuild the template dict and str.format each call"""
+    templates = {
+        'admin_alert': {
+            'subject': 'ICI Chat Admin Alert',
+            'body': 'Administrative alert for ICI Chat:\n\n{message}\n\n'
+                    'Timestamp: {timestamp}',
+            'html_body': '<p>Administrative alert for ICI Chat:</p><p>{message}</p>'
+                         '<p>Timestamp: {timestamp}</p>'
+        }
+    }
+    template = templates['admin_alert']
+    escaped = {key: html.escape(str(value)) for key, value in context.items()}
+    return (template['subject'].format(**context), template['body'].format(**context),
+            template['html_body'].format(**escaped))
+
+
+def measure(label, func, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {iterations / elapsed:>12,.0f} renders/sec")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    template = notification_templates.get('admin_alert')
+    repeated = {'message': 'Disk usage above 80%', 'timestamp': '2025-05-27T12:00:00'}
+
+    print(f"Rendering 'admin_alert' {iterations:,} times")
+    measure("str.format (per call)", lambda i: render_with_format(repeated), iterations)
+    measure("precompiled (no cache)", lambda i: template.render(repeated), iterations)
+    measure("memoized (identical context)", lambda i: notification_templates.render('admin_alert', repeated), iterations)
+    measure("memoized (unique contexts)",
+            lambda i: notification_templates.render('admin_alert', {'message': f'Alert {i}', 'timestamp': '2025-05-27'}),
+            iterations)
+    print(notification_templates.cache_info())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+HTTP load test: runs the scenarios in benchmarks/load_scenarios.py (chat,
+memory append/read, vault collect/search, heartbeat storm, SSE fan-out) with
+concurrent keep-alive workers and reports throughput and latency percentiles.
+
+Targets:
+  --target inprocess   create_app() driven through Flask test clients (no network)
+  --target dev         the Flask development server, launched on a free port
+  --target gunicorn    gunicorn (gthread, gunicorn.conf.py), launched on a free port
+  --url URL            an already running server (rate limits are whatever it runs with)
+
+Launched and in-process targets run with RATE_LIMIT_ENABLED=false unless
+--rate-limits is given, and with the per-route concurrency limits unless
+--no-shedding is given; 429 (throttled) and 503 (shed) responses are counted
+separately from errors, and "ok" throughput counts only successful requests.
+
+Results are saved as JSON (default benchmarks/results/<commit>-<target>.json)
+and --compare BASELINE.json prints per-scenario deltas, exiting 1 when
+ok throughput drops or p99 latency grows by more than --threshold percent.
+
+Usage: python benchmarks/bench_http_load.py [--target inprocess|dev|gunicorn | --url URL]
+           [--scenarios chat,memory,...] [--seconds 10] [--concurrency 16]
+           [--rate-limits] [--no-shedding] [--output FILE] [--compare BASELINE.json] [--threshold 20]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import ssl
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from bench_wsgi_server import DEV_SERVER, free_port, wait_until_ready
+from load_scenarios import SCENARIOS
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+class InProcessSession:
+    """One worker's Flask test client"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def send(self, call):
+        """(status, seconds to first body chunk or None, total seconds)"""
+        start = time.perf_counter()
+        response = self.client.open(call.path, method=call.method, json=call.json, buffered=not call.stream)
+        first = None
+        if call.stream:
+            for chunk in response.response:
+                if first is None and chunk:
+                    first = time.perf_counter() - start
+            response.close()
+        return response.status_code, first, time.perf_counter() - start
+
+    def close(self):
+        pass
+
+
+class HTTPSession:
+    """One worker's keep-alive connection"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.https = parts.scheme == 'https'
+        self.host, self.port = parts.hostname, parts.port or (443 if self.https else 80)
+        self.conn = None
+
+    def _connect(self):
+        if self.https:
+            # Local servers use the self-signed cert.pem
+            context = ssl._create_unverified_context()
+            return http.client.HTTPSConnection(self.host, self.port, timeout=30, context=context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def send(self, call):
+        reused = self.conn is not None
+        try:
+            return self._send(call)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # The server may close an idle keep-alive connection just as the
+            # next request goes out; retry once on a fresh one, as urllib3 does
+            if not reused:
+                raise
+            return self._send(call)
+
+    def _send(self, call):
+        if self.conn is None:
+            self.conn = self._connect()
+        body = json.dumps(call.json) if call.json is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        start = time.perf_counter()
+        try:
+            self.conn.request(call.method, call.path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            first = None
+            if call.stream:
+                while True:
+                    chunk = response.read1(65536)
+                    if not chunk:
+                        break
+                    if first is None:
+                        first = time.perf_counter() - start
+            # read() marks the response finished so the connection can be reused
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.will_close:
+            self.close()
+        return response.status, first, time.perf_counter() - start
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def percentiles(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def at(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 2)
+    return {'p50': at(50), 'p90': at(90), 'p99': at(99), 'max': round(ordered[-1] * 1000, 2),
+            'mean': round(sum(ordered) / len(ordered) * 1000, 2)}
+
+
+def run_scenario(scenario, new_session, seconds, concurrency, warmup):
+    setup_session = new_session()
+    for call in scenario.setup(concurrency):
+        setup_session.send(call)
+    setup_session.close()
+
+    latencies = [[] for _ in range(concurrency)]
+    first_chunks = [[] for _ in range(concurrency)]
+    statuses = [Counter() for _ in range(concurrency)]
+    errors = [0] * concurrency
+    started = time.monotonic()
+    measure_from = started + warmup
+    stop_at = measure_from + seconds
+
+    def worker(index):
+        session = new_session()
+        i = 0
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                break
+            call = scenario.call(index, i)
+            i += 1
+            try:
+                status, first, total = session.send(call)
+            except (OSError, http.client.HTTPException):
+                if now >= measure_from:
+                    errors[index] += 1
+                continue
+            if now >= measure_from:
+                latencies[index].append(total)
+                statuses[index][status] += 1
+                if first is not None:
+                    first_chunks[index].append(first)
+        session.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_latencies = [sample for samples in latencies for sample in samples]
+    status_counts = sum(statuses, Counter())
+    result = {
+        'description': scenario.description,
+        'requests': len(all_latencies),
+        'throughput_rps': round(len(all_latencies) / seconds, 1),
+        'ok_rps': round(sum(count for code, count in status_counts.items() if code < 400) / seconds, 1),
+        'latency_ms': percentiles(all_latencies),
+        'statuses': {str(code): count for code, count in sorted(status_counts.items())},
+        'throttled_429': status_counts[429],
+        'shed_503': status_counts[503],
+        'errors': sum(errors) + sum(count for code, count in status_counts.items()
+                                    if code >= 500 and code != 503),
+    }
+    first_chunk = percentiles([sample for samples in first_chunks for sample in samples])
+    if first_chunk:
+        result['first_event_ms'] = first_chunk
+    return result
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_result(name, result):
+    latency = result['latency_ms'] or {}
+    print(f"{name:<10} {result['throughput_rps']:>9,.1f} req/s ({result['ok_rps']:>9,.1f} ok)  "
+          f"p50 {latency.get('p50', 0):>8.2f}  p90 {latency.get('p90', 0):>8.2f}  "
+          f"p99 {latency.get('p99', 0):>8.2f}  max {latency.get('max', 0):>8.2f} ms  "
+          f"429: {result['throttled_429']}  503: {result['shed_503']}  errors: {result['errors']}")
+    if 'first_event_ms' in result:
+        first = result['first_event_ms']
+        print(f"{'':<10} first event  p50 {first['p50']:>8.2f}  p90 {first['p90']:>8.2f}  "
+              f"p99 {first['p99']:>8.2f} ms")
+
+
+def compare(results, baseline, threshold):
+    """Print deltas against a saved run; True if any scenario regressed"""
+    print(f"\nvs. {baseline['meta']['commit']} ({baseline['meta']['target']}, "
+          f"{baseline['meta']['concurrency']} workers)")
+    regressed = False
+    for name, result in results['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if not before or not before.get('ok_rps') or not (before['latency_ms'] and result['latency_ms']):
+            continue
+        throughput = (result['ok_rps'] / before['ok_rps'] - 1) * 100
+        p99 = (result['latency_ms']['p99'] / max(before['latency_ms']['p99'], 0.01) - 1) * 100
+        flag = throughput < -threshold or p99 > threshold
+        regressed |= flag
+        print(f"{name:<10} throughput {throughput:>+7.1f}%  p99 {p99:>+7.1f}%" + ("  REGRESSION" if flag else ""))
+    return regressed
+
+
+def wait_until_initialized(port, timeout=60):
+    # Staged startup answers API calls with 503 until /healthz reports ready
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+        conn.request('GET', '/healthz')
+        if json.loads(conn.getresponse().read()).get('ready'):
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def launch(target, env):
+    port = free_port()
+    if target == 'dev':
+        command = [sys.executable, '-c', DEV_SERVER, str(port)]
+    else:
+        env = dict(env, PORT=str(port))
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                   '--bind', f'127.0.0.1:{port}', 'wsgi:app']
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not (wait_until_ready(port, '/healthz') and wait_until_initialized(port)):
+        server.terminate()
+        raise SystemExit(f"{target} server failed to start")
+    return server, f'http://127.0.0.1:{port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP load test for the ICI Chat backend')
+    parser.add_argument('--target', choices=('inprocess', 'dev', 'gunicorn'), default='inprocess')
+    parser.add_argument('--url', help='benchmark an already running server instead')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated, from: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=1)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate-limits', action='store_true', help='keep RATE_LIMIT_ENABLED on (launched targets)')
+    parser.add_argument('--no-shedding', action='store_true',
+                        help='turn the concurrency limits off (launched targets), to measure raw capacity')
+    parser.add_argument('--output', help='results file (default benchmarks/results/<commit>-<target>.json)')
+    parser.add_argument('--compare', help='baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=20, help='regression threshold, percent')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    target = 'url' if args.url else args.target
+    env = dict(os.environ)
+    if not args.rate_limits:
+        env['RATE_LIMIT_ENABLED'] = 'false'
+    if args.no_shedding:
+        env['CONCURRENCY_LIMITS_ENABLED'] = 'false'
+    server = None
+    if args.url:
+        new_session = lambda: HTTPSession(args.url)
+    elif target == 'inprocess':
+        os.environ.update(env)
+        from backend.factory import create_app
+        app = create_app()
+        new_session = lambda: InProcessSession(app)
+    else:
+        server, url = launch(target, env)
+        new_session = lambda: HTTPSession(url)
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'target': args.url or target,
+            'seconds': args.seconds,
+            'concurrency': args.concurrency,
+            'rate_limits': 'server default' if args.url else args.rate_limits,
+            'load_shedding': 'server default' if args.url else not args.no_shedding,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'scenarios': {},
+    }
+    print(f"{target}: {args.concurrency} workers, {args.seconds:g}s per scenario "
+          f"(+{args.warmup:g}s warm-up), commit {results['meta']['commit']}")
+    try:
+        for name in names:
+            result = run_scenario(SCENARIOS[name], new_session, args.seconds, args.concurrency, args.warmup)
+            results['scenarios'][name] = result
+            print_result(name, result)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['meta']['commit']}-{target}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            if compare(results, json.load(f), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
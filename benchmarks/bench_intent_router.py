@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for chat intent classification (messages/sec).
+Compares the previous per-call re.match/re.search chain with the single-pass
+combined matcher in backend.utils.intent_router.
+
+Usage: python benchmarks/bench_intent_router.py [iterations]
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.utils.intent_router import classify_message
+
+MESSAGES = [
+    "Tommy should go at 2pm",
+    "When should Tommy go?",
+    "What time is lunch?",
+    "Who is Jeanne?",
+    "Hello, how are you today?",
+    "Can you tell me something about the weather in the afternoon?",
+]
+
+
+def classify_previous(message):
+    """Previous flow: schedule search, then statement and question checks"""
+    import re
+    re.search(r"(\w+)\s+should\s+go\s+at\s+(.+)", message, re.IGNORECASE)
+    if re.match(r"(\w+) should go at (.+)", message, re.IGNORECASE):
+        return "remember"
+    if message.lower().startswith("when should") or "what time" in message.lower():
+        re.match(r"when should (\w+) go", message, re.IGNORECASE)
+        return "question"
+    if re.match(r"who is (\w+)", message, re.IGNORECASE):
+        re.match(r"when should (\w+) go", message, re.IGNORECASE)
+        re.match(r"who is (\w+)", message, re.IGNORECASE)
+        return "question"
+    return "unknown"
+
+
+def measure(label, func, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(MESSAGES[i % len(MESSAGES)])
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {iterations / elapsed:>12,.0f} messages/sec")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    print(f"Classifying {iterations:,} messages ({len(MESSAGES)} phrasings)")
+    measure("previous regex chain", classify_previous, iterations)
+    measure("single-pass intent router", classify_message, iterations)
+
+
+if __name__ == "__main__":
+    main()
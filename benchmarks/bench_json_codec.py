@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+JSON codec benchmark: encode/decode throughput of the stdlib json module vs.
+orjson and msgspec (whichever are installed) on realistic payloads - a vault
+listing of VaultEntry models, the client table, and chat SSE token events.
+
+Usage: python benchmarks/bench_json_codec.py [seconds_per_case]
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from backend.models.vault import UIElement, VaultEntry
+from backend.utils import json_codec
+
+
+def vault_listing(count=500):
+    entries = [
+        VaultEntry('bench-user', str(i % 10), f'https://example.com/page/{i}', 'example.com',
+                   UIElement(f'#item-{i}', 'div', f'Captured text content number {i} ' * 4,
+                             {'class': 'row', 'data-id': str(i)}, {'x': i, 'y': i * 2, 'width': 100, 'height': 20}),
+                   {'key': f'value-{i}'}, None, 1.7e12 + i)
+        for i in range(count)
+    ]
+    return {"entries": entries, "count": count}
+
+
+def client_table(count=200):
+    return {"clients": [
+        {"env_id": "e" * 64, "client_id": f"{i:032x}", "public_ip": f"10.0.{i // 256}.{i % 256}",
+         "user_agent": "Mozilla/5.0 (X11; Linux x86_64) Firefox/126.0", "email": f"user{i}@example.com",
+         "timestamp": 1.7e12 + i, "last_seen": 1.7e12 + i * 2, "mfa_active": i % 2 == 0}
+        for i in range(count)
+    ]}
+
+
+def sse_tokens(count=200):
+    return [{"text": f" word{i}"} for i in range(count)]
+
+
+PAYLOADS = [
+    ("vault listing (500)", vault_listing()),
+    ("client table (200)", client_table()),
+    ("SSE tokens (200)", sse_tokens()),
+]
+
+
+def rate(fn, seconds):
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        fn()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def measure(codec, seconds):
+    json_codec.CODEC = codec
+    print(f"\n{codec}")
+    for label, payload in PAYLOADS:
+        # SSE events are encoded one small object at a time
+        if isinstance(payload, list):
+            encode = lambda: [json_codec.dumps(item) for item in payload]
+            texts = [json_codec.dumps(item) for item in payload]
+            decode = lambda: [json_codec.loads(text) for text in texts]
+            size = sum(len(text) for text in texts)
+        else:
+            encode = lambda: json_codec.dumps(payload, sort_keys=True)
+            text = encode()
+            decode = lambda: json_codec.loads(text)
+            size = len(text)
+        encode_rate, decode_rate = rate(encode, seconds), rate(decode, seconds)
+        print(f"  {label:<22} encode {encode_rate:>9,.0f}/s {encode_rate * size / 1e6:>7,.1f} MB/s   "
+              f"decode {decode_rate:>9,.0f}/s {decode_rate * size / 1e6:>7,.1f} MB/s")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    codecs = ['stdlib'] + [name for name, ok in (('orjson', json_codec.ORJSON_AVAILABLE),
+                                                 ('msgspec', json_codec.MSGSPEC_AVAILABLE)) if ok]
+    print(f"JSON codecs: {', '.join(codecs)} (app default: {json_codec.CODEC})")
+    for codec in codecs:
+        measure(codec, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Listing serialization benchmark: peak memory and time of /vault/entries/<user_id>
+built as one jsonify document vs. streamed in chunks (JSON array and NDJSON).
+The body is consumed chunk by chunk and discarded, as a WSGI server would.
+
+Usage: python benchmarks/bench_json_stream.py [entries]
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from backend.factory import create_app
+from backend.models.vault import UIElement, UserVault, VaultEntry
+from backend.routes import vault
+from backend.utils import json_stream, store_versions
+
+USER_ID = 'bench-user'
+
+
+def populate(entries):
+    vault.user_vaults[USER_ID] = UserVault(USER_ID, [], time.time() * 1000, time.time() * 1000)
+    for i in range(entries):
+        element = UIElement(f'#item-{i}', 'div', f'Captured text content number {i} ' * 4, {'class': 'row'},
+                            {'x': i, 'y': i, 'width': 100, 'height': 20})
+        vault.user_vaults[USER_ID].add_entry(VaultEntry(
+            USER_ID, str(i % 10), f'https://example.com/page/{i}', 'example.com', element,
+            {'key': f'value-{i}'}, None, time.time() * 1000))
+    store_versions.bump(store_versions.VAULT, USER_ID)
+
+
+def measure(label, client, stream_min_items, headers=None):
+    json_stream.STREAM_MIN_ITEMS = stream_min_items
+    store_versions.bump(store_versions.VAULT, USER_ID)   # defeat the versioned cache
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(f'/vault/entries/{USER_ID}', headers=headers or {}, buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<20} {elapsed * 1000:>9,.1f} ms   peak {peak / 1e6:>8,.2f} MB   body {size / 1e6:>8,.2f} MB")
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    app = create_app()
+    client = app.test_client()
+    populate(entries)
+    print(f"/vault/entries with {entries:,} entries")
+    measure("jsonify", client, entries + 1)
+    measure("streamed JSON", client, 0)
+    measure("streamed NDJSON", client, 0, {'Accept': 'application/x-ndjson'})
+    measure("streamed JSON gzip", client, 0, {'Accept-Encoding': 'gzip'})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: time to build the app with eager vs. lazy blueprint loading,
+plus an import-time profile (python -X importtime) of the slowest imports.
+Each measurement runs in a fresh interpreter so module caches don't carry over.
+
+Usage: python benchmarks/bench_startup.py [runs] [top]
+"""
+
+import sys
+import os
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+CREATE_APP = (
+    "import time; start = time.perf_counter(); "
+    "from backend.factory import create_app; create_app(); "
+    "print('CREATE_APP_SECONDS', time.perf_counter() - start)"
+)
+
+
+def run(lazy, importtime=False):
+    env = dict(os.environ, LAZY_BLUEPRINTS='true' if lazy else 'false')
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CREATE_APP]
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    seconds = next(float(line.split()[1]) for line in result.stdout.splitlines()
+                   if line.startswith('CREATE_APP_SECONDS'))
+    return seconds, result.stderr
+
+
+def parse_importtime(stderr):
+    """(cumulative microseconds, module) for every line of an -X importtime report"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, module = line.split('|', 2)
+        try:
+            rows.append((int(cumulative_us), module.strip()))
+        except ValueError:
+            continue
+    return rows
+
+
+def measure(label, lazy, runs):
+    timings = sorted(run(lazy)[0] for _ in range(runs))
+    print(f"{label:<24} median {timings[len(timings) // 2] * 1000:>9,.1f} ms   "
+          f"min {timings[0] * 1000:>9,.1f} ms")
+
+
+def profile(label, lazy, top):
+    _, stderr = run(lazy, importtime=True)
+    rows = sorted(parse_importtime(stderr), reverse=True)
+    print(f"\nSlowest imports ({label}, cumulative):")
+    for cumulative_us, module in rows[:top]:
+        print(f"  {cumulative_us / 1000:>9,.1f} ms  {module}")
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"create_app() in a fresh interpreter, {runs} run(s) each")
+    measure("eager blueprints", False, runs)
+    measure("lazy blueprints", True, runs)
+    profile("eager", False, top)
+    profile("lazy", True, top)
+
+
+if __name__ == "__main__":
+    main()
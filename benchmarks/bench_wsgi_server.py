@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Requests/sec benchmark: Flask development server vs. gunicorn (gthread).
+Each server is launched as a subprocess on a free port, then hammered by
+concurrent keep-alive clients for a fixed duration.
+
+Usage: python benchmarks/bench_wsgi_server.py [seconds] [concurrency] [path]
+"""
+
+import sys
+import os
+import time
+import socket
+import threading
+import subprocess
+import http.client
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+DEV_SERVER = (
+    "import sys; from backend.factory import create_app; "
+    "create_app().run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)"
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(port, path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', path)
+            conn.getresponse().read()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def client_loop(port, path, stop_at, counts, index):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    done = 0
+    while time.monotonic() < stop_at:
+        try:
+            conn.request('GET', path)
+            conn.getresponse().read()
+            done += 1
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    counts[index] = done
+
+
+def measure(label, command, env, port, seconds, concurrency, path):
+    server = subprocess.Popen(command, cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_until_ready(port, path):
+            print(f"{label:<32} failed to start")
+            return
+        counts = [0] * concurrency
+        stop_at = time.monotonic() + seconds
+        clients = [threading.Thread(target=client_loop, args=(port, path, stop_at, counts, i))
+                   for i in range(concurrency)]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        print(f"{label:<32} {sum(counts) / seconds:>10,.0f} requests/sec")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    path = sys.argv[3] if len(sys.argv) > 3 else '/env-id'
+    print(f"GET {path} for {seconds:g}s with {concurrency} keep-alive clients")
+
+    port = free_port()
+    measure("flask dev server (threaded)", [sys.executable, '-c', DEV_SERVER, str(port)],
+            dict(os.environ), port, seconds, concurrency, path)
+
+    for workers, threads in ((1, 8), (2, 8), (4, 8)):
+        port = free_port()
+        env = dict(os.environ, PORT=str(port), GUNICORN_WORKERS=str(workers), GUNICORN_THREADS=str(threads))
+        measure(f"gunicorn gthread {workers}w x {threads}t",
+                [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}', 'wsgi:app'],
+                env, port, seconds, concurrency, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/load_scenarios.py
+"""
+Scenarios for benchmarks/bench_http_load.py. A scenario turns (worker,
+iteration) into one Call; workers cycle through their calls for the whole
+run. setup() runs once before the clock starts (e.g. registering the clients
+a heartbeat storm needs) and returns the calls it made, which are not timed.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+NAMES = ('Alice', 'Bruno', 'Chen', 'Dana', 'Emeka', 'Farah', 'Goran', 'Hana')
+
+
+@dataclass(frozen=True)
+class Call:
+    method: str
+    path: str
+    json: Optional[Dict[str, Any]] = None
+    stream: bool = False      # time the first chunk separately (SSE)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    call: Callable[[int, int], Call]
+    setup: Callable[[int], List[Call]] = field(default=lambda workers: [])
+
+
+def _user(worker: int) -> str:
+    return f'load-user-{worker}'
+
+
+def _env(worker: int) -> str:
+    return hashlib.sha256(f'load-env-{worker}'.encode()).hexdigest()
+
+
+def _client(worker: int) -> str:
+    return hashlib.sha256(f'load-client-{worker}'.encode()).hexdigest()
+
+
+def chat_call(worker: int, i: int) -> Call:
+    name = NAMES[i % len(NAMES)]
+    message = (f'{name} should go at {9 + i % 8}:00',
+               f'when should {name} go',
+               f'who is {name}',
+               "what's next",
+               'hello there')[i % 5]
+    return Call('POST', '/ai-chat', {'message': message, 'user_id': _user(worker)})
+
+
+def memory_call(worker: int, i: int) -> Call:
+    env_id, user_id = _env(worker), _user(worker)
+    step = i % 4
+    if step == 0:
+        return Call('POST', '/env-box', {'env_id': env_id, 'value': [{'note': f'item {j}'} for j in range(i % 20)]})
+    if step == 1:
+        return Call('GET', f'/env-box?env_id={env_id}')
+    if step == 2:
+        name = NAMES[i % len(NAMES)]
+        return Call('POST', '/ai-chat', {'message': f'{name} should go at {i % 24}:30', 'user_id': user_id})
+    return Call('GET', f'/memory/facts/{user_id}')
+
+
+def vault_call(worker: int, i: int) -> Call:
+    user_id = _user(worker)
+    if i % 4 == 3:
+        return Call('POST', '/vault/search', {'user_id': user_id, 'query_text': f'row {i % 50}', 'limit': 10})
+    return Call('POST', '/vault/collect', {
+        'user_id': user_id,
+        'tab_id': worker,
+        'url': f'https://example.com/page/{i % 50}',
+        'ui_element': {'selector': f'#row-{i}', 'tag_name': 'div',
+                       'text_content': f'Captured row {i % 50} for load testing',
+                       'attributes': {'class': 'row'}, 'position': {'x': 0, 'y': i, 'width': 100, 'height': 20}},
+        'storage_data': {'step': i},
+    })
+
+
+def heartbeat_setup(workers: int) -> List[Call]:
+    return [Call('POST', '/client-register', {
+        'env_id': _env(w), 'client_id': _client(w), 'public_ip': '127.0.0.1',
+        'user_agent': 'bench_http_load', 'timestamp': 0, 'email': f'load{w}@example.com'})
+        for w in range(workers)]
+
+
+def heartbeat_call(worker: int, i: int) -> Call:
+    return Call('POST', '/client-heartbeat', {'env_id': _env(worker), 'client_id': _client(worker)})
+
+
+def sse_call(worker: int, i: int) -> Call:
+    message = f'who is {NAMES[i % len(NAMES)]}' if i % 2 else "what's next"
+    return Call('POST', '/ai-chat-enhanced/stream', {'message': message, 'user_id': _user(worker)}, stream=True)
+
+
+def sse_setup(workers: int) -> List[Call]:
+    # Give "who is" scans something to find
+    return [chat_call(w, i) for w in range(workers) for i in range(0, 40, 5)]
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (
+    Scenario('chat', 'POST /ai-chat: remember, schedule and "who is" questions, small talk', chat_call),
+    Scenario('memory', 'env-box append/read, remembered facts append/export', memory_call),
+    Scenario('vault', 'POST /vault/collect, every 4th request a /vault/search', vault_call),
+    Scenario('heartbeat', 'POST /client-heartbeat storm from registered clients', heartbeat_call, heartbeat_setup),
+    Scenario('sse', 'concurrent /ai-chat-enhanced/stream readers (time to first event and full stream)',
+             sse_call, sse_setup),
+)}
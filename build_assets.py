@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Build fingerprinted, precompressed static assets into static/dist/.
+Usage: python build_assets.py
+"""
+import os
+
+from backend.utils.assets import build_assets
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+if __name__ == "__main__":
+    manifest = build_assets(STATIC_DIR)
+    print(f"Built {len(manifest)} assets into {os.path.join(STATIC_DIR, 'dist')}")
@@ -0,0 +1,60 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings for the production launcher (python app.py --production,
+or the Docker image). Every knob can be overridden via environment variables.
+
+Note: memory stores are in-process, so each worker holds its own copy.
+Scale with GUNICORN_THREADS first; raise GUNICORN_WORKERS only when the
+stores are shared (e.g. FACT_STORE_PATH) or per-worker state is acceptable.
+Code upgrades without dropped requests: with preload_app (the default) the
+master holds the loaded app, so SIGHUP only re-forks workers from the old
+code. Send SIGUSR2 to start a new master on the new code, then SIGQUIT the
+old master once the new one is serving; or set GUNICORN_PRELOAD=false so
+that SIGHUP re-imports the app in the new workers.
+"""
+import os
+
+
+def _env_bool(name, default):
+    return os.getenv(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', '1'))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Import the app once in the master and fork workers from it (faster worker
+# boot and copy-on-write memory); disable to reload code on SIGHUP
+preload_app = _env_bool('GUNICORN_PRELOAD', 'true')
+
+# Keep idle client connections open between requests (seconds); Cloud Run's
+# front end reuses connections, so this should exceed a few seconds
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Worker heartbeat timeout; gthread workers stay alive during long SSE streams
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+
+# Recycle workers after N requests (0 = never) to bound slow memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+
+# Restart workers on code changes (development only; incompatible with preload)
+reload = _env_bool('GUNICORN_RELOAD', 'false')
+if reload:
+    preload_app = False
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# TLS for local runs; Cloud Run terminates TLS itself
+certfile = os.getenv('GUNICORN_CERT_FILE') or None
+keyfile = os.getenv('GUNICORN_KEY_FILE') or None
+
+
+def post_worker_init(worker):
+    """Run the staged startup in each worker (threads don't survive the preload fork)"""
+    from backend.factory import start_staged_initialization
+    start_staged_initialization(worker.wsgi)
@@ -56,22 +56,21 @@ def check_secrets_health() -> Dict[str, Any]:
     except Exception as e:
         return {'error': f'Secrets health error: {str(e)}'}
 
-def test_email_service() -> Dict[str, Any]:
-    """Test email service functionality"""
+def probe_email_service() -> Dict[str, Any]:
+    """Probe email provider without sending mail (use /admin/test-email for a real send)"""
     try:
-        test_data = {'to_email': 'health-check@ici-chat.com'}
-        response = requests.post('https://localhost:8080/admin/test-email',
-                               json=test_data, verify=False, timeout=30)
+        response = requests.get('https://localhost:8080/admin/email-probe',
+                              verify=False, timeout=10)
         
         result = response.json()
         return {
-            'email_test_completed': True,
-            'provider_responding': response.status_code == 200 or response.status_code == 500,
+            'email_probe_completed': response.status_code == 200,
+            'provider_responding': result.get('success', False),
             'result': result
         }
     except Exception as e:
         return {
-            'email_test_completed': False,
+            'email_probe_completed': False,
             'error': str(e)
         }
 
@@ -140,24 +139,20 @@ def generate_health_report() -> Dict[str, Any]:
     else:
         print(f"   ❌ Secrets health check failed: {secrets_health.get('error')}")
     
-    # Test email service
-    print("\n📧 Testing email service...")
-    email_test = test_email_service()
+    # Probe email service (no mail is sent)
+    print("\n📧 Probing email service...")
+    email_test = probe_email_service()
     report['checks']['email'] = email_test
     
-    if email_test.get('email_test_completed', False):
-        print("   ✅ Email test completed")
+    if email_test.get('email_probe_completed', False):
+        probe = email_test.get('result', {}).get('probe', {})
+        print(f"   ✅ Email probe completed ({probe.get('method', 'unknown')}, cached={probe.get('cached', False)})")
         if email_test.get('provider_responding', False):
-            print("   📤 Email provider is responding")
-            result = email_test.get('result', {})
-            if result.get('success', False):
-                print(f"   ✉️  Test email sent via {result.get('provider', 'unknown')}")
-            else:
-                print(f"   ⚠️  Email test failed: {result.get('error', 'Unknown error')}")
+            print(f"   📤 Email provider {probe.get('provider', 'unknown')} is healthy")
         else:
-            print("   ❌ Email provider not responding")
+            print(f"   ⚠️  Email probe failed: {probe.get('error', 'Provider not reachable or credentials rejected')}")
     else:
-        print(f"   ❌ Email test failed: {email_test.get('error')}")
+        print(f"   ❌ Email probe failed: {email_test.get('error')}")
     
     # Determine overall health
     all_checks = [
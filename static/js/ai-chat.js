@@ -230,13 +230,7 @@ const AIChatManager = {
         return;
       }
 
-      const resp = await fetch('/ai-chat-enhanced', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(requestData)
-      });
-
-      const data = await resp.json();
+      const data = await this.streamAIChat(requestData, aiResp);
       const response = data.response || 'No response.';
       
       aiResp.textContent = response;
@@ -264,6 +258,57 @@ const AIChatManager = {
     }
   },
 
+  // Stream the reply over SSE so the first tokens render immediately;
+  // falls back to the buffered endpoint when streaming isn't available
+  streamAIChat: async function(requestData, aiResp) {
+    const resp = await fetch('/ai-chat-enhanced/stream', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+      body: JSON.stringify(requestData)
+    });
+
+    if (!resp.ok || !resp.body || !resp.body.getReader) {
+      const fallback = await fetch('/ai-chat-enhanced', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(requestData)
+      });
+      return fallback.json();
+    }
+
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    let done = null;
+
+    while (!done) {
+      const { value, done: streamDone } = await reader.read();
+      if (streamDone) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        const eventMatch = rawEvent.match(/^event: (.*)$/m);
+        const dataMatch = rawEvent.match(/^data: (.*)$/m);
+        if (!eventMatch || !dataMatch) continue;
+        const payload = JSON.parse(dataMatch[1]);
+
+        if (eventMatch[1] === 'token') {
+          text += payload.text;
+          aiResp.textContent = text;
+        } else if (eventMatch[1] === 'done') {
+          done = payload;
+        }
+      }
+    }
+
+    return done || { response: text };
+  },
+
   // Cache management
   saveInputToStorage: function() {
     const aiInput = document.getElementById('ai-canvas');
@@ -301,11 +346,19 @@ const AIChatManager = {
     const offlineQueue = JSON.parse(localStorage.getItem('ici_offline_queue') || '[]');
     offlineQueue.push({
       ...requestData,
+      idempotency_key: this.generateIdempotencyKey(),
       timestamp: Date.now()
     });
     localStorage.setItem('ici_offline_queue', JSON.stringify(offlineQueue));
   },
 
+  generateIdempotencyKey: function() {
+    if (window.crypto && crypto.randomUUID) {
+      return crypto.randomUUID();
+    }
+    return `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+  },
+
   generateCacheKey: function(message, files) {
     const fileNames = files.map(f => f.name).sort().join('|');
     return `${message}|${fileNames}`;
@@ -322,23 +375,40 @@ const AIChatManager = {
     const offlineQueue = JSON.parse(localStorage.getItem('ici_offline_queue') || '[]');
     if (offlineQueue.length === 0) return;
 
-    for (const requestData of offlineQueue) {
-      try {
-        const resp = await fetch('/ai-chat-enhanced', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify(requestData)
-        });
-        const data = await resp.json();
-        this.cacheResponse(requestData.message, data.response, requestData.files);
-      } catch (e) {
-        console.error('Failed to process offline request:', e);
-        break; // Stop processing if one fails
-      }
+    // Older queued items may predate idempotency keys
+    offlineQueue.forEach(item => {
+      if (!item.idempotency_key) item.idempotency_key = this.generateIdempotencyKey();
+    });
+
+    // Drain the whole queue in one round trip; the server dedupes by idempotency_key
+    let data;
+    try {
+      const resp = await fetch('/ai-chat/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ messages: offlineQueue })
+      });
+      if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+      data = await resp.json();
+    } catch (e) {
+      console.error('Failed to process offline queue:', e);
+      localStorage.setItem('ici_offline_queue', JSON.stringify(offlineQueue));
+      return;
     }
 
-    // Clear the queue
-    localStorage.setItem('ici_offline_queue', '[]');
+    // Keep only items that still need a retry
+    const remaining = [];
+    data.results.forEach(result => {
+      const requestData = offlineQueue[result.index];
+      if (result.status === 'ok' || result.status === 'duplicate') {
+        this.cacheResponse(requestData.message, result.response, requestData.files || []);
+      } else if (result.status === 'in_progress') {
+        remaining.push(requestData);
+      } else {
+        console.error('Offline request rejected:', result.error);
+      }
+    });
+    localStorage.setItem('ici_offline_queue', JSON.stringify(remaining));
   }
 };
 
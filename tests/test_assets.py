@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for fingerprinted static assets and the immutable /assets/ route.
+"""
+
+import sys
+import os
+import gzip
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask, render_template_string
+
+from backend.utils.assets import build_assets, init_assets
+
+SCRIPT = b"console.log('hello');\n" * 100
+
+
+def make_app(static_dir):
+    app = Flask(__name__, static_folder=str(static_dir), static_url_path='/static')
+    init_assets(app)
+    return app
+
+
+def test_build_hashes_names_and_precompresses(tmp_path):
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'js' / 'app.js').write_bytes(SCRIPT)
+    manifest = build_assets(str(tmp_path))
+    hashed = manifest['js/app.js']
+    assert hashed.startswith('js/app.') and hashed.endswith('.js') and hashed != 'js/app.js'
+    assert (tmp_path / 'dist' / (hashed + '.gz')).exists()
+    # Rebuilding doesn't pick up its own output
+    assert build_assets(str(tmp_path)) == manifest
+
+
+def test_asset_url_and_immutable_serving(tmp_path):
+    (tmp_path / 'app.js').write_bytes(SCRIPT)
+    build_assets(str(tmp_path))
+    app = make_app(tmp_path)
+    with app.test_request_context('/'):
+        url = render_template_string("{{ asset_url('app.js') }}")
+        assert url.startswith('/assets/app.')
+        assert render_template_string("{{ asset_url('missing.css') }}") == '/static/missing.css'
+
+    client = app.test_client()
+    response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'immutable' in response.headers['Cache-Control']
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype in ('text/javascript', 'application/javascript')
+    assert gzip.decompress(response.get_data()) == SCRIPT
+    assert client.get(url).get_data() == SCRIPT
+    assert client.get('/assets/manifest.json').status_code == 404
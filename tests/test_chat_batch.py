@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the /ai-chat/batch offline queue drain endpoint.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.factory import create_app
+
+
+def test_batch_processes_in_order_and_dedupes():
+    """Items are processed in order; repeated idempotency keys replay the stored reply"""
+    client = create_app().test_client()
+    messages = [
+        {"message": "Batchy should go at 4pm", "idempotency_key": "k1"},
+        {"message": "When should Batchy go?", "idempotency_key": "k2"},
+        {"message": "", "idempotency_key": "k3"},
+    ]
+
+    first = client.post('/ai-chat/batch', json={"user_id": "batch-user", "messages": messages}).get_json()
+    assert [r["status"] for r in first["results"]] == ["ok", "ok", "error"]
+    assert first["results"][0]["memory_stored"]
+    assert "4pm" in first["results"][1]["response"]
+
+    retry = client.post('/ai-chat/batch', json={"user_id": "batch-user", "messages": messages[:2]}).get_json()
+    assert [r["status"] for r in retry["results"]] == ["duplicate", "duplicate"]
+    assert retry["results"][1]["response"] == first["results"][1]["response"]
+    assert retry["duplicates"] == 2
+
+
+def test_batch_rejects_empty_payload():
+    client = create_app().test_client()
+    assert client.post('/ai-chat/batch', json={"messages": []}).status_code == 400
+
+
+def test_failing_message_fails_only_its_item(monkeypatch):
+    from backend.routes import chat
+
+    dispatch = chat.chat_router.dispatch
+
+    def flaky(message, **kwargs):
+        if message == "boom":
+            raise RuntimeError("handler failed")
+        return dispatch(message, **kwargs)
+
+    monkeypatch.setattr(chat.chat_router, 'dispatch', flaky)
+    client = create_app().test_client()
+    messages = ["hello", "boom", {"message": "boom", "idempotency_key": "kb"}, "hello again"]
+    response = client.post('/ai-chat/batch', json={"user_id": "flaky-user", "messages": messages})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == ["ok", "error", "error", "ok"]
+    assert results[1]["error"] == "handler failed"
+
+
+def test_batch_payload_size_is_capped():
+    from backend.routes import chat
+
+    client = create_app().test_client()
+    # Within the item count, over the byte cap
+    messages = ["x" * (chat.MAX_BATCH_BYTES // 100)] * 100
+    response = client.post('/ai-chat/batch', json={"messages": messages})
+    assert response.status_code == 413
+    assert "bytes" in response.get_json()["error"]
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the /ai-chat-enhanced/stream SSE endpoint.
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.factory import create_app
+from backend.utils import memory_utils
+
+
+def parse_events(body):
+    """Split an SSE body into (event, payload) pairs"""
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_stream_matches_buffered_reply():
+    """Streamed tokens reassemble to the same answer as /ai-chat-enhanced"""
+    client = create_app().test_client()
+    client.post('/env-box', json={"env_id": "stream-env", "value": [{"text": "Streamy is a neighbour", "user": "u"}]})
+    payload = {"message": "Who is Streamy?", "user_id": "stream-user"}
+
+    response = client.post('/ai-chat-enhanced/stream', json=payload)
+    assert response.mimetype == 'text/event-stream'
+    events = parse_events(response.get_data(as_text=True))
+
+    kinds = [event for event, _ in events]
+    assert kinds[0] == 'intent' and kinds[1] == 'token' and kinds[-1] == 'done'
+
+    buffered = client.post('/ai-chat-enhanced', json=payload).get_json()
+    streamed_text = ''.join(data['text'] for event, data in events if event == 'token')
+    assert streamed_text == buffered['response']
+    assert events[-1][1] == buffered
+
+
+def test_streamed_who_is_uses_the_context_cache():
+    client = create_app().test_client()
+    payload = {"message": "Who is Cachestream?", "user_id": "stream-user"}
+    client.post('/ai-chat-enhanced/stream', json=payload).get_data()
+    hits = memory_utils.context_cache_stats['hits']
+    client.post('/ai-chat-enhanced/stream', json=payload).get_data()
+    assert memory_utils.context_cache_stats['hits'] == hits + 1
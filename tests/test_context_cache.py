@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the server-side search_memory_for_context cache.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.factory import create_app
+from backend.utils import memory_utils
+
+
+def test_repeated_question_hits_cache_until_fact_changes():
+    """A repeated question is served from cache; a new fact invalidates it"""
+    user_id = 'cache-user'
+    memory_utils.store_information_in_memory(None, user_id, "Cachey should go at 1pm")
+    hits = memory_utils.context_cache_stats['hits']
+
+    first = memory_utils.search_memory_for_context(None, user_id, "When should Cachey go?")
+    second = memory_utils.search_memory_for_context(None, user_id, "when should cachey go")
+    assert first == second
+    assert memory_utils.context_cache_stats['hits'] == hits + 1
+
+    memory_utils.store_information_in_memory(None, user_id, "Cachey should go at 5pm")
+    assert "5pm" in memory_utils.search_memory_for_context(None, user_id, "When should Cachey go?")[0]['text']
+
+
+def test_env_box_write_invalidates_who_is():
+    """Writes to shared memory are visible to the next "who is" question"""
+    client = create_app().test_client()
+    before = memory_utils.search_memory_for_context(None, 'u', "Who is Zelda?")
+    assert "don't have any information" in before[0]['text']
+
+    client.post('/env-box', json={"env_id": "cache-env", "value": [{"text": "Zelda runs the cafe"}]})
+    after = memory_utils.search_memory_for_context(None, 'u', "Who is Zelda?")
+    assert "Zelda runs the cafe" in after[0]['text']
+
+
+def test_unrelated_heartbeats_keep_who_is_cached():
+    """Heartbeats bump only their environment's client partition"""
+    client = create_app().test_client()
+    client.post('/env-box', json={"env_id": "pulse-env", "value": [{"text": "Ottoline keeps the keys"}]})
+    client.post('/client-register', json={
+        "env_id": "pulse-other", "client_id": "ef" * 32, "public_ip": None, "user_agent": "test",
+        "timestamp": 1, "email": "pulse@example.com"})
+    first = memory_utils.search_memory_for_context(None, 'u', "Who is Ottoline?")
+    hits = memory_utils.context_cache_stats['hits']
+
+    ping = {"env_id": "pulse-other", "client_id": "ef" * 32}
+    for timestamp in (2, 3):
+        assert client.post('/client-heartbeat', json={**ping, "timestamp": timestamp}).status_code == 200
+        assert client.post('/client-mfa-active', json={**ping, "timestamp": timestamp}).status_code == 200
+        assert memory_utils.search_memory_for_context(None, 'u', "Who is Ottoline?") == first
+    assert memory_utils.context_cache_stats['hits'] == hits + 2
+
+
+def test_cached_results_are_copies():
+    user_id = 'copy-user'
+    memory_utils.store_information_in_memory(None, user_id, "Copper should go at 2pm")
+    first = memory_utils.search_memory_for_context(None, user_id, "When should Copper go?")
+    first[0]['text'] = 'mutated'
+    first.append({'text': 'extra'})
+    again = memory_utils.search_memory_for_context(None, user_id, "When should Copper go?")
+    assert again == [{"text": "Copper should go at 2pm, today."}]
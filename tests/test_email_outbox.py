@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the simulated email outbox ring buffer.
+"""
+
+import sys
+import os
+import json
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.utils.email_utils import DEFAULT_OUTBOX_SIZE, EmailOutbox, SimulatedEmailProvider
+
+
+def test_outbox_evicts_oldest_and_keeps_indexes():
+    """Outbox stays at capacity and drops evicted messages from its indexes"""
+    provider = SimulatedEmailProvider({'provider': 'simulated', 'outbox_capacity': 3})
+    ids = [provider.send_email(f"user{i % 2}@example.com", f"Subject {i}", "Body")["message_id"] for i in range(5)]
+
+    assert len(provider.outbox) == 3
+    assert provider.get_sent_email(ids[0]) is None
+    assert provider.get_sent_email(ids[4])["subject"] == "Subject 4"
+    assert [e["subject"] for e in provider.get_sent_emails_to("user0@example.com")] == ["Subject 2", "Subject 4"]
+    assert [e["subject"] for e in provider.get_sent_emails()] == ["Subject 2", "Subject 3", "Subject 4"]
+    assert provider.outbox.stats()["total_evicted"] == 2
+
+
+def test_outbox_paging_newest_first():
+    """Pages are served newest first without copying the whole buffer"""
+    outbox = EmailOutbox(capacity=10)
+    for i in range(7):
+        outbox.append({"to": "a@example.com", "message_id": f"m{i}", "subject": str(i)})
+
+    assert [e["message_id"] for e in outbox.page(0, 3)] == ["m6", "m5", "m4"]
+    assert [e["message_id"] for e in outbox.page(6, 3)] == ["m0"]
+
+
+def test_outbox_spills_evicted_messages(tmp_path):
+    """Evicted messages are appended to the JSONL spill file"""
+    spill = tmp_path / "outbox.jsonl"
+    outbox = EmailOutbox(capacity=2, spill_path=str(spill))
+    for i in range(4):
+        outbox.append({"to": "a@example.com", "message_id": f"m{i}"})
+
+    spilled = [json.loads(line)["message_id"] for line in spill.read_text().splitlines()]
+    assert spilled == ["m0", "m1"]
+
+
+def test_outbox_spills_in_eviction_order_under_concurrency(tmp_path):
+    """Concurrent evictions append to the spill file in eviction order"""
+    spill = tmp_path / "outbox.jsonl"
+    outbox = EmailOutbox(capacity=1, spill_path=str(spill))
+
+    def send(worker):
+        for i in range(50):
+            outbox.append({"to": "a@example.com", "message_id": f"w{worker}_{i}"})
+
+    threads = [threading.Thread(target=send, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    spilled = [json.loads(line)["message_id"] for line in spill.read_text().splitlines()]
+    assert len(spilled) == outbox.stats()["total_evicted"] == 199
+    for worker in range(4):
+        own = [int(m.split("_")[1]) for m in spilled if m.startswith(f"w{worker}_")]
+        assert own == sorted(own)
+
+
+def test_invalid_outbox_size_falls_back_to_default(monkeypatch):
+    """A malformed SIMULATED_EMAIL_OUTBOX_SIZE logs a warning instead of crashing"""
+    monkeypatch.setenv('SIMULATED_EMAIL_OUTBOX_SIZE', 'lots')
+    provider = SimulatedEmailProvider({'provider': 'simulated'})
+    assert provider.outbox.capacity == DEFAULT_OUTBOX_SIZE
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the non-destructive email provider probe.
+"""
+
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.utils.email_utils import EmailService
+
+
+def test_health_check_probes_without_sending():
+    """Default health check uses the probe and leaves the outbox empty"""
+    service = EmailService({'provider': None})
+    status = service.health_check()
+
+    assert status['health_check']['mode'] == 'probe'
+    assert status['health_check']['healthy']
+    assert service.provider.get_sent_emails() == []
+
+    status = service.health_check(send_test=True)
+    assert status['health_check']['test_send']
+    assert len(service.provider.get_sent_emails()) == 1
+
+
+def test_probe_is_cached_until_forced():
+    """Probe results are reused within the TTL and refreshed on demand"""
+    service = EmailService({
+        'provider': 'sendgrid',
+        'api_key': 'SG.test',
+        'probe_url': 'http://127.0.0.1:9/unreachable',
+        'probe_timeout': 1,
+        'probe_ttl': 60
+    })
+
+    first = service.probe()
+    assert first['reachable'] is False
+    assert not first['healthy']
+    assert not first['cached']
+    assert service.probe()['cached']
+    assert not service.probe(force=True)['cached']
+
+
+def test_zero_ttl_is_honoured_and_5xx_is_unhealthy(monkeypatch):
+    from backend.utils import email_utils
+
+    class ServerError:
+        status_code = 503
+
+        class elapsed:
+            @staticmethod
+            def total_seconds():
+                return 0.01
+
+    monkeypatch.setattr(email_utils, 'REQUESTS_AVAILABLE', True)
+    monkeypatch.setattr(email_utils.requests, 'get', lambda url, **kwargs: ServerError())
+    service = EmailService({'provider': 'sendgrid', 'api_key': 'SG.test', 'probe_ttl': 0})
+    first = service.probe()
+    assert first['reachable'] and first['credentials_valid']
+    assert not first['healthy']
+    assert not service.probe()['cached']
+
+
+def test_probe_io_runs_outside_the_lock():
+    service = EmailService({'provider': None, 'probe_ttl': 60})
+    service.probe()
+    release = threading.Event()
+    probe = service.provider.probe
+    service.provider.probe = lambda: (release.wait(5), probe())[1]
+
+    refresh = threading.Thread(target=service.probe, kwargs={'force': True})
+    refresh.start()
+    try:
+        # While the forced refresh is blocked on the network, callers get the cached result
+        assert service.probe()['cached']
+    finally:
+        release.set()
+        refresh.join()
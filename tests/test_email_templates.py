@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the precompiled notification template registry.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from backend.utils.email_utils import (NotificationTemplateRegistry, SimulatedEmailProvider, EmailService,
+                                       notification_templates)
+
+
+def test_render_text_and_escaped_html():
+    """Text variants are rendered as-is, HTML variants escape context values"""
+    registry = NotificationTemplateRegistry()
+    registry.register('alert', 'Alert: {title}', 'Message: {message}', '<p>{message}</p>')
+
+    rendered = registry.render('alert', {'title': 'Disk', 'message': '<b>full</b>', 'unused': [1]})
+    assert rendered == {
+        'subject': 'Alert: Disk',
+        'body': 'Message: <b>full</b>',
+        'html_body': '<p>&lt;b&gt;full&lt;/b&gt;</p>'
+    }
+
+
+def test_render_is_memoized_for_identical_contexts():
+    """Only the fields a template uses take part in the cache key"""
+    registry = NotificationTemplateRegistry()
+    registry.register('alert', 'Alert', '{message}')
+
+    registry.render('alert', {'message': 'hi', 'request_id': 1})
+    registry.render('alert', {'message': 'hi', 'request_id': 2})
+    assert registry.cache_info().hits == 1
+
+    with pytest.raises(KeyError):
+        registry.render('alert', {})
+
+    # Equal values of different types don't share an entry
+    assert registry.render('alert', {'message': True})['body'] == 'True'
+    assert registry.render('alert', {'message': 1})['body'] == '1'
+    assert registry.render('alert', {'message': 1.0})['body'] == '1.0'
+
+
+def test_secret_bearing_templates_are_not_memoized():
+    registry = NotificationTemplateRegistry()
+    registry.register('magic', 'Sign in', 'Use {login_token}')
+    for token in ('t1', 't2', 't1'):
+        assert registry.render('magic', {'login_token': token})['body'] == f'Use {token}'
+    assert registry.cache_info().currsize == 0
+
+    cached = notification_templates.cache_info().currsize
+    notification_templates.render('password_reset', {'reset_token': 'single-use'})
+    assert notification_templates.cache_info().currsize == cached
+
+
+def test_load_directory(tmp_path):
+    """File-based templates are loaded from <name>.subject/.txt/.html"""
+    (tmp_path / 'digest.subject').write_text('Digest for {name}\n')
+    (tmp_path / 'digest.txt').write_text('Hello {name}')
+    registry = NotificationTemplateRegistry()
+
+    assert registry.load_directory(str(tmp_path)) == 1
+    assert registry.render('digest', {'name': 'Tommy'}) == {'subject': 'Digest for Tommy', 'body': 'Hello Tommy'}
+
+
+def test_send_notification_uses_registry():
+    """send_notification keeps its error contract for unknown types and missing fields"""
+    service = EmailService({'provider': None})
+    assert isinstance(service.provider, SimulatedEmailProvider)
+
+    assert service.send_notification('a@example.com', 'welcome', {})['success']
+    assert service.provider.get_sent_emails()[-1]['html_body'].startswith('<p>Welcome')
+    assert 'Missing context variable' in service.send_notification('a@example.com', 'password_reset', {})['error']
+    assert 'Unknown notification type' in service.send_notification('a@example.com', 'nope', {})['error']
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for the structured schedule fact store.
+"""
+
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.utils import fact_store
+from backend.utils.fact_store import FactStore, parse_time_of_day
+
+
+def test_parse_time_of_day():
+    assert parse_time_of_day("2pm") == 14 * 60
+    assert parse_time_of_day("2:30 pm, today") == 14 * 60 + 30
+    assert parse_time_of_day("14:05") == 14 * 60 + 5
+    assert parse_time_of_day("12am") == 0
+    assert parse_time_of_day("noon") == 12 * 60
+    assert parse_time_of_day("13pm") is None
+    assert parse_time_of_day("later") is None
+
+
+def test_range_and_next_queries():
+    """Range queries use the sorted index and respect replaced facts"""
+    store = FactStore()
+    store.set("u1", "Tommy", "2pm")
+    store.set("u1", "Anna", "11:30am")
+    store.set("u1", "Bob", "4pm")
+    store.set("u1", "Tommy", "5pm")   # replaces the 2pm fact
+    store.set("u1", "Vague", "sometime")
+    store.set("u2", "Other", "1pm")
+
+    assert [f.name for f in store.before("u1", 15 * 60)] == ["anna"]
+    assert [f.name for f in store.after("u1", 16 * 60)] == ["tommy"]
+    assert [f.name for f in store.next("u1", now_minutes=12 * 60)] == ["bob"]
+    assert store.next("u1", now_minutes=23 * 60) == []
+    assert store.get("u1", "vague").minutes is None
+    assert len(store) == 5
+
+
+def test_replay_from_log(tmp_path):
+    """A new store rebuilds the same facts from the JSONL log"""
+    log_path = str(tmp_path / "facts.jsonl")
+    store = FactStore(log_path)
+    store.set("u1", "Tommy", "2pm")
+    store.set("u2", "Anna", "3pm")
+    store.clear("u2")
+
+    replayed = FactStore(log_path)
+    assert replayed.replay() == 3
+    assert replayed.get("u1", "tommy").time_text == "2pm"
+    assert replayed.get("u2", "anna") is None
+    assert [f.name for f in replayed.before("u1", 15 * 60)] == ["tommy"]
+
+
+def test_per_tenant_clear_and_export():
+    """Clearing or exporting one user leaves other tenants and shards untouched"""
+    store = FactStore(shards=4)
+    for user in ("u1", "u2", "u3"):
+        store.set(user, "Tommy", "2pm")
+        store.set(user, "Anna", "3pm")
+
+    assert sorted(f["name"] for f in store.export("u2")) == ["anna", "tommy"]
+    assert store.clear("u2") == 2
+    assert store.export("u2") == []
+    assert store.get("u1", "tommy") is not None
+    assert store.stats()["total_facts"] == 4
+    assert store.stats()["total_users"] == 2
+    assert sum(store.stats()["shard_sizes"]) == len(store) == 4
+
+
+def test_replay_skips_records_with_the_wrong_shape(tmp_path):
+    log_path = tmp_path / "facts.jsonl"
+    store = FactStore(str(log_path))
+    store.set("u1", "Jeanne", "2pm")
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "set", "user_id": "u1", "nickname": "x"}\n[1, 2]\n')
+    store.set("u1", "Marc", "3pm")
+
+    replayed = FactStore(str(log_path))
+    assert replayed.replay() == 2
+    assert [fact.name for fact in replayed.for_user("u1")] == ["jeanne", "marc"]
+
+
+def test_concurrent_writes_replay_to_the_same_state(tmp_path):
+    log_path = tmp_path / "facts.jsonl"
+    store = FactStore(str(log_path), shards=2)
+
+    def writer(hour):
+        for _ in range(50):
+            store.set("u1", "Jeanne", f"{hour}pm")
+            store.clear("u2")
+
+    threads = [threading.Thread(target=writer, args=(hour,)) for hour in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    replayed = FactStore(str(log_path), shards=2)
+    replayed.replay()
+    assert replayed.get("u1", "jeanne").time_text == store.get("u1", "jeanne").time_text
+
+
+def test_each_shard_logs_to_its_own_file(tmp_path):
+    store = FactStore(str(tmp_path / "facts.jsonl"), shards=2)
+    for user in ("u1", "u2", "u3", "u4"):
+        store.set(user, "Tommy", "2pm")
+    store.clear()
+    assert sorted(path.name for path in tmp_path.glob("facts*.jsonl")) == ["facts.0.jsonl", "facts.1.jsonl"]
+    for path in tmp_path.glob("facts.*.jsonl"):
+        assert path.read_text().splitlines()[-1] == '{"op": "clear", "user_id": null}'
+
+    # The store-wide clear in each file covers only that file's users
+    store.set("u1", "Anna", "3pm")
+    replayed = FactStore(str(tmp_path / "facts.jsonl"), shards=2)
+    replayed.replay()
+    assert [f["name"] for f in replayed.export("u1")] == ["anna"]
+    assert len(replayed) == 1
+
+
+def test_log_is_compacted_as_it_grows(tmp_path, monkeypatch):
+    monkeypatch.setattr(fact_store, 'LOG_COMPACT_MIN_RECORDS', 10)
+    store = FactStore(str(tmp_path / "facts.jsonl"), shards=1)
+    for i in range(100):
+        store.set("u1", "Tommy", f"{i % 12 + 1}pm")
+        store.set("u2", "Anna", "3pm")
+        store.clear("u2")
+    assert len((tmp_path / "facts.0.jsonl").read_text().splitlines()) <= 11
+
+    replayed = FactStore(str(tmp_path / "facts.jsonl"), shards=1)
+    replayed.replay()
+    assert replayed.get("u1", "tommy").time_text == "4pm"
+    assert replayed.export("u2") == []
+
+
+def test_replay_migrates_an_unsharded_log_and_other_shard_counts(tmp_path):
+    log_path = tmp_path / "facts.jsonl"
+    log_path.write_text('{"op": "set", "user_id": "u1", "name": "old", "time_text": "1pm", '
+                        '"minutes": 780, "created_at": 0}\n')
+    store = FactStore(str(log_path), shards=4)
+    assert store.replay() == 1
+    assert not log_path.exists()
+    for user in ("u1", "u2", "u3", "u4", "u5"):
+        store.set(user, "Tommy", "2pm")
+
+    for shards in (2, 8):
+        resharded = FactStore(str(log_path), shards=shards)
+        resharded.replay()
+        assert len(resharded) == 6 and resharded.get("u1", "old").time_text == "1pm"
+        assert len(list(tmp_path.glob("facts.*.jsonl"))) == shards
+
+    # Writes after a reshard land in the new layout and replay on top of it
+    resharded.clear("u1")
+    again = FactStore(str(log_path), shards=8)
+    again.replay()
+    assert len(again) == 4 and again.export("u1") == []
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for precompressed, ETag-validated cached responses.
+"""
+
+import sys
+import os
+import gzip
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask, jsonify, render_template
+
+from backend.utils import store_versions
+from backend.utils.http_cache import (CachedBody, RenderedContentCache, init_json_compression,
+                                      template_paths, versioned_json)
+
+app = Flask(__name__)
+BODY = b"<p>" + b"hello world " * 200 + b"</p>"
+
+
+def test_negotiates_encoding_and_revalidates():
+    entry = CachedBody(BODY, 'text/html')
+    with app.test_request_context('/', headers={'Accept-Encoding': 'gzip'}):
+        response = entry.response()
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.get_data()) == BODY
+    with app.test_request_context('/'):
+        assert entry.response().get_data() == BODY
+    with app.test_request_context('/', headers={'If-None-Match': f'W/{entry.etag}'}):
+        assert entry.response().status_code == 304
+
+
+def test_rerenders_only_when_source_changes(tmp_path):
+    source = tmp_path / "page.md"
+    source.write_text("one")
+    cache = RenderedContentCache()
+
+    def render():
+        return source.read_text()
+
+    first = cache.get('page', cache.fingerprint(str(source)), render)
+    assert cache.get('page', cache.fingerprint(str(source)), render) is first
+    assert cache.renders == 1
+
+    source.write_text("two!")
+    second = cache.get('page', cache.fingerprint(str(source)), render)
+    assert second.body == b"two!" and second.etag != first.etag
+
+
+def test_versioned_json_skips_view_until_store_changes():
+    versioned_app = Flask(__name__)
+    calls = []
+
+    @versioned_app.route('/items/<user_id>')
+    @versioned_json(store_versions.VAULT, key=lambda user_id: user_id)
+    def items(user_id):
+        calls.append(user_id)
+        return jsonify({"items": ["x" * 50] * 100})
+
+    client = versioned_app.test_client()
+    response = client.get('/items/alice', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    etag = response.headers['ETag']
+
+    assert client.get('/items/alice', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/items/alice').get_json()["items"]
+    assert calls == ['alice']
+
+    # Another user's write leaves alice's ETag valid; her own write invalidates it
+    store_versions.bump(store_versions.VAULT, 'bob')
+    assert client.get('/items/alice', headers={'If-None-Match': etag}).status_code == 304
+    store_versions.bump(store_versions.VAULT, 'alice')
+    assert client.get('/items/alice', headers={'If-None-Match': etag}).status_code == 200
+    assert calls == ['alice', 'alice']
+
+
+def test_large_json_compressed_on_the_way_out():
+    compressing_app = Flask(__name__)
+    init_json_compression(compressing_app)
+
+    @compressing_app.route('/big')
+    def big():
+        return jsonify({"text": "hello " * 500})
+
+    client = compressing_app.test_client()
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'hello' in gzip.decompress(response.get_data())
+    assert 'Content-Encoding' not in client.get('/big').headers
+
+
+def test_encoded_variants_carry_distinct_etags():
+    entry = CachedBody(BODY, 'text/html')
+    etags = {}
+    for accept in ('identity', 'gzip'):
+        with app.test_request_context('/', headers={'Accept-Encoding': accept}):
+            etags[accept] = entry.response().headers['ETag']
+    assert etags['identity'] == entry.etag
+    assert etags['gzip'] == entry.etag[:-1] + '-gzip"'
+    # A copy of any variant revalidates, and the 304 names the negotiated one
+    for tag in etags.values():
+        with app.test_request_context('/', headers={'If-None-Match': tag, 'Accept-Encoding': 'gzip'}):
+            response = entry.response()
+            assert response.status_code == 304
+            assert response.headers['ETag'] == etags['gzip']
+
+
+def test_included_templates_are_part_of_the_fingerprint(tmp_path):
+    (tmp_path / 'page.html').write_text("{% include '_header.html' %}<main>page</main>")
+    (tmp_path / '_header.html').write_text("{% include '_nav.html' %}<header>v1</header>")
+    (tmp_path / '_nav.html').write_text("<nav></nav>")
+    page_app = Flask(__name__, template_folder=str(tmp_path))
+    page_app.config['TEMPLATES_AUTO_RELOAD'] = True
+    cache = RenderedContentCache()
+
+    def get():
+        return cache.get('page', cache.fingerprint(*template_paths('page.html')),
+                         lambda: render_template('page.html'))
+
+    with page_app.app_context():
+        assert [os.path.basename(path) for path in template_paths('page.html')] == \
+            ['page.html', '_header.html', '_nav.html']
+        first = get()
+        (tmp_path / '_header.html').write_text("{% include '_nav.html' %}<header>v2, longer</header>")
+        second = get()
+    assert b'v2' in second.body and second.etag != first.etag
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Tests for the process and per-request identity helpers.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+
+from backend.utils import id_utils
+
+
+def test_identity_constants():
+    assert id_utils.get_env_id() == id_utils.ENV_ID == id_utils._compute_env_id()
+    assert len(id_utils.get_build_version()) == 10
+
+
+def test_build_version_prefers_baked_value(monkeypatch):
+    monkeypatch.setenv('BUILD_VERSION', '0123456789abcdef')
+    assert id_utils._compute_build_version() == '0123456789'
+
+
+def test_request_identity_is_cached_per_request():
+    app = Flask(__name__)
+    headers = {'X-Forwarded-For': '203.0.113.7, 10.0.0.1', 'User-Agent': 'pytest'}
+    with app.test_request_context('/', headers=headers):
+        identity = id_utils.request_identity()
+        assert identity is id_utils.request_identity()
+        assert identity.public_ip == '203.0.113.7'
+        assert identity.private_id == id_utils.get_private_id(id_utils.ENV_ID, '203.0.113.7', 'pytest')
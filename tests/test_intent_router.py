@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for single-pass intent classification shared by the chat endpoints.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.utils.intent_router import (
+    classify_message,
+    IntentRouter,
+    REMEMBER_SCHEDULE,
+    ASK_SCHEDULE,
+    ASK_TIME,
+    WHO_IS,
+    SCHEDULE_RANGE,
+    SCHEDULE_NEXT,
+    UNKNOWN,
+)
+
+
+def test_classify_message():
+    """Each supported phrasing maps to its intent and captured fields"""
+    intent = classify_message("Tommy should go at 2pm")
+    assert (intent.kind, intent.name, intent.time) == (REMEMBER_SCHEDULE, "Tommy", "2pm")
+    assert intent.is_statement and not intent.is_question
+
+    assert classify_message("When should Tommy go?").kind == ASK_SCHEDULE
+    assert classify_message("when should we leave").kind == ASK_TIME
+    assert classify_message("So what time is the bus?").kind == ASK_TIME
+    assert classify_message("Who is Jeanne?").name == "Jeanne"
+    assert classify_message("Who is Jeanne?").kind == WHO_IS
+    assert classify_message("Who goes before 3pm?").qualifier == "before"
+    assert classify_message("Who goes before 3pm?").time == "3pm"
+    assert classify_message("Who goes before 3pm?").kind == SCHEDULE_RANGE
+    assert classify_message("What's next?").kind == SCHEDULE_NEXT
+    assert classify_message("Who is next?").kind == SCHEDULE_NEXT
+    assert classify_message("Hello there").kind == UNKNOWN
+    assert classify_message("").kind == UNKNOWN
+
+
+def test_router_dispatches_with_unknown_fallback():
+    """Handlers receive the classified intent plus dispatch context"""
+    router = IntentRouter()
+
+    @router.route(WHO_IS)
+    def who(intent, user_id):
+        return ("who", intent.name, user_id)
+
+    @router.route(UNKNOWN)
+    def fallback(intent, user_id):
+        return ("unknown", None, user_id)
+
+    assert router.dispatch("who is bob", user_id="u1") == ("who", "bob", "u1")
+    assert router.dispatch("When should Tommy go?", user_id="u1") == ("unknown", None, "u1")
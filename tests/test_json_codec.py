@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the pluggable JSON codec and Flask provider.
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask, jsonify, request
+
+from backend.models.memory import ClientRecord, MemoryEntry, MemoryStore
+from backend.models.vault import UIElement, VaultEntry
+from backend.utils import json_codec
+
+STORE = MemoryStore([MemoryEntry("shared note", "bob", 2.0, "m2")], 'shared', 'env')
+ENTRY = VaultEntry('u1', '3', 'https://example.com/a', 'example.com',
+                   UIElement('#a', 'div', 'hello', {'class': 'x'}, {'x': 1}), None, None, 1000.0)
+PAYLOAD = {
+    "memory": MemoryEntry("remember this", "alice", 1.5, "m1"),
+    "store": STORE,
+    "client": ClientRecord("env", "1.2.3.4", "c1", "agent", 1.0, 2.0),
+    "vault": [ENTRY],
+    "text": "café ✓",
+}
+EXPECTED = {
+    "memory": MemoryEntry("remember this", "alice", 1.5, "m1").to_dict(),
+    "store": STORE.to_dict(),    # adds total_entries: not the dataclass fields
+    "client": ClientRecord("env", "1.2.3.4", "c1", "agent", 1.0, 2.0).to_dict(),
+    "vault": [ENTRY.to_dict()],
+    "text": "café ✓",
+}
+
+
+def test_models_encode_like_to_dict_under_every_codec(monkeypatch):
+    codecs = ['stdlib'] + [name for name, ok in (('orjson', json_codec.ORJSON_AVAILABLE),
+                                                 ('msgspec', json_codec.MSGSPEC_AVAILABLE)) if ok]
+    outputs = set()
+    for codec in codecs:
+        monkeypatch.setattr(json_codec, 'CODEC', codec)
+        text = json_codec.dumps(PAYLOAD, sort_keys=True)
+        assert json.loads(text) == EXPECTED
+        assert json_codec.loads(text.encode('utf-8')) == EXPECTED
+        outputs.add(text)
+    assert len(outputs) == 1
+
+
+def test_flask_provider_round_trip():
+    app = Flask(__name__)
+    json_codec.init_json_provider(app)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return jsonify({"received": request.get_json(), "entry": ENTRY})
+
+    client = app.test_client()
+    response = client.post('/echo', json={"a": [1, 2.5, None, True]})
+    assert response.get_json() == {"received": {"a": [1, 2.5, None, True]}, "entry": ENTRY.to_dict()}
+    assert client.post('/echo', data='{bad', content_type='application/json').status_code == 400
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for paginated, streaming JSON listings.
+"""
+
+import sys
+import os
+import json
+import gzip
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+
+from backend.utils import json_stream
+from backend.utils.json_stream import json_listing
+
+ITEMS = [{"id": i, "text": "x" * 100} for i in range(2000)]
+
+app = Flask(__name__)
+
+
+@app.route('/items')
+def items():
+    return json_listing(iter(ITEMS), len(ITEMS), "items", extra={"kind": "test"})
+
+
+@app.route('/boxes')
+def boxes():
+    pairs = [(f"box-{i}", {"i": i}) for i in range(3)]
+    return json_listing(pairs, len(pairs), "boxes", count_field="total", mapping=True)
+
+
+def test_large_listing_streams_same_document():
+    client = app.test_client()
+    response = client.get('/items', buffered=False)
+    assert 'Content-Length' not in response.headers
+    chunks = list(response.response)
+    assert len(chunks) > 1 and max(len(chunk) for chunk in chunks) < 2 * json_stream.CHUNK_SIZE
+    assert json.loads(b''.join(chunks)) == {"kind": "test", "count": len(ITEMS), "items": ITEMS}
+
+    compressed = client.get('/items', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressed.get_data()))["items"] == ITEMS
+
+
+def test_ndjson_and_pagination():
+    client = app.test_client()
+    response = client.get('/items?offset=10&limit=5', headers={'Accept': 'application/x-ndjson'})
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == ITEMS[10:15]
+    assert response.headers['X-Total-Count'] == str(len(ITEMS))
+    assert response.headers['X-Next-Offset'] == '15'
+
+    page = client.get('/items?offset=1995&limit=10')
+    assert 'Content-Length' in page.headers
+    assert page.get_json()["items"] == ITEMS[1995:] and page.get_json()["total"] == len(ITEMS)
+    assert 'X-Next-Offset' not in page.headers
+    assert client.get('/items?limit=-1').status_code == 400
+
+
+def test_mapping_listing():
+    client = app.test_client()
+    assert client.get('/boxes').get_json() == {"total": 3, "boxes": {f"box-{i}": {"i": i} for i in range(3)}}
+    json_stream.STREAM_MIN_ITEMS, saved = 0, json_stream.STREAM_MIN_ITEMS
+    try:
+        streamed = client.get('/boxes')
+        assert 'Content-Length' not in streamed.headers
+        assert json.loads(streamed.get_data()) == {"total": 3, "boxes": {f"box-{i}": {"i": i} for i in range(3)}}
+    finally:
+        json_stream.STREAM_MIN_ITEMS = saved
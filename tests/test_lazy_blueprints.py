@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for lazy blueprint registration.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.factory import create_app
+from backend.utils.lazy_views import discover_blueprint_routes
+
+
+def _routes(app):
+    return {(rule.rule, rule.endpoint, frozenset(rule.methods)) for rule in app.url_map.iter_rules()}
+
+
+def test_discovered_routes_match_eager_registration(monkeypatch):
+    monkeypatch.setenv('LAZY_BLUEPRINTS', 'false')
+    eager = create_app()
+    monkeypatch.setenv('LAZY_BLUEPRINTS', 'true')
+    lazy = create_app()
+    assert _routes(lazy) == _routes(eager)
+
+
+def test_discover_blueprint_routes():
+    name, routes = discover_blueprint_routes('backend.routes.vault', 'vault_bp')
+    assert name == 'vault'
+    collect = next(route for route in routes if route.rule == '/vault/collect')
+    assert collect.endpoint == 'collect_vault_data'
+    assert collect.methods == ('POST',)
+
+
+def test_lazy_view_serves_request(monkeypatch):
+    monkeypatch.setenv('LAZY_BLUEPRINTS', 'true')
+    client = create_app().test_client()
+    response = client.get('/vault/stats/nobody')
+    assert response.status_code == 200
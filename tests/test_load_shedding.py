@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for per-route-class concurrency limits and load shedding.
+"""
+
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask, jsonify
+
+from backend.utils import load_shedding
+from backend.utils.load_shedding import ConcurrencyLimit, init_load_shedding
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_limit_queues_then_rejects():
+    limit = ConcurrencyLimit.parse('test', '1/1', timeout=5)
+    assert limit.acquire()
+    queued = []
+    waiter = threading.Thread(target=lambda: queued.append(limit.acquire()))
+    waiter.start()
+    _wait_until(lambda: limit.stats()['waiting'] == 1)
+    assert not limit.acquire()          # queue full: shed immediately
+    limit.release()
+    waiter.join()
+    assert queued == [True]
+    limit.release()
+    stats = limit.stats()
+    assert (stats['active'], stats['admitted'], stats['queued'], stats['rejected']) == (0, 2, 1, 1)
+
+
+def test_queue_wait_times_out():
+    limit = ConcurrencyLimit.parse('test', '1/1', timeout=0.01)
+    assert limit.acquire()
+    assert not limit.acquire()
+    assert limit.stats()['timed_out'] == 1
+
+
+def test_saturated_class_gets_503_while_other_routes_answer(monkeypatch):
+    search = ConcurrencyLimit.parse('search', '1/0')
+    monkeypatch.setattr(load_shedding, 'route_classes', {'search': search})
+    monkeypatch.setattr(load_shedding, 'ROUTE_CLASSES', {'search_view': 'search'})
+    app = Flask(__name__)
+    init_load_shedding(app)
+    release = threading.Event()
+
+    @app.route('/search')
+    def search_view():
+        release.wait(5)
+        return jsonify({"ok": True})
+
+    @app.route('/env-id')
+    def env_id():
+        return jsonify({"env_id": "x"})
+
+    client = app.test_client()
+    first = []
+    slow = threading.Thread(target=lambda: first.append(app.test_client().get('/search').status_code))
+    slow.start()
+    _wait_until(lambda: search.stats()['active'] == 1)
+    response = client.get('/search')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert client.get('/env-id').status_code == 200
+    release.set()
+    slow.join()
+    assert first == [200]
+    assert search.stats()['active'] == 0
+    assert client.get('/search').status_code == 200
+
+
+def test_streamed_response_holds_slot_until_sent(monkeypatch):
+    chat = ConcurrencyLimit.parse('chat', '1/0')
+    monkeypatch.setattr(load_shedding, 'route_classes', {'chat': chat})
+    monkeypatch.setattr(load_shedding, 'ROUTE_CLASSES', {'stream': 'chat'})
+    app = Flask(__name__)
+    init_load_shedding(app)
+
+    @app.route('/stream')
+    def stream():
+        return app.response_class((f"data: {i}\n\n" for i in range(3)), mimetype='text/event-stream')
+
+    client = app.test_client()
+    response = client.get('/stream', buffered=False)
+    body = iter(response.response)
+    next(body)
+    assert chat.stats()['active'] == 1
+    assert client.get('/stream').status_code == 503
+    list(body)
+    assert chat.stats()['active'] == 0
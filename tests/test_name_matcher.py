@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for fuzzy and nickname-aware person name matching.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.utils.name_matcher import NameIndex, normalize_name
+
+
+def test_normalize_name():
+    assert normalize_name("Zoë") == "zoe"
+    assert normalize_name("O'Brien") == "obrien"
+    assert normalize_name("") == ""
+
+
+def test_prefix_typo_and_nickname_lookup():
+    index = NameIndex()
+    index.add(1, "Jonathan is our new designer")
+    index.add(2, "Robert Smith signed the contract")
+    index.add(3, "Jeanne Dupont is the nurse")
+
+    assert index.lookup("jon") == {1}          # prefix
+    assert index.lookup("Jonathon") == {1}     # one typo
+    assert index.lookup("bob") == {2}          # nickname
+    assert index.lookup("jeane") == {3}        # typo
+    assert index.lookup("robert smith") == {2}
+    assert index.lookup("robert dupont") == set()
+    assert index.lookup("al") == set()
+
+
+def test_remove_drops_document_and_vocabulary():
+    index = NameIndex()
+    index.add("a", "Tommy should go at 2pm")
+    index.add("b", "Tommy again")
+    index.remove("a")
+    assert index.lookup("tommy") == {"b"}
+    index.remove("b")
+    assert index.lookup("tommy") == set()
+    assert len(index) == 0
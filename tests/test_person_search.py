@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming "who is" mention aggregator.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.factory import create_app
+from backend.utils import memory_utils
+from backend.utils.memory_utils import PersonMentionAggregator, format_person_summary
+
+
+def test_mention_aggregator_matches_full_sort():
+    """The bounded heap keeps the same top-k as a stable full sort"""
+    mentions = [
+        {'store_type': 'shared' if i % 3 else 'ip-shared', 'env_id': f"e{i % 4}",
+         'public_ip': f"ip{i % 2}", 'content': f"m{i}", 'timestamp': i % 7}
+        for i in range(50)
+    ]
+    aggregator = PersonMentionAggregator(k=3).extend(iter(mentions))
+    expected = sorted(mentions, key=lambda m: m['timestamp'], reverse=True)[:3]
+
+    assert aggregator.most_recent() == expected
+    assert len(aggregator._recent) == 3
+    assert list(aggregator.summary_lines()) == [
+        "• IP-shared memory: 17 mentions from 2 IP address(es)",
+        "• Shared memory: 33 mentions across 4 environment(s)",
+    ]
+
+
+def test_summary_for_no_mentions():
+    assert format_person_summary("jeanne", iter(())) == \
+        "I don't have any information about Jeanne in the current memory stores."
+
+
+def test_write_reindexes_only_the_written_partition(monkeypatch):
+    """An env-box POST or heartbeat re-tokenizes that env's entries, not the store"""
+    client = create_app().test_client()
+    client.post('/env-box', json={"env_id": "reindex-a", "value": [{"text": "Quillon at the desk"}] * 3})
+    client.post('/env-box', json={"env_id": "reindex-b", "value": [{"text": "Quillon in the lab"}] * 2})
+    assert len(list(memory_utils.iter_person_mentions("quillon"))) == 5
+
+    indexed = []
+    add = memory_utils._mention_index.add
+    monkeypatch.setattr(memory_utils._mention_index, 'add',
+                        lambda doc_id, text: (indexed.append(doc_id), add(doc_id, text)))
+    client.post('/env-box', json={"env_id": "reindex-a", "value": [{"text": "Quillon left"}]})
+    mentions = list(memory_utils.iter_person_mentions("quillon"))
+    assert sorted(mention['content'] for mention in mentions) == \
+        ["Quillon in the lab", "Quillon in the lab", "Quillon left"]
+    assert [partition for _, partition, _ in indexed] == ["reindex-a"]
+
+
+def test_index_references_stored_messages_instead_of_copying():
+    client = create_app().test_client()
+    client.post('/env-box', json={"env_id": "reference-env", "value": [{"text": "Ysolde signed in"}]})
+    assert [m['content'] for m in memory_utils.iter_person_mentions("ysolde")] == ["Ysolde signed in"]
+
+    from backend.routes.memory import env_box_store
+    _, _, partitions = memory_utils._mention_segments['env_box']
+    assert partitions["reference-env"][2] is env_box_store["reference-env"]["value"]
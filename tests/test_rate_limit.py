@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for token-bucket rate limiting.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask, jsonify
+
+from backend.utils import rate_limit
+from backend.utils.rate_limit import MemoryBuckets, RateLimit, RateLimiter, SQLiteBuckets, rate_limited
+
+LIMIT = RateLimit.parse('test', '3/60')
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, 'monotonic', lambda: clock[0])
+    buckets = MemoryBuckets()
+    assert [buckets.take('k', LIMIT) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take('k', LIMIT) == 20.0     # one token every 20 seconds
+    assert buckets.take('other', LIMIT) == 0.0
+    clock[0] += 20
+    assert buckets.take('k', LIMIT) == 0.0
+    assert buckets.take('k', LIMIT) > 0
+
+
+def test_sqlite_buckets_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'limits.sqlite3')
+    worker_a, worker_b = SQLiteBuckets(path), SQLiteBuckets(path)
+    assert worker_a.take('k', LIMIT) == 0.0
+    assert worker_b.take('k', LIMIT) == 0.0
+    assert worker_a.take('k', LIMIT) == 0.0
+    assert worker_b.take('k', LIMIT) > 0
+
+
+def test_decorator_returns_429_with_retry_after(monkeypatch):
+    limits = {'test': LIMIT, 'ip': RateLimit.parse('ip', '100/60')}
+    monkeypatch.setattr(rate_limit, 'limiter', RateLimiter(MemoryBuckets(), limits))
+    app = Flask(__name__)
+
+    @app.route('/write', methods=['POST'])
+    @rate_limited('test', ('client_id',))
+    def write():
+        return jsonify({"ok": True})
+
+    client = app.test_client()
+    statuses = [client.post('/write', json={'client_id': 'a'}).status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+    response = client.post('/write', json={'client_id': 'a'})
+    assert response.headers['Retry-After'] == '20'
+    assert client.post('/write', json={'client_id': 'b'}).status_code == 200
+    assert rate_limit.limiter.stats()['limits']['test']['throttled'] == 2
+
+
+def test_spoofed_forwarded_for_shares_the_ip_bucket(monkeypatch):
+    limits = {'test': RateLimit.parse('test', '100/60'), 'ip': LIMIT}
+    monkeypatch.setattr(rate_limit, 'limiter', RateLimiter(MemoryBuckets(), limits))
+    app = Flask(__name__)
+
+    @app.route('/write', methods=['POST'])
+    @rate_limited('test', ('client_id',))
+    def write():
+        return jsonify({"ok": True})
+
+    client = app.test_client()
+
+    def post(i):
+        return client.post('/write', json={}, headers={'X-Forwarded-For': f'10.0.0.{i}'}).status_code
+
+    monkeypatch.setattr(rate_limit, 'TRUSTED_PROXIES', 0)
+    assert [post(i) for i in range(4)] == [200, 200, 200, 429]
+
+    # Behind one proxy only the entry it appended counts
+    rate_limit.limiter.reset()
+    monkeypatch.setattr(rate_limit, 'TRUSTED_PROXIES', 1)
+    statuses = [client.post('/write', json={}, headers={'X-Forwarded-For': f'10.0.0.{i}, 203.0.113.7'}).status_code
+                for i in range(4)]
+    assert statuses == [200, 200, 200, 429]
+    assert post(99) == 200
+
+
+def test_rejection_by_one_bucket_does_not_charge_the_other(monkeypatch):
+    limits = {'test': LIMIT, 'ip': RateLimit.parse('ip', '1/60')}
+    monkeypatch.setattr(rate_limit, 'limiter', RateLimiter(MemoryBuckets(), limits))
+    app = Flask(__name__)
+
+    @app.route('/write', methods=['POST'])
+    @rate_limited('test', ('client_id',))
+    def write():
+        return jsonify({"ok": True})
+
+    client = app.test_client()
+
+    def post(ip):
+        return client.post('/write', json={'client_id': 'a'}, environ_base={'REMOTE_ADDR': ip}).status_code
+
+    assert post('10.0.0.1') == 200
+    assert [post('10.0.0.1') for _ in range(3)] == [429, 429, 429]     # IP bucket empty
+    # The caller's bucket still holds the two tokens those rejections didn't use
+    assert [post('10.0.0.2'), post('10.0.0.3'), post('10.0.0.4')] == [200, 200, 429]
+
+
+def test_shared_env_id_is_an_aggregate_not_the_caller_key(monkeypatch):
+    limits = {'test': LIMIT, 'test_env': RateLimit.parse('test_env', '5/60'),
+              'ip': RateLimit.parse('ip', '100/60')}
+    monkeypatch.setattr(rate_limit, 'limiter', RateLimiter(MemoryBuckets(), limits))
+    app = Flask(__name__)
+
+    @app.route('/env-box', methods=['POST'])
+    @rate_limited('test', aggregate=('test_env', 'env_id'))
+    def env_box():
+        return jsonify({"ok": True})
+
+    client = app.test_client()
+
+    def post(client_id, env_id='ici-demo'):
+        return client.post('/env-box', json={'client_id': client_id, 'env_id': env_id}).status_code
+
+    # One noisy client empties its own bucket, not the environment's
+    assert [post('noisy') for _ in range(4)] == [200, 200, 200, 429]
+    assert [post('quiet'), post('quiet')] == [200, 200]
+    # ...until the whole environment reaches its aggregate limit
+    assert post('third') == 429
+    assert post('third', env_id='other-env') == 200
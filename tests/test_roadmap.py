@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled roadmap view model.
+"""
+
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.models.roadmap import compile_roadmap
+
+DATA = {
+    "project_name": "Test",
+    "phases": [{
+        "name": "Phase 1", "id": "p1", "status": "In Progress",
+        "features": [
+            {"id": "a", "title": "A", "type": "UI/UX", "status": "Completed",
+             "start_date": "2025-01-01", "end_date": "2025-01-10"},
+            {"id": "b", "title": "B", "type": "Policy", "status": "Planned",
+             "start_date": "2025-01-06", "end_date": "2025-01-20"},
+            {"id": "c", "title": "C", "status": "Planned"},
+        ]
+    }]
+}
+
+
+def test_bounds_bars_and_aggregates():
+    view = compile_roadmap(DATA, compiled_at=datetime(2025, 5, 1))
+    assert (view.min_date, view.max_date, view.total_days) == (datetime(2025, 1, 1), datetime(2025, 1, 20), 20)
+    assert view.month_markers == ["Jan 2025"]
+
+    a, b, c = view.phases[0].features
+    assert (a.bar_left, a.bar_width, a.bar_class) == (0.0, 50.0, 'bar-ui-ux')
+    assert (b.bar_left, b.bar_width) == (25.0, 75.0)
+    assert c.bar_left is None and not c.has_dates
+
+    summary = view.to_dict()["summary"][0]
+    assert summary["status_counts"] == {"Completed": 1, "Planned": 2}
+    assert summary["completion_percent"] == 33.3
+
+
+def test_route_recompiles_only_on_version_bump():
+    from backend.factory import create_app
+    from backend.routes import admin
+    from backend.utils import store_versions
+
+    client = create_app().test_client()
+    client.get('/roadmap', headers={'Accept': 'application/json'})
+    view = admin.get_roadmap_view()
+    assert admin.get_roadmap_view() is view
+
+    store_versions.bump(store_versions.ROADMAP)
+    assert admin.get_roadmap_view() is not view
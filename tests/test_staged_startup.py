@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for staged startup: serving while the startup stages run.
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.factory import create_app, complete_app_initialization
+
+
+def test_gate_until_stages_complete():
+    app = create_app(staged=True)
+    app.config['STARTUP_STARTED'] = True    # hold the stages: run them by hand below
+    client = app.test_client()
+
+    assert client.get('/healthz').get_json() == {"status": "ok", "ready": False}
+    page = client.get('/chat', headers={'Accept': 'text/html'})
+    assert page.status_code == 200 and b'Starting Up' in page.data
+    api = client.post('/ai-chat', json={"message": "hi"})
+    assert api.status_code == 503
+    assert api.headers['Retry-After'] == '1'
+
+    complete_app_initialization(app)
+
+    assert client.get('/healthz').get_json()["ready"] is True
+    assert client.post('/ai-chat', json={"message": "hi"}).status_code == 200
+    startup = client.get('/startup').get_json()
+    assert [stage["name"] for stage in startup["stages"]] == ["app", "memory", "indexes"]
+    assert all(stage["status"] == "ok" for stage in startup["stages"])
+    assert client.get('/startup-status').get_json()["fully_ready"] is True
+
+
+def test_synchronous_app_is_ready():
+    client = create_app().test_client()
+    assert client.get('/healthz').get_json()["ready"] is True
+    assert client.get('/data').status_code == 200
+
+
+def test_first_request_starts_the_stages():
+    # No gunicorn post_worker_init (other WSGI servers, --chdir elsewhere)
+    app = create_app(staged=True)
+    client = app.test_client()
+    client.get('/healthz')
+    assert app.config['STARTUP_STARTED']
+    deadline = time.monotonic() + 30
+    while not client.get('/healthz').get_json()["ready"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert client.post('/ai-chat', json={"message": "hi"}).status_code == 200
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for compiled request schemas.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from flask import Flask, jsonify
+
+from backend.models.payloads import ClientRegistration, VaultCollect, VaultSearch
+from backend.utils.validation import ValidationError, compile_schema, validate_body
+
+REGISTRATION = {'env_id': 'env', 'client_id': 'ab' * 32, 'public_ip': None,
+                'user_agent': 'agent', 'timestamp': 1700000000000, 'email': 'a@example.com'}
+
+
+def errors(schema, data):
+    with pytest.raises(ValidationError) as info:
+        compile_schema(schema)(data)
+    return info.value.message
+
+
+def test_builds_typed_instances():
+    body = compile_schema(ClientRegistration)(REGISTRATION)
+    assert isinstance(body, ClientRegistration) and body.client_id == 'ab' * 32
+    assert compile_schema(ClientRegistration) is compile_schema(ClientRegistration)
+
+    collect = compile_schema(VaultCollect)({'user_id': 'u', 'tab_id': 7, 'url': 'https://a.com',
+                                            'ui_element': {'selector': '#x'}})
+    assert collect.tab_id == '7' and collect.ui_element.selector == '#x'
+    assert collect.ui_element.attributes == {} and collect.timestamp > 0
+
+
+def test_rejects_bad_payloads_with_route_messages():
+    assert errors(ClientRegistration, {}) == "No data provided"
+    assert errors(ClientRegistration, ['x']) == "Request body must be a JSON object"
+    assert errors(ClientRegistration, {**REGISTRATION, 'email': None}) == "Invalid email format"
+    assert errors(ClientRegistration, {k: v for k, v in REGISTRATION.items() if k != 'email'}) == "Missing field: email"
+    assert errors(ClientRegistration, {**REGISTRATION, 'client_id': 'AB' * 32}) == "Invalid client_id format"
+    assert errors(ClientRegistration, {**REGISTRATION, 'email': 'nope'}) == "Invalid email format"
+    assert errors(ClientRegistration, {**REGISTRATION, 'timestamp': True}) == "Invalid timestamp"
+    assert errors(ClientRegistration, {**REGISTRATION, 'timestamp': 'yesterday'}) == "Invalid timestamp"
+    assert errors(VaultCollect, {'user_id': 'u', 'tab_id': 1, 'url': 'x', 'ui_element': []}) == "Invalid ui_element"
+    search = {'user_id': 'u', 'query_text': 'q'}
+    assert errors(VaultSearch, {**search, 'limit': -1}) == "limit is out of range"
+    assert errors(VaultSearch, {**search, 'limit': 10 ** 9}) == "limit is out of range"
+    assert compile_schema(VaultSearch)({**search, 'limit': 100}).limit == 100
+
+
+def test_decorator_answers_400_before_the_view():
+    app = Flask(__name__)
+    calls = []
+
+    @app.route('/register', methods=['POST'])
+    @validate_body(ClientRegistration)
+    def register(body):
+        calls.append(body)
+        return jsonify({"client_id": body.client_id})
+
+    client = app.test_client()
+    response = client.post('/register', json={**REGISTRATION, 'client_id': 'short'})
+    assert response.status_code == 400 and response.get_json() == {"error": "Invalid client_id format"}
+    assert calls == []
+    assert client.post('/register', json=REGISTRATION).get_json() == {"client_id": 'ab' * 32}
+
+
+def test_accepts_the_registration_the_client_page_sends():
+    from backend.routes.client import client_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(client_bp)
+    # templates/client.html: timestamp = new Date().toISOString()
+    payload = {'env_id': 'ici-demo', 'client_id': 'cd' * 32, 'public_ip': '203.0.113.7',
+               'user_agent': 'Mozilla/5.0', 'timestamp': '2026-10-19T08:30:00.000Z',
+               'email': 'someone@example.com'}
+    response = app.test_client().post('/client-register', json=payload)
+    assert response.status_code == 200
+    assert response.get_json()["registered_at"] == 1792398600000.0
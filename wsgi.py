@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+ICI Chat WSGI entry point for production servers.
+Usage: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from backend.factory import create_app
+
+# Staged startup: workers bind and serve /healthz and the loading page while
+# the startup stages run (started per worker by gunicorn.conf.py, or by the
+# first request under any other server)
+app = create_app(staged=True)